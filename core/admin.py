@@ -1,7 +1,11 @@
 # core/admin.py
 from django.contrib import admin
 from django.utils.html import format_html
-from .models import ContactMessage, QuickMenu, Pincode, VendorAnalytics, FeaturedCombo
+from django.db.models import Sum
+from .models import (
+    ContactMessage, QuickMenu, Pincode, VendorAnalytics, FeaturedCombo,
+    VendorDailySales, VendorDailyItemSales,
+)
 
 
 
@@ -50,6 +54,58 @@ class VendorAnalyticsAdmin(admin.ModelAdmin):
     date_hierarchy = "updated_at"
 
 
+# ----------------------
+# Sales Rollups Admin (read-only, rebuilt by `manage.py rollup_sales`)
+# ----------------------
+class ReadOnlyRollupAdmin(admin.ModelAdmin):
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(VendorDailySales)
+class VendorDailySalesAdmin(ReadOnlyRollupAdmin):
+    list_display = ("day", "vendor", "orders", "items_sold", "revenue", "average_basket", "cancellations")
+    list_filter = ("day",)
+    search_fields = ("vendor__name", "vendor__vendor_code")
+    list_select_related = ("vendor",)
+    date_hierarchy = "day"
+    ordering = ("-day", "vendor")
+    show_full_result_count = False
+
+    def changelist_view(self, request, extra_context=None):
+        """Add totals for the current filter (a month of one vendor ≈ 30 rollup rows)."""
+        response = super().changelist_view(request, extra_context)
+        try:
+            queryset = response.context_data["cl"].queryset
+        except (AttributeError, KeyError):
+            return response  # redirects / errors
+        totals = queryset.aggregate(
+            n_orders=Sum("orders"), n_items=Sum("items_sold"), n_revenue=Sum("revenue"),
+            n_cancellations=Sum("cancellations"), n_cancelled_revenue=Sum("cancelled_revenue"),
+        )
+        orders = totals["n_orders"] or 0
+        totals["average_basket"] = (totals["n_revenue"] or 0) / orders if orders else 0
+        response.context_data["sales_totals"] = totals
+        return response
+
+
+@admin.register(VendorDailyItemSales)
+class VendorDailyItemSalesAdmin(ReadOnlyRollupAdmin):
+    list_display = ("day", "vendor", "menu_item", "quantity", "revenue", "order_count", "cancelled_quantity")
+    list_filter = ("day",)
+    search_fields = ("vendor__name", "vendor__vendor_code", "menu_item__name")
+    list_select_related = ("vendor", "menu_item__vendor")
+    date_hierarchy = "day"
+    ordering = ("-day", "vendor", "-revenue")
+    show_full_result_count = False
+
+
 # ----------------------
 # Featured Combo Admin
 # ----------------------
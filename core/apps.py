@@ -1,6 +1,26 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+# Cache backends each worker process has its own copy of
+PROCESS_LOCAL_CACHES = {
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+}
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from . import signals  # noqa: F401  (registers receivers)
+
+        # 🍪 Cache-first sessions served from a per-process cache go stale across workers
+        if settings.SESSION_ENGINE == "core.sessions":
+            backend = settings.CACHES[settings.SESSION_CACHE_ALIAS]["BACKEND"]
+            if backend in PROCESS_LOCAL_CACHES:
+                raise ImproperlyConfigured(
+                    f"SESSION_ENGINE 'core.sessions' needs a cache shared by all workers, "
+                    f"but CACHES[{settings.SESSION_CACHE_ALIAS!r}] is {backend}. Set REDIS_URL."
+                )
@@ -0,0 +1,173 @@
+# core/benchmarks.py
+"""
+Latency / query-count benchmarks for the customer-facing hot paths.
+
+Cases run in-process through `django.test.Client` against a dataset seeded by
+`core.factories`; results are plain JSON so runs from different commits can be
+diffed and gated with `compare()`.
+"""
+import json
+import math
+import statistics
+import time
+import uuid
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from customers.models import Customer
+from menuitem.models import MenuItem
+from orders.models import Order, OrderTracking, CustomCombo, CustomComboItem
+from vendors.models import Vendor
+
+BENCH_USERNAME = "bench-user"
+BENCH_PASSWORD = "bench-pass-123"
+
+# name → (vendors, items per vendor, customers, orders, combos)
+SCALES = {
+    "smoke": dict(vendors=20, items_per_vendor=8, customers=200, orders=1_000, combos=10),
+    "small": dict(vendors=500, items_per_vendor=12, customers=10_000, orders=50_000, combos=100),
+    "full": dict(vendors=10_000, items_per_vendor=50, customers=200_000, orders=1_000_000, combos=2_000),
+}
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(pct / 100 * len(sorted_values)) - 1
+    return sorted_values[max(0, min(rank, len(sorted_values) - 1))]
+
+
+# ----------------------
+# Fixtures for authenticated cases
+# ----------------------
+class BenchContext:
+    """Vendor, logged-in customer and an order/custom combo the cases can hit."""
+
+    def __init__(self):
+        self.vendor = (
+            Vendor.objects.filter(is_active=True, available=True, menu_items__is_available=True)
+            .order_by("pk").first()
+        )
+        if self.vendor is None:
+            raise RuntimeError("No active vendor with available items — seed data first.")
+        self.items = list(MenuItem.objects.filter(vendor=self.vendor, is_available=True)[:3])
+
+        self.user, created = User.objects.get_or_create(username=BENCH_USERNAME)
+        if created:
+            self.user.set_password(BENCH_PASSWORD)
+            self.user.save()
+        self.customer, _ = Customer.objects.get_or_create(user=self.user, defaults={"name": "Bench"})
+
+        self.custom_combo = CustomCombo.objects.create(vendor=self.vendor, title="Bench combo")
+        CustomComboItem.objects.bulk_create(
+            CustomComboItem(custom_combo=self.custom_combo, menu_item=item, quantity=4) for item in self.items
+        )
+        self.order = Order.objects.create(customer=self.customer, vendor=self.vendor, status="placed")
+        OrderTracking.objects.create(order=self.order, status="placed")
+
+        self.client = Client(raise_request_exception=False)
+        self.client.force_login(self.user)
+        self.anonymous = Client(raise_request_exception=False)
+
+    @staticmethod
+    def idempotency_headers():
+        """A fresh key per request, so order creation runs instead of replaying the first response."""
+        return {"Idempotency-Key": uuid.uuid4().hex}
+
+    def custom_order_body(self):
+        return json.dumps({
+            "delivery_name": "Bench",
+            "delivery_phone": "9000000000",
+            "pincode": self.vendor.pincode or "",
+            "items": [{"id": item.id, "quantity": 2} for item in self.items],
+        })
+
+
+def default_cases(ctx):
+    """name → zero-arg callable issuing one request."""
+    v = ctx.vendor
+    return {
+        "core.home": lambda: ctx.anonymous.get(reverse("core:home")),
+        "vendors.search_vendor": lambda: ctx.anonymous.get(
+            reverse("vendors:search_vendor"), {"pincode": v.pincode or "", "city": v.city or ""}
+        ),
+        "vendors.vendor_detail": lambda: ctx.anonymous.get(reverse("vendors:vendor_detail", args=[v.vendor_code])),
+        "vendors.combo_builder": lambda: ctx.anonymous.get(reverse("vendors:combo_builder", args=[v.vendor_code])),
+        "vendors.vendor_items_api": lambda: ctx.anonymous.get(reverse("vendors:vendor_items_api", args=[v.vendor_code])),
+        "vendors.create_custom_order": lambda: ctx.client.post(
+            reverse("vendors:create_custom_order", args=[v.vendor_code]),
+            data=ctx.custom_order_body(), content_type="application/json", headers=ctx.idempotency_headers(),
+        ),
+        "orders.place_order": lambda: ctx.client.post(
+            reverse("orders:place_order", args=[ctx.custom_combo.pk]), headers=ctx.idempotency_headers(),
+        ),
+        "orders.track_status_api": lambda: ctx.client.get(reverse("orders:track_status_api", args=[ctx.order.pk])),
+    }
+
+
+# ----------------------
+# Runner
+# ----------------------
+def run_case(request, iterations, warmup):
+    for _ in range(warmup):
+        request()
+
+    timings, queries, statuses = [], [], {}
+    for _ in range(iterations):
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            response = request()
+            timings.append((time.perf_counter() - start) * 1000)
+        queries.append(len(captured))
+        statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+
+    timings.sort()
+    return {
+        "iterations": iterations,
+        "p50_ms": round(percentile(timings, 50), 3),
+        "p95_ms": round(percentile(timings, 95), 3),
+        "p99_ms": round(percentile(timings, 99), 3),
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "queries": max(queries),
+        "statuses": statuses,
+        "errors": sum(n for code, n in statuses.items() if code.startswith("5")),
+    }
+
+
+def run(cases, iterations=50, warmup=5, only=None):
+    results = {}
+    for name, request in cases.items():
+        if only and name not in only:
+            continue
+        results[name] = run_case(request, iterations, warmup)
+    return results
+
+
+# ----------------------
+# Regression gate
+# ----------------------
+def compare(baseline, current, p95_tolerance=0.25, query_tolerance=0, min_p95_delta_ms=1.0):
+    """
+    Return human-readable regressions of `current` against `baseline`.
+
+    p95 must grow by more than `p95_tolerance` (relative) *and* `min_p95_delta_ms`
+    to count, so sub-millisecond jitter does not fail the gate.
+    """
+    regressions = []
+    for name, now in current.get("results", {}).items():
+        before = baseline.get("results", {}).get(name)
+        if not before:
+            continue
+        limit = before["p95_ms"] * (1 + p95_tolerance)
+        if now["p95_ms"] > limit and now["p95_ms"] - before["p95_ms"] > min_p95_delta_ms:
+            regressions.append(f"{name}: p95 {before['p95_ms']}ms → {now['p95_ms']}ms")
+        if now["queries"] > before["queries"] + query_tolerance:
+            regressions.append(f"{name}: queries {before['queries']} → {now['queries']}")
+        if now["errors"] > before["errors"]:
+            regressions.append(f"{name}: 5xx responses {before['errors']} → {now['errors']}")
+    return regressions
@@ -0,0 +1,136 @@
+# core/db_router.py
+"""
+Primary / read-replica routing.
+
+Writes always go to `default`. Reads go to a replica only inside views
+decorated with `@replica_reads`, and only when the client is not inside its
+sticky-after-write window: any tracked write during a request makes
+`ReplicaRoutingMiddleware` set a short-lived cookie, so the redirect after
+`place_order` (and whatever the user clicks next) still reads from the
+primary while the replicas catch up.
+"""
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Auth state must be read where it was written (a fresh login is not on the
+# replica yet); these apps never read from a replica.
+PRIMARY_ONLY_APPS = {"auth", "sessions", "contenttypes", "admin"}
+
+
+class RoutingState:
+    """Per-request routing flags, shared by reference with sync_to_async threads."""
+
+    __slots__ = ("sticky", "replica", "wrote", "track_writes")
+
+    def __init__(self, sticky=False):
+        self.sticky = sticky
+        self.replica = None
+        self.wrote = False
+        self.track_writes = True
+
+
+_state = ContextVar("db_routing_state", default=None)
+
+
+def replica_aliases():
+    return getattr(settings, "DATABASE_REPLICAS", [])
+
+
+# ----------------------
+# Request scope
+# ----------------------
+def begin_request(request):
+    """Install a fresh RoutingState for this request; returns (state, token)."""
+    cookie = request.COOKIES.get(settings.DATABASE_STICKY_COOKIE, "")
+    try:
+        sticky = float(cookie) > time.time()
+    except ValueError:
+        sticky = False
+    state = RoutingState(sticky=sticky)
+    return state, _state.set(state)
+
+
+def end_request(token):
+    _state.reset(token)
+
+
+def set_sticky_cookie(state, response):
+    """Keep this client on the primary for a while if the request wrote anything."""
+    if state.wrote and replica_aliases():
+        seconds = settings.DATABASE_STICKY_SECONDS
+        response.set_cookie(
+            settings.DATABASE_STICKY_COOKIE, f"{time.time() + seconds:.0f}",
+            max_age=seconds, httponly=True, samesite="Lax",
+        )
+    return response
+
+
+def _use_replica():
+    state = _state.get()
+    replicas = replica_aliases()
+    if state is not None and replicas and not state.sticky:
+        state.replica = random.choice(replicas)
+
+
+def replica_reads(view):
+    """Serve this view's ORM reads from a replica (unless the client is sticky)."""
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def _wrapped(request, *args, **kwargs):
+            _use_replica()
+            return await view(request, *args, **kwargs)
+    else:
+        @wraps(view)
+        def _wrapped(request, *args, **kwargs):
+            _use_replica()
+            return view(request, *args, **kwargs)
+    return _wrapped
+
+
+@contextmanager
+def untracked_writes():
+    """Writes inside the block (view counters, analytics) don't start a sticky window."""
+    state = _state.get()
+    if state is None:
+        yield
+        return
+    previous, state.track_writes = state.track_writes, False
+    try:
+        yield
+    finally:
+        state.track_writes = previous
+
+
+# ----------------------
+# Router
+# ----------------------
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or state.replica is None or model._meta.app_label in PRIMARY_ONLY_APPS:
+            return None
+        # Reads inside a write transaction must see its own changes.
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None and state.track_writes and model._meta.app_label not in PRIMARY_ONLY_APPS:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema through replication.
+        return db == DEFAULT_DB_ALIAS
@@ -0,0 +1,422 @@
+# core/factories.py
+"""
+Deterministic, bulk_create-based data factory for benchmarks and scale tests.
+
+Every row is a pure function of (seed, primary key): menu item prices, order
+contents, etc. are derived by arithmetic on pk offsets instead of being read
+back from the database, so any slice of the dataset can be generated on its
+own (and in any order) with identical results.
+"""
+import random
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import connections, transaction
+from django.db.models import Max
+from django.db.models.sql import InsertQuery
+from django.utils import timezone
+
+from core.models import Pincode
+from customers.models import Customer
+from menuitem.models import MenuItem, Combo
+from orders.models import Order, OrderItem, OrderTracking, ComboRule
+from vendors.models import Vendor, ComboItem, ComboVendor
+
+CENT = Decimal("0.01")
+TAX_RATE = Decimal("0.05")
+
+# city → first four digits of its pincodes
+CITY_PINCODES = {
+    "Chennai": "6000",
+    "Coimbatore": "6410",
+    "Madurai": "6250",
+    "Bengaluru": "5600",
+    "Hyderabad": "5000",
+    "Chandigarh": "1600",
+}
+
+# city → approximate centre (lat, lon); synthetic pincodes are scattered around it
+CITY_CENTRES = {
+    "Chennai": (13.0827, 80.2707),
+    "Coimbatore": (11.0168, 76.9558),
+    "Madurai": (9.9252, 78.1198),
+    "Bengaluru": (12.9716, 77.5946),
+    "Hyderabad": (17.3850, 78.4867),
+    "Chandigarh": (30.7333, 76.7794),
+}
+
+# name, category, base price, calories, protein, carbs, fat, fiber (per serving)
+MENU_CATALOG = [
+    ("Idli", "idli", 15, 58, 2, 12, 0.4, 0.7),
+    ("Mini Idli", "idli", 40, 150, 5, 30, 1, 1.5),
+    ("Podi Idli", "idli", 45, 190, 6, 32, 5, 2),
+    ("Rava Idli", "idli", 30, 120, 3, 20, 3, 1),
+    ("Sambar", "sambar", 20, 100, 5, 12, 3, 3),
+    ("Tiffin Sambar", "sambar", 25, 110, 5, 14, 3, 3),
+    ("Coconut Chutney", "chutney", 10, 80, 1, 4, 7, 2),
+    ("Peanut Chutney", "chutney", 10, 90, 4, 5, 7, 2),
+    ("Onion-Tomato Chutney", "chutney", 10, 50, 1, 8, 1, 2),
+    ("Mint Chutney", "chutney", 10, 30, 1, 5, 1, 2),
+    ("Medu Vada", "other", 25, 130, 5, 15, 6, 2),
+    ("Masala Dosa", "other", 60, 350, 8, 50, 12, 4),
+    ("Kuzhi Paniyaram", "other", 40, 200, 5, 30, 6, 2),
+    ("Filter Coffee", "other", 20, 70, 2, 9, 3, 0),
+]
+
+# Menus longer than the catalog repeat it as variants: name suffix, price and nutrient multiplier
+ITEM_VARIANTS = [("", 1), (" (Ghee)", 1.3), (" (Large)", 1.8), (" (Parcel Pack)", 1.1)]
+MAX_ITEMS_PER_VENDOR = len(MENU_CATALOG) * len(ITEM_VARIANTS)
+
+VENDOR_NAMES = ["Amma", "Murugan", "Saravana", "Annapoorna", "Ganesh", "Lakshmi", "Meenakshi", "Kumar"]
+VENDOR_SUFFIXES = ["Idli Kadai", "Tiffin Centre", "Mess", "Bhavan", "Kitchen", "Cart"]
+
+ORDER_STATUSES = [("delivered", 70), ("cancelled", 5), ("confirmed", 10), ("placed", 10), ("pending", 5)]
+
+# final status → tracking history, with (min, max) minutes since the previous step
+STATUS_HISTORY = {
+    "pending": [("pending", 0, 0)],
+    "placed": [("placed", 0, 0)],
+    "confirmed": [("placed", 0, 0), ("confirmed", 1, 8)],
+    "delivered": [("placed", 0, 0), ("confirmed", 1, 8), ("dispatched", 10, 25), ("delivered", 10, 40)],
+    "cancelled": [("placed", 0, 0), ("cancelled", 1, 15)],
+}
+
+# (first hour, last hour, weight): idli shops peak at breakfast, then dinner
+MEAL_WINDOWS = [(7, 10, 45), (12, 14, 18), (16, 18, 12), (19, 22, 25)]
+
+
+def _rng(seed, *parts):
+    """Independent, reproducible RNG stream for one row."""
+    return random.Random(":".join(map(str, (seed,) + parts)))
+
+
+def _money(value):
+    return Decimal(value).quantize(CENT)
+
+
+@contextmanager
+def preserve_timestamps(*models):
+    """Let bulk_create keep explicit created_at/updated_at values (auto_now* off)."""
+    saved = []
+    for model in models:
+        for field in model._meta.concrete_fields:
+            if getattr(field, "auto_now", False) or getattr(field, "auto_now_add", False):
+                saved.append((field, field.auto_now, field.auto_now_add))
+                field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class ScalePlan:
+    """
+    Describes a synthetic dataset and builds any slice of it.
+
+    Primary keys start right after the current maximum of each table, so a
+    plan can be applied on top of existing data.
+    """
+
+    def __init__(self, seed=0, vendors=100, items_per_vendor=10, customers=1000,
+                 orders=5000, combos=20, max_lines_per_order=4, rules_per_vendor=1,
+                 days=90, end_date=None, bases=None):
+        self.seed = seed
+        self.vendors = vendors
+        self.items_per_vendor = min(items_per_vendor, MAX_ITEMS_PER_VENDOR)
+        self.customers = customers
+        self.orders = orders
+        self.combos = combos
+        self.max_lines_per_order = max_lines_per_order
+        self.rules_per_vendor = rules_per_vendor
+        self.days = days
+        # Orders are spread over the `days` before this date (today by default)
+        self.end_date = end_date or timezone.localdate()
+        self.bases = bases or {}
+
+    @classmethod
+    def for_database(cls, using="default", **kwargs):
+        """Plan whose pk ranges start after the rows already in `using`."""
+        models = {"vendor": Vendor, "menuitem": MenuItem, "customer": Customer, "order": Order, "combo": Combo}
+        bases = {
+            key: model.objects.using(using).aggregate(m=Max("pk"))["m"] or 0
+            for key, model in models.items()
+        }
+        return cls(bases=bases, **kwargs)
+
+    # ---- pk arithmetic ----
+    def vendor_pk(self, index):
+        return self.bases.get("vendor", 0) + index + 1
+
+    def item_pk(self, vendor_index, slot):
+        return self.bases.get("menuitem", 0) + vendor_index * self.items_per_vendor + slot + 1
+
+    def customer_pk(self, index):
+        return self.bases.get("customer", 0) + index + 1
+
+    def order_pk(self, index):
+        return self.bases.get("order", 0) + index + 1
+
+    def combo_pk(self, index):
+        return self.bases.get("combo", 0) + index + 1
+
+    # ---- pure row specs ----
+    def vendor_city(self, index):
+        rng = _rng(self.seed, "vendor", index)
+        city = rng.choice(list(CITY_PINCODES))
+        return city, f"{CITY_PINCODES[city]}{rng.randrange(100):02d}"
+
+    def item_spec(self, vendor_index, slot):
+        """Catalog entry (of the slot's variant) and vendor-specific price of one menu slot."""
+        name, category, price, *nutrients = MENU_CATALOG[(vendor_index + slot) % len(MENU_CATALOG)]
+        suffix, factor = ITEM_VARIANTS[slot // len(MENU_CATALOG)]
+        entry = (name + suffix, category, price * factor, *(round(n * factor, 1) for n in nutrients))
+        markup = _rng(self.seed, "item", vendor_index, slot).choice((0.9, 1.0, 1.0, 1.1, 1.25))
+        return entry, _money(entry[2] * markup)
+
+    # ---- row builders ----
+    def vendor_rows(self, start, stop):
+        rows = []
+        for i in range(start, stop):
+            rng = _rng(self.seed, "vendor", i)
+            city, pincode = self.vendor_city(i)
+            pk = self.vendor_pk(i)
+            rows.append(Vendor(
+                pk=pk,
+                name=f"{rng.choice(VENDOR_NAMES)} {rng.choice(VENDOR_SUFFIXES)} {pk}",
+                city=city,
+                pincode=pincode,
+                experience=rng.randrange(1, 30),
+                signature_dish=MENU_CATALOG[i % len(MENU_CATALOG)][0],
+                owner_name=rng.choice(VENDOR_NAMES),
+                available=rng.random() > 0.1,
+                is_active=rng.random() > 0.02,
+                items_count=self.items_per_vendor,
+                vendor_code=f"SOT{pk:03d}",
+                slug=f"vendor-{pk}",
+            ))
+        return rows
+
+    def menu_item_rows(self, vendor_start, vendor_stop):
+        rows = []
+        for v in range(vendor_start, vendor_stop):
+            for slot in range(self.items_per_vendor):
+                entry, price = self.item_spec(v, slot)
+                name, category, _, cal, protein, carbs, fat, fiber = entry
+                rows.append(MenuItem(
+                    pk=self.item_pk(v, slot),
+                    vendor_id=self.vendor_pk(v),
+                    name=name,
+                    category=category,
+                    price=price,
+                    is_available=_rng(self.seed, "avail", v, slot).random() > 0.05,
+                    calories=cal, protein=protein, carbs=carbs, fat=fat, fiber=fiber,
+                ))
+        return rows
+
+    def combo_rule_rows(self, vendor_start, vendor_stop):
+        rows = []
+        for v in range(vendor_start, vendor_stop):
+            for slot in range(min(self.rules_per_vendor, self.items_per_vendor)):
+                rows.append(ComboRule(
+                    menu_item_id=self.item_pk(v, slot),
+                    min_quantity=_rng(self.seed, "rule", v, slot).choice((2, 3, 4)),
+                    discount_percentage=Decimal("5.00"),
+                ))
+        return rows
+
+    def combo_rows(self, start, stop):
+        """Combos plus their ComboItems, M2M vendor links and ComboVendor rows."""
+        combos, items, links, combo_vendors = [], [], [], []
+        Through = Combo.vendors.through
+        for c in range(start, stop):
+            rng = _rng(self.seed, "combo", c)
+            pk = self.combo_pk(c)
+            home = rng.randrange(self.vendors)
+            slots = rng.sample(range(self.items_per_vendor), min(3, self.items_per_vendor))
+            price = sum((self.item_spec(home, s)[1] * 2 for s in slots), Decimal("0.00"))
+            combos.append(Combo(
+                pk=pk, code=f"COM{pk:03d}",
+                name=" + ".join(self.item_spec(home, s)[0][0] for s in slots),
+                price=_money(price * Decimal("0.9")),
+            ))
+            items.extend(
+                ComboItem(combo_id=pk, menu_item_id=self.item_pk(home, s), quantity=2) for s in slots
+            )
+            vendor_indexes = {home} | {rng.randrange(self.vendors) for _ in range(rng.randrange(4))}
+            links.extend(Through(combo_id=pk, vendor_id=self.vendor_pk(v)) for v in sorted(vendor_indexes))
+            combo_vendors.extend(ComboVendor(combo_id=pk, vendor_id=self.vendor_pk(v)) for v in sorted(vendor_indexes))
+        return combos, items, links, combo_vendors
+
+    def customer_rows(self, start, stop):
+        rows = []
+        for i in range(start, stop):
+            rng = _rng(self.seed, "customer", i)
+            city = rng.choice(list(CITY_PINCODES))
+            pk = self.customer_pk(i)
+            rows.append(Customer(
+                pk=pk,
+                name=f"Customer {pk}",
+                phone=f"9{rng.randrange(10 ** 9):09d}",
+                email=f"customer{pk}@example.com",
+                city=city,
+                pincode=f"{CITY_PINCODES[city]}{rng.randrange(100):02d}",
+            ))
+        return rows
+
+    def order_status(self, rng):
+        statuses, weights = zip(*ORDER_STATUSES)
+        return rng.choices(statuses, weights)[0]
+
+    def order_time(self, rng):
+        """Aware timestamp within the plan window, clustered around meal hours."""
+        first, last, _ = rng.choices(MEAL_WINDOWS, [w for *_, w in MEAL_WINDOWS])[0]
+        day = self.end_date - timedelta(days=rng.randrange(self.days))
+        moment = datetime.combine(day, time(rng.randint(first, last), rng.randrange(60), rng.randrange(60)))
+        return timezone.make_aware(moment)
+
+    def pincode_rows(self):
+        """100 pincodes per city on a 10 × 10 grid, ~2 km apart, centred on the city."""
+        return [
+            Pincode(
+                code=f"{prefix}{n:02d}", city=city,
+                latitude=round(CITY_CENTRES[city][0] + (n // 10 - 4.5) * 0.018, 6),
+                longitude=round(CITY_CENTRES[city][1] + (n % 10 - 4.5) * 0.018, 6),
+            )
+            for city, prefix in CITY_PINCODES.items() for n in range(100)
+        ]
+
+    def order_rows(self, start, stop):
+        """Orders with their OrderItems and tracking history; totals match the line items."""
+        orders, lines, tracking = [], [], []
+        for i in range(start, stop):
+            rng = _rng(self.seed, "order", i)
+            pk = self.order_pk(i)
+            v = rng.randrange(self.vendors)
+            city, pincode = self.vendor_city(v)
+            slots = rng.sample(range(self.items_per_vendor), rng.randint(1, min(self.max_lines_per_order, self.items_per_vendor)))
+            subtotal = Decimal("0.00")
+            for slot in slots:
+                _, price = self.item_spec(v, slot)
+                qty = rng.randint(1, 6)
+                subtotal += price * qty
+                lines.append(OrderItem(order_id=pk, menu_item_id=self.item_pk(v, slot), quantity=qty, price=price))
+
+            status = self.order_status(rng)
+            created = moment = self.order_time(rng)
+            for step, low, high in STATUS_HISTORY[status]:
+                moment += timedelta(minutes=rng.randint(low, high))
+                tracking.append(OrderTracking(
+                    order_id=pk, status=step, timestamp=moment, created_at=moment, updated_at=moment,
+                ))
+            for line in lines[-len(slots):]:
+                line.created_at = line.updated_at = created
+
+            tax = _money(subtotal * TAX_RATE)
+            delivery = Decimal("20.00") if subtotal < 200 else Decimal("0.00")
+            orders.append(Order(
+                pk=pk,
+                customer_id=self.customer_pk(rng.randrange(self.customers)),
+                vendor_id=self.vendor_pk(v),
+                delivery_name=f"Customer {pk}",
+                delivery_address=f"{rng.randrange(1, 300)} Main Road, {city}",
+                pincode=pincode,
+                subtotal=subtotal,
+                tax_amount=tax,
+                delivery_fee=delivery,
+                total_price=subtotal + tax + delivery,
+                payment_method=rng.choice(("cod", "cod", "online")),
+                status=status,
+                created_at=created,
+                updated_at=moment,
+            ))
+        return orders, lines, tracking
+
+
+def bulk_insert(objs, batch_size=5000, using="default", **kwargs):
+    if objs:
+        type(objs[0]).objects.using(using).bulk_create(objs, batch_size=batch_size, **kwargs)
+
+
+# Later phases reference rows written by earlier ones, so they run in this order
+PHASES = ("vendors", "combos", "customers", "orders")
+
+
+def phase_size(plan, phase):
+    return {"vendors": plan.vendors, "combos": plan.combos,
+            "customers": plan.customers, "orders": plan.orders}[phase]
+
+
+def build_chunk(plan, phase, start, stop):
+    """Rows [start, stop) of one phase, as lists of instances in insert order."""
+    if phase == "vendors":
+        return [plan.vendor_rows(start, stop), plan.menu_item_rows(start, stop), plan.combo_rule_rows(start, stop)]
+    if phase == "combos":
+        return list(plan.combo_rows(start, stop))
+    if phase == "customers":
+        return [plan.customer_rows(start, stop)]
+    if phase == "orders":
+        return list(plan.order_rows(start, stop))
+    raise ValueError(f"Unknown phase {phase!r}")
+
+
+def write_rows(row_lists, batch_size=5000, using="default"):
+    """Insert the output of `build_chunk` in a single transaction."""
+    with transaction.atomic(using=using), preserve_timestamps(Order, OrderItem, OrderTracking):
+        for objs in row_lists:
+            bulk_insert(objs, batch_size, using)
+
+
+def compile_rows(row_lists, batch_size=5000, using="default"):
+    """
+    Turn `build_chunk` output into ready-to-run (sql, params) INSERT statements.
+
+    This is the CPU-heavy half of bulk_create (value preparation and SQL
+    generation); doing it in worker processes leaves a single SQLite writer
+    with nothing to do but execute.
+    """
+    connection = connections[using]
+    statements = []
+    with preserve_timestamps(Order, OrderItem, OrderTracking):
+        for objs in row_lists:
+            if not objs:
+                continue
+            model = type(objs[0])
+            fields = [
+                f for f in model._meta.concrete_fields
+                if not (f.primary_key and objs[0].pk is None)
+            ]
+            size = min(batch_size, connection.ops.bulk_batch_size(fields, objs) or batch_size)
+            for offset in range(0, len(objs), size):
+                query = InsertQuery(model)
+                query.insert_values(fields, objs[offset:offset + size])
+                statements.extend(query.get_compiler(using=using).as_sql())
+    return statements
+
+
+def execute_statements(statements, using="default"):
+    with transaction.atomic(using=using), connections[using].cursor() as cursor:
+        for sql, params in statements:
+            cursor.execute(sql, params)
+
+
+def write_chunk(plan, phase, start, stop, batch_size=5000, using="default"):
+    write_rows(build_chunk(plan, phase, start, stop), batch_size, using)
+    return stop - start
+
+
+def chunk_ranges(plan, phase, chunk):
+    """Split a phase into [start, stop) ranges of about `chunk` rows each."""
+    if phase == "vendors":
+        chunk = max(1, chunk // max(plan.items_per_vendor, 1))
+    total = phase_size(plan, phase)
+    return [(start, min(start + chunk, total)) for start in range(0, total, chunk)]
+
+
+def seed(plan, batch_size=5000, using="default", chunk=10000):
+    """Write the whole plan serially (see `manage.py seed_scale` for the parallel version)."""
+    bulk_insert(plan.pincode_rows(), batch_size, using, ignore_conflicts=True)
+    for phase in PHASES:
+        for start, stop in chunk_ranges(plan, phase, chunk):
+            write_chunk(plan, phase, start, stop, batch_size, using)
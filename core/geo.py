@@ -0,0 +1,177 @@
+# core/geo.py
+"""
+Pincode proximity index for vendor discovery.
+
+Pincode centroids (`Pincode.latitude/longitude`, loaded with
+`manage.py load_pincodes`) go into a KD-tree over 3-D unit vectors: the
+straight-line (chord) distance between two points on the sphere grows with
+the great-circle distance, so a radius search on the tree is exact and
+costs O(log n + hits). Vendors hang off their pincode; "vendors within N km
+of P" is one radius search plus a dict lookup per pincode found.
+
+The index is process-local. It is rebuilt lazily after `GEO_INDEX_TTL` seconds
+or after a Vendor / Pincode save in this process.
+"""
+import math
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+
+from vendors.models import Vendor
+from .models import Pincode
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi, dlmb = phi2 - phi1, math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _unit(lat, lon):
+    phi, lmb = math.radians(lat), math.radians(lon)
+    return (math.cos(phi) * math.cos(lmb), math.cos(phi) * math.sin(lmb), math.sin(phi))
+
+
+def _chord(km):
+    """Straight-line distance (unit sphere) for a surface distance."""
+    return 2 * math.sin(min(km / EARTH_RADIUS_KM, math.pi) / 2)
+
+
+# ----------------------
+# KD-tree
+# ----------------------
+class KDTree:
+    """Static 3-D KD-tree; nodes are (point, payload, axis, left, right) tuples."""
+
+    def __init__(self, entries):
+        self.root = self._build(list(entries), 0)
+
+    def _build(self, entries, depth):
+        if not entries:
+            return None
+        axis = depth % 3
+        entries.sort(key=lambda e: e[0][axis])
+        mid = len(entries) // 2
+        point, payload = entries[mid]
+        return (
+            point, payload, axis,
+            self._build(entries[:mid], depth + 1),
+            self._build(entries[mid + 1:], depth + 1),
+        )
+
+    def within(self, center, radius):
+        """[(payload, chord distance)] of points within `radius` of `center`."""
+        hits, stack, r2 = [], [self.root], radius * radius
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            point, payload, axis, left, right = node
+            d2 = sum((p - c) ** 2 for p, c in zip(point, center))
+            if d2 <= r2:
+                hits.append((payload, math.sqrt(d2)))
+            diff = center[axis] - point[axis]
+            near, far = (left, right) if diff <= 0 else (right, left)
+            stack.append(near)
+            if diff * diff <= r2:
+                stack.append(far)
+        return hits
+
+
+# ----------------------
+# Vendor index
+# ----------------------
+class ProximityIndex:
+    def __init__(self, pincodes, vendors):
+        """pincodes: (code, lat, lon) rows; vendors: (vendor_id, pincode) rows."""
+        self.coords = {code: (lat, lon) for code, lat, lon in pincodes}
+        self.vendors = defaultdict(list)
+        for vendor_id, code in vendors:
+            self.vendors[(code or "").strip()].append(vendor_id)
+        # Only pincodes that have vendors need to be in the tree
+        self.tree = KDTree(
+            (_unit(*self.coords[code]), code) for code in self.vendors if code in self.coords
+        )
+
+    def knows(self, pincode):
+        return pincode in self.coords
+
+    def pincodes_within(self, pincode, km):
+        """[(pincode, km)] of vendor pincodes within `km` of `pincode`, nearest first."""
+        if pincode not in self.coords:
+            return []
+        lat, lon = self.coords[pincode]
+        hits = [
+            (code, haversine_km(lat, lon, *self.coords[code]))
+            for code, _ in self.tree.within(_unit(lat, lon), _chord(km))
+        ]
+        return sorted(((code, d) for code, d in hits if d <= km), key=lambda h: (h[1], h[0]))
+
+    def vendors_within(self, pincode, km, limit=None):
+        """[(vendor_id, km)] nearest first."""
+        found = [
+            (vendor_id, distance)
+            for code, distance in self.pincodes_within(pincode, km)
+            for vendor_id in self.vendors[code]
+        ]
+        return found[:limit] if limit else found
+
+
+def _load():
+    pincodes = Pincode.objects.filter(
+        is_active=True, latitude__isnull=False, longitude__isnull=False
+    ).values_list("code", "latitude", "longitude")
+    vendors = Vendor.objects.filter(is_active=True, available=True).values_list("id", "pincode")
+    return ProximityIndex(pincodes, vendors)
+
+
+_index = None
+_built_at = 0.0
+_lock = threading.Lock()
+
+
+def get_index():
+    global _index, _built_at
+    if _index is None or time.monotonic() - _built_at > settings.GEO_INDEX_TTL:
+        with _lock:
+            if _index is None or time.monotonic() - _built_at > settings.GEO_INDEX_TTL:
+                _index, _built_at = _load(), time.monotonic()
+    return _index
+
+
+def invalidate():
+    global _index
+    _index = None
+
+
+def nearby_vendors(pincode, km=None, limit=None):
+    """[(vendor_id, km)] of active, available vendors near `pincode`, nearest first."""
+    km = settings.GEO_DEFAULT_RADIUS_KM if km is None else km
+    return get_index().vendors_within(pincode.strip(), km, limit)
+
+
+def nearby_pincodes(pincode, km=None):
+    km = settings.GEO_DEFAULT_RADIUS_KM if km is None else km
+    return [code for code, _ in get_index().pincodes_within(pincode.strip(), km)]
+
+
+def knows(pincode):
+    return get_index().knows(pincode.strip())
+
+
+def vendors_near(pincode, km=None, limit=None):
+    """Vendor objects near `pincode`, nearest first, each with a `distance_km` attribute."""
+    hits = nearby_vendors(pincode, km, limit)
+    by_id = Vendor.objects.in_bulk([vendor_id for vendor_id, _ in hits])
+    vendors = []
+    for vendor_id, distance in hits:
+        vendor = by_id.get(vendor_id)
+        if vendor is not None:
+            vendor.distance_km = round(distance, 1)
+            vendors.append(vendor)
+    return vendors
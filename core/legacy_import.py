@@ -0,0 +1,343 @@
+# core/legacy_import.py
+"""
+Streaming importer for the legacy fixture dumps (menuitems.json, orders.json,
+vendors.json).
+
+Those files are UTF-16 `dumpdata` arrays written against older schemas
+(`available`, `description`, `mood`, `code`, ...). `loaddata` parses the whole
+file into memory and saves row by row; this module decodes records one at a
+time, maps them onto the current models and writes them with `bulk_create`.
+`bulk_create` skips `Vendor.save()`, so vendor slugs are filled in afterwards
+(`fill_vendor_slugs`). A record that is missing a required field, or that
+hits an existing key with `on_conflict="error"`, raises `LegacyImportError`
+naming the record.
+"""
+import codecs
+import io
+import json
+import logging
+import re
+from decimal import Decimal, InvalidOperation
+
+from django.core.management.color import no_style
+from django.db import connections, transaction, IntegrityError, DEFAULT_DB_ALIAS
+from django.utils.text import slugify
+
+from menuitem.models import MenuItem, Combo
+from orders.models import CustomCombo, CustomComboItem
+from vendors.models import Vendor
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+DEFAULT_BATCH_SIZE = 1000
+
+ON_CONFLICT_CHOICES = ("ignore", "update", "error")
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_DIGITS = re.compile(r"\d+")
+
+
+class LegacyImportError(ValueError):
+    """A record that cannot be mapped or written; the message names it."""
+
+
+# ----------------------
+# Encoding detection & streaming decode
+# ----------------------
+def detect_encoding(head: bytes) -> str:
+    """Guess the encoding of a JSON document from its first bytes (BOM or NUL pattern)."""
+    if head.startswith((codecs.BOM_UTF32_LE, codecs.BOM_UTF32_BE)):
+        return "utf-32"
+    if head.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    return json.detect_encoding(head)
+
+
+def open_json_stream(path):
+    """Open `path` as a text stream, decoding with the auto-detected encoding."""
+    raw = open(path, "rb")
+    encoding = detect_encoding(raw.peek(4)[:4])
+    return io.TextIOWrapper(raw, encoding=encoding, newline=""), encoding
+
+
+def iter_json_array(stream, chunk_size: int = CHUNK_SIZE):
+    """
+    Yield the elements of a top-level JSON array one by one.
+
+    Only the current chunk plus the element being decoded is held in memory.
+    """
+    decoder = json.JSONDecoder()
+    buf, pos, eof = "", 0, False
+
+    def next_char():
+        nonlocal buf, pos, eof
+        while True:
+            pos = _WHITESPACE.match(buf, pos).end()
+            if pos < len(buf) or eof:
+                return buf[pos:pos + 1]
+            buf, pos = stream.read(chunk_size), 0
+            eof = not buf
+
+    def decode_value():
+        nonlocal buf, pos, eof
+        next_char()
+        while True:
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+                # A value that ends exactly at the buffer edge may be truncated.
+                if end < len(buf) or eof:
+                    pos = end
+                    return value
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            chunk = stream.read(chunk_size)
+            if chunk:
+                buf, pos = buf[pos:] + chunk, 0
+            else:
+                eof = True
+
+    if next_char() != "[":
+        raise ValueError("Expected a JSON array at the top level")
+    pos += 1
+    if next_char() == "]":
+        return
+
+    while True:
+        yield decode_value()
+        char = next_char()
+        pos += 1
+        if char == "]":
+            return
+        if char != ",":
+            raise ValueError(f"Expected ',' or ']' in JSON array, got {char!r}")
+
+
+# ----------------------
+# Legacy field mapping
+# ----------------------
+def _decimal(value, default="0.00"):
+    try:
+        return Decimal(str(value)) if value not in (None, "") else Decimal(default)
+    except InvalidOperation:
+        return Decimal(default)
+
+
+def _guess_category(name: str) -> str:
+    """Legacy menu items have no category; derive one from the item name."""
+    lowered = (name or "").lower()
+    for key, _ in MenuItem.CATEGORY_CHOICES:
+        if key != "other" and key in lowered:
+            return key
+    return "other"
+
+
+def _map_vendor(pk, fields):
+    experience = _DIGITS.search(str(fields.get("experience") or ""))
+    yield Vendor(
+        pk=pk,
+        name=fields.get("name", ""),
+        city=fields.get("city") or None,
+        pincode=fields.get("pincode") or None,
+        experience=int(experience.group()) if experience else 0,
+        signature_dish=fields.get("signature_dish") or fields.get("known_for") or None,
+        image=fields.get("image") or None,
+        owner_name=fields.get("owner_name") or None,
+        available=fields.get("available", True),
+        is_active=fields.get("is_active", True),
+        vendor_code=fields.get("vendor_code") or fields.get("code") or None,
+        slug=fields.get("slug") or None,
+    )
+
+
+def _map_menuitem(pk, fields):
+    name = fields.get("name", "")
+    yield MenuItem(
+        pk=pk,
+        vendor_id=fields["vendor"],
+        name=name,
+        category=fields.get("category") or _guess_category(name),
+        price=_decimal(fields.get("price")),
+        is_available=fields.get("is_available", fields.get("available", True)),
+        calories=fields.get("calories"),
+        protein=fields.get("protein"),
+        carbs=fields.get("carbs"),
+        fat=fields.get("fat"),
+        fiber=fields.get("fiber"),
+    )
+
+
+def _map_combo(pk, fields):
+    yield Combo(
+        pk=pk,
+        code=fields.get("code") or None,
+        name=fields.get("name", "Idli Plate"),
+        description=fields.get("description") or None,
+        price=_decimal(fields.get("price"), default="80"),
+        is_available=fields.get("is_available", fields.get("available", True)),
+    )
+    # Legacy combos had a single `vendor` FK; today it is the `vendors` M2M.
+    vendor_ids = fields.get("vendors") or ([fields["vendor"]] if fields.get("vendor") else [])
+    for vendor_id in vendor_ids:
+        yield Combo.vendors.through(combo_id=pk, vendor_id=vendor_id)
+
+
+def _map_customcombo(pk, fields):
+    yield CustomCombo(
+        pk=pk,
+        vendor_id=fields["vendor"],
+        title=fields.get("title", ""),
+        description=fields.get("description") or None,
+    )
+
+
+def _map_customcomboitem(pk, fields):
+    yield CustomComboItem(
+        pk=pk,
+        custom_combo_id=fields.get("custom_combo", fields.get("combo")),
+        menu_item_id=fields.get("menu_item"),
+        quantity=fields.get("quantity", 1),
+    )
+
+
+# `model` label in the dump → mapper yielding current model instances
+LEGACY_MAPPERS = {
+    "vendors.vendor": _map_vendor,
+    "vendors.combo": _map_combo,
+    "menuitem.combo": _map_combo,
+    "menuitem.menuitem": _map_menuitem,
+    "orders.customcombo": _map_customcombo,
+    "orders.customcomboitem": _map_customcomboitem,
+}
+
+# Columns refreshed when --on-conflict=update hits an existing primary key
+UPDATE_FIELDS = {
+    Vendor: ["name", "city", "pincode", "experience", "signature_dish", "image",
+             "available", "is_active", "vendor_code"],
+    MenuItem: ["vendor", "name", "category", "price", "is_available"],
+    Combo: ["name", "description", "price", "is_available"],
+    CustomCombo: ["vendor", "title", "description"],
+    CustomComboItem: ["custom_combo", "menu_item", "quantity"],
+}
+
+
+# ----------------------
+# Batched writer
+# ----------------------
+class LegacyImporter:
+    """Buffers mapped instances per model and flushes them with `bulk_create`."""
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE, on_conflict="ignore",
+                 using=DEFAULT_DB_ALIAS, dry_run=False):
+        if on_conflict not in ON_CONFLICT_CHOICES:
+            raise ValueError(f"on_conflict must be one of {ON_CONFLICT_CHOICES}")
+        self.batch_size = batch_size
+        self.on_conflict = on_conflict
+        self.using = using
+        self.dry_run = dry_run
+        self.buffers = {}   # model → pending instances (insertion order = FK order)
+        self.counts = {}    # model label → rows written
+        self.skipped = {}   # unknown legacy labels → rows skipped
+        self.vendor_ids = []  # imported vendor pks, for fill_vendor_slugs()
+
+    def import_file(self, path):
+        stream, encoding = open_json_stream(path)
+        logger.info(f"📥 Importing {path} ({encoding})")
+        with stream:
+            for record in iter_json_array(stream):
+                self.add_record(record)
+        self.flush()
+
+    def add_record(self, record):
+        label = str(record.get("model", "")).lower()
+        mapper = LEGACY_MAPPERS.get(label)
+        if mapper is None:
+            self.skipped[label] = self.skipped.get(label, 0) + 1
+            return
+        pk = record.get("pk")
+        try:
+            objs = list(mapper(pk, record.get("fields", {})))
+        except KeyError as exc:
+            raise LegacyImportError(f"{label} pk={pk}: missing required field {exc}") from exc
+        for obj in objs:
+            pending = self.buffers.setdefault(type(obj), [])
+            pending.append(obj)
+            if len(pending) >= self.batch_size:
+                self.flush()
+
+    def flush(self):
+        """Write every buffered model, parents first, in one transaction."""
+        if not any(self.buffers.values()):
+            return
+        model, objs = None, []
+        try:
+            with transaction.atomic(using=self.using):
+                for model, objs in self.buffers.items():
+                    if objs:
+                        self._write(model, objs)
+        except IntegrityError as exc:
+            raise LegacyImportError(self._describe_conflict(model, objs, exc)) from exc
+        for objs in self.buffers.values():
+            objs.clear()
+
+    def _describe_conflict(self, model, objs, exc):
+        """Name the row behind an IntegrityError: an existing primary key if there is one."""
+        pks = [obj.pk for obj in objs if obj.pk is not None]
+        existing = sorted(model.objects.using(self.using).filter(pk__in=pks).values_list("pk", flat=True))
+        if existing:
+            return f"{model._meta.label} pk={existing[0]} already exists (use --on-conflict ignore/update): {exc}"
+        span = f"pk={pks[0]}..{pks[-1]}" if pks else f"{len(objs)} row(s)"
+        return f"{model._meta.label} batch {span}: {exc}"
+
+    def _write(self, model, objs):
+        label = model._meta.label
+        self.counts[label] = self.counts.get(label, 0) + len(objs)
+        if self.dry_run:
+            return
+
+        if model is Vendor:
+            self.vendor_ids.extend(obj.pk for obj in objs)
+        kwargs = {"batch_size": self.batch_size}
+        update_fields = UPDATE_FIELDS.get(model)
+        if self.on_conflict == "update" and update_fields:
+            kwargs.update(update_conflicts=True, unique_fields=["id"], update_fields=update_fields)
+        elif self.on_conflict != "error":
+            kwargs["ignore_conflicts"] = True
+        model.objects.using(self.using).bulk_create(objs, **kwargs)
+
+    def reset_sequences(self):
+        """Explicit primary keys bypass the sequences on PostgreSQL; realign them."""
+        if self.dry_run or not self.counts:
+            return
+        connection = connections[self.using]
+        models = [m for m in self.buffers if m._meta.auto_field]
+        statements = connection.ops.sequence_reset_sql(no_style(), models)
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
+
+    def fill_vendor_slugs(self):
+        """
+        Give imported vendors without a slug one, as Vendor.save() would
+        (bulk_create skips save()); returns the number filled.
+        """
+        if self.dry_run or not self.vendor_ids:
+            return 0
+        vendors = Vendor.objects.using(self.using)
+        taken = set(vendors.exclude(slug__isnull=True).exclude(slug="").values_list("slug", flat=True))
+        changed = []
+        for i in range(0, len(self.vendor_ids), self.batch_size):
+            batch = self.vendor_ids[i:i + self.batch_size]
+            for vendor in vendors.filter(pk__in=batch, slug__isnull=True).only("id", "name", "slug"):
+                base = slugify(vendor.name)[:40] or f"vendor-{vendor.pk}"  # SlugField max_length=50
+                slug, counter = base, 1
+                while slug in taken:
+                    slug = f"{base}-{counter}"
+                    counter += 1
+                taken.add(slug)
+                vendor.slug = slug
+                changed.append(vendor)
+        vendors.bulk_update(changed, ["slug"], batch_size=self.batch_size)
+        return len(changed)
@@ -0,0 +1,115 @@
+# core/management/commands/bench.py
+import json
+import logging
+import platform
+import subprocess
+from datetime import datetime, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+
+from core import benchmarks
+from core.factories import ScalePlan, seed
+from vendors.models import Vendor
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark latency percentiles and query counts of the hot customer paths "
+        "on a seeded throwaway database; optionally gate against a baseline JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", choices=benchmarks.SCALES, default="smoke")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--iterations", type=int, default=50)
+        parser.add_argument("--warmup", type=int, default=5)
+        parser.add_argument("--only", nargs="*", help="Run only these case names.")
+        parser.add_argument("--output", help="Write results JSON to this path.")
+        parser.add_argument("--baseline", help="Results JSON of a previous run to gate against.")
+        parser.add_argument("--p95-tolerance", type=float, default=0.25,
+                            help="Allowed relative p95 growth before failing (default 0.25 = +25%%).")
+        parser.add_argument("--query-tolerance", type=int, default=0,
+                            help="Allowed extra queries per request before failing.")
+        parser.add_argument("--keepdb", action="store_true", help="Reuse (and keep) the seeded test database.")
+        parser.add_argument("--current-db", action="store_true",
+                            help="Benchmark the configured database as-is (no test DB, no seeding).")
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options["baseline"]:
+            try:
+                with open(options["baseline"]) as fh:
+                    baseline = json.load(fh)
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Cannot read baseline {options['baseline']}: {exc}") from exc
+
+        old_name = connection.settings_dict["NAME"]
+        if not options["current_db"]:
+            connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options["keepdb"])
+        try:
+            if not options["current_db"] and not Vendor.objects.exists():
+                self.stdout.write(f"🌱 Seeding '{options['scale']}' dataset…")
+                seed(ScalePlan(seed=options["seed"], **benchmarks.SCALES[options["scale"]]))
+
+            logging.disable(logging.CRITICAL)  # expected 5xx would flood stderr
+            try:
+                # One client hammers each route: rate limits would turn most cases into 429s
+                with override_settings(QUERY_INSTRUMENTATION_SAMPLE_RATE=0, RATE_LIMITS={}):
+                    ctx = benchmarks.BenchContext()
+                    results = benchmarks.run(
+                        benchmarks.default_cases(ctx),
+                        iterations=options["iterations"],
+                        warmup=options["warmup"],
+                        only=options["only"],
+                    )
+            finally:
+                logging.disable(logging.NOTSET)
+        finally:
+            if not options["current_db"]:
+                connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options["keepdb"])
+
+        report = {
+            "meta": {
+                "commit": _git_commit(),
+                "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "scale": "current-db" if options["current_db"] else options["scale"],
+                "seed": options["seed"],
+                "iterations": options["iterations"],
+                "python": platform.python_version(),
+                "database": connection.vendor,
+            },
+            "results": results,
+        }
+
+        self.stdout.write(f"{'case':32} {'p50':>9} {'p95':>9} {'p99':>9} {'queries':>8} {'5xx':>5}")
+        for name, r in results.items():
+            self.stdout.write(
+                f"{name:32} {r['p50_ms']:>8.2f}ms {r['p95_ms']:>7.2f}ms {r['p99_ms']:>7.2f}ms "
+                f"{r['queries']:>8} {r['errors']:>5}"
+            )
+
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                json.dump(report, fh, indent=2, sort_keys=True)
+            self.stdout.write(f"📄 Results written to {options['output']}")
+
+        if baseline is not None:
+            regressions = benchmarks.compare(
+                baseline, report,
+                p95_tolerance=options["p95_tolerance"],
+                query_tolerance=options["query_tolerance"],
+            )
+            if regressions:
+                raise CommandError("Benchmark regressions:\n  " + "\n  ".join(regressions))
+            self.stdout.write(self.style.SUCCESS("✅ No regressions against baseline."))
@@ -0,0 +1,194 @@
+# core/management/commands/bench_sqlite.py
+import json
+import multiprocessing
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmarks import percentile
+from streetkitchen.db.sqlite3.base import (
+    DEFAULT_TIMEOUT, DEFAULT_WAL_TRUNCATE_PAGES, PRAGMAS, WalCheckpointer, apply_pragmas,
+)
+
+# name → (connect timeout, PRAGMAs, BEGIN statement, checkpoint thread)
+PROFILES = {
+    # Django's stock sqlite3 backend: rollback journal, 5 s timeout, deferred transactions
+    "default": (5.0, {}, "BEGIN", False),
+    # streetkitchen.db.sqlite3
+    "tuned": (DEFAULT_TIMEOUT, {**PRAGMAS, "busy_timeout": int(DEFAULT_TIMEOUT * 1000)}, "BEGIN IMMEDIATE", True),
+}
+
+SCHEMA = """
+CREATE TABLE vendor (id INTEGER PRIMARY KEY, name TEXT, view_count INTEGER NOT NULL DEFAULT 0);
+CREATE TABLE customer_order (
+    id INTEGER PRIMARY KEY, vendor_id INTEGER NOT NULL, customer_id INTEGER NOT NULL,
+    status TEXT NOT NULL, total REAL NOT NULL, created_at REAL NOT NULL
+);
+CREATE INDEX customer_order_vendor ON customer_order (vendor_id, created_at);
+CREATE TABLE order_item (
+    id INTEGER PRIMARY KEY, order_id INTEGER NOT NULL, menu_item_id INTEGER NOT NULL,
+    quantity INTEGER NOT NULL, price REAL NOT NULL
+);
+CREATE TABLE order_tracking (
+    id INTEGER PRIMARY KEY, order_id INTEGER NOT NULL, status TEXT NOT NULL, created_at REAL NOT NULL
+);
+"""
+
+# Share of operations: vendor page view (+1 view_count), order placement, listing read
+MIX = (("view", 0.6), ("order", 0.3), ("read", 0.1))
+
+
+def _connect(path, profile):
+    timeout, pragmas, _, _ = PROFILES[profile]
+    conn = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+    apply_pragmas(conn, pragmas)
+    return conn
+
+
+def _create_db(path, profile, vendors):
+    conn = _connect(path, profile)
+    conn.executescript(SCHEMA)
+    conn.executemany("INSERT INTO vendor (id, name) VALUES (?, ?)", ((i, f"Vendor {i}") for i in range(1, vendors + 1)))
+    conn.close()
+
+
+def _place_order(conn, begin, rng, vendor_id):
+    # Read-then-write, like the order views: the read takes a SHARED lock first.
+    conn.execute(begin)
+    try:
+        conn.execute(
+            "SELECT COUNT(*) FROM customer_order WHERE vendor_id = ? AND created_at > ?",
+            (vendor_id, time.time() - 3600),
+        ).fetchone()
+        cur = conn.execute(
+            "INSERT INTO customer_order (vendor_id, customer_id, status, total, created_at) VALUES (?, ?, 'placed', ?, ?)",
+            (vendor_id, rng.randint(1, 10_000), rng.uniform(80, 600), time.time()),
+        )
+        order_id = cur.lastrowid
+        conn.executemany(
+            "INSERT INTO order_item (order_id, menu_item_id, quantity, price) VALUES (?, ?, ?, ?)",
+            [(order_id, rng.randint(1, 5_000), rng.randint(1, 4), rng.uniform(30, 200)) for _ in range(3)],
+        )
+        conn.execute(
+            "INSERT INTO order_tracking (order_id, status, created_at) VALUES (?, 'placed', ?)", (order_id, time.time())
+        )
+        conn.execute("COMMIT")
+    except sqlite3.Error:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+
+
+def _worker(args):
+    path, profile, vendors, start_at, seconds, seed = args
+    begin = PROFILES[profile][2]
+    rng = random.Random(seed)
+    conn = _connect(path, profile)
+    latencies = {name: [] for name, _ in MIX}
+    errors = {name: 0 for name, _ in MIX}
+
+    time.sleep(max(0.0, start_at - time.time()))
+    deadline = start_at + seconds
+    while time.time() < deadline:
+        roll, kind = rng.random(), MIX[-1][0]
+        for name, share in MIX:
+            if roll < share:
+                kind = name
+                break
+            roll -= share
+        vendor_id = rng.randint(1, vendors)
+        started = time.perf_counter()
+        try:
+            if kind == "view":
+                conn.execute("UPDATE vendor SET view_count = view_count + 1 WHERE id = ?", (vendor_id,))
+            elif kind == "order":
+                _place_order(conn, begin, rng, vendor_id)
+            else:
+                conn.execute("SELECT id, name FROM vendor ORDER BY view_count DESC LIMIT 20").fetchall()
+        except sqlite3.OperationalError:
+            errors[kind] += 1
+            continue
+        latencies[kind].append((time.perf_counter() - started) * 1000)
+    conn.close()
+    return latencies, errors
+
+
+def run_profile(profile, writers, seconds, vendors, seed):
+    with tempfile.TemporaryDirectory(prefix=f"bench-sqlite-{profile}-") as tmp:
+        path = os.path.join(tmp, "bench.sqlite3")
+        _create_db(path, profile, vendors)
+        checkpointer = None
+        if PROFILES[profile][3]:
+            checkpointer = WalCheckpointer(path, 1.0, DEFAULT_WAL_TRUNCATE_PAGES)
+            checkpointer.start()
+
+        start_at = time.time() + 0.5
+        tasks = [(path, profile, vendors, start_at, seconds, seed + i) for i in range(writers)]
+        max_wal = 0
+        with multiprocessing.Pool(writers) as pool:
+            pending = pool.map_async(_worker, tasks)
+            while not pending.ready():
+                try:
+                    max_wal = max(max_wal, os.path.getsize(f"{path}-wal"))
+                except OSError:
+                    pass
+                pending.wait(0.05)
+            results = pending.get()
+        if checkpointer:
+            checkpointer.stop()
+
+    report = {"profile": profile, "writers": writers, "seconds": seconds, "max_wal_bytes": max_wal, "ops": {}}
+    total = 0
+    for kind, _ in MIX:
+        timings = sorted(t for latencies, _ in results for t in latencies[kind])
+        total += len(timings)
+        report["ops"][kind] = {
+            "ok": len(timings),
+            "locked": sum(errors[kind] for _, errors in results),
+            "per_sec": round(len(timings) / seconds, 1),
+            "p50_ms": round(percentile(timings, 50), 3),
+            "p99_ms": round(percentile(timings, 99), 3),
+        }
+    report["per_sec"] = round(total / seconds, 1)
+    return report
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare SQLite write throughput and 'database is locked' errors between Django's "
+        "default sqlite3 settings and the tuned streetkitchen.db.sqlite3 profile."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--writers", type=int, default=8, help="Concurrent writer processes.")
+        parser.add_argument("--seconds", type=float, default=5.0, help="Duration per profile.")
+        parser.add_argument("--vendors", type=int, default=200)
+        parser.add_argument("--profiles", nargs="*", choices=PROFILES, default=list(PROFILES))
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", help="Write results JSON to this path.")
+
+    def handle(self, *args, **options):
+        if options["writers"] < 1 or options["seconds"] <= 0:
+            raise CommandError("--writers must be at least 1 and --seconds positive")
+
+        reports = []
+        for profile in options["profiles"]:
+            report = run_profile(profile, options["writers"], options["seconds"], options["vendors"], options["seed"])
+            reports.append(report)
+            self.stdout.write(f"{profile}: {report['per_sec']:,} ops/s, max WAL {report['max_wal_bytes']:,} bytes")
+            for kind, row in report["ops"].items():
+                self.stdout.write(
+                    f"  {kind:6} {row['per_sec']:>9,}/s  locked {row['locked']:>6,}  "
+                    f"p50 {row['p50_ms']:8.2f}ms  p99 {row['p99_ms']:8.2f}ms"
+                )
+
+        if len(reports) == 2 and reports[0]["per_sec"]:
+            ratio = reports[1]["per_sec"] / reports[0]["per_sec"]
+            self.stdout.write(self.style.SUCCESS(f"✅ {reports[1]['profile']} vs {reports[0]['profile']}: {ratio:.2f}x ops/s"))
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                json.dump(reports, fh, indent=2)
@@ -0,0 +1,115 @@
+# core/management/commands/bench_startup.py
+import argparse
+import json
+import logging
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from vendors.models import Vendor
+
+
+def _urls():
+    """(name, path) of the pages a fresh worker typically serves first."""
+    vendor = (
+        Vendor.objects.filter(is_active=True, vendor_code__isnull=False)
+        .order_by("-view_count", "id").first()
+    )
+    if vendor is None:
+        raise CommandError("No active vendor — seed data first.")
+    return [
+        ("home", reverse("core:home")),
+        ("vendor_detail", reverse("vendors:vendor_detail", args=[vendor.vendor_code])),
+        ("combo_builder", reverse("vendors:combo_builder", args=[vendor.vendor_code])),
+        ("search_pincode", f"{reverse('core:search_vendor')}?query={vendor.pincode or ''}"),
+        ("frequently_together", reverse("vendors:frequently_together_api", args=[vendor.vendor_code])),
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare first-request latency of a cold process with one warmed by core.warmup "
+        "(what gunicorn.conf.py does in the master before fork). Each round starts fresh "
+        "Python processes against the configured database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rounds", type=int, default=5)
+        parser.add_argument("--vendors", type=int, default=200, help="Vendors warmed in warm mode.")
+        parser.add_argument("--output", help="Write results JSON to this path.")
+        # Internal: a spawned measuring process and the pages it requests
+        parser.add_argument("--child", choices=["cold", "warm"], help=argparse.SUPPRESS)
+        parser.add_argument("--paths", help=argparse.SUPPRESS)
+
+    def handle(self, *args, **options):
+        if options["child"]:
+            return self._child(options["child"], options["vendors"], json.loads(options["paths"]))
+
+        # Resolved here so the measured processes don't touch the URL resolver first
+        paths = json.dumps(_urls())
+        runs = {"cold": [], "warm": []}
+        for _ in range(options["rounds"]):
+            for mode in runs:
+                runs[mode].append(self._spawn(mode, options["vendors"], paths))
+
+        names = list(runs["cold"][0]["first"])
+        report = {"rounds": options["rounds"], "warmup_ms": _median(r["warmup_ms"] for r in runs["warm"]), "pages": {}}
+        self.stdout.write(f"{'page':22} {'cold 1st':>10} {'warm 1st':>10} {'steady':>10}")
+        for name in names:
+            row = {
+                "cold_first_ms": _median(r["first"][name] for r in runs["cold"]),
+                "warm_first_ms": _median(r["first"][name] for r in runs["warm"]),
+                "steady_ms": _median(r["second"][name] for r in runs["cold"] + runs["warm"]),
+            }
+            report["pages"][name] = row
+            self.stdout.write(
+                f"{name:22} {row['cold_first_ms']:>8.1f}ms {row['warm_first_ms']:>8.1f}ms {row['steady_ms']:>8.1f}ms"
+            )
+        self.stdout.write(f"🔥 warmup itself (paid once, in the master): {report['warmup_ms']:.0f}ms")
+
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                json.dump(report, fh, indent=2, sort_keys=True)
+            self.stdout.write(f"📄 Results written to {options['output']}")
+
+    def _spawn(self, mode, vendors, paths):
+        cmd = [
+            sys.executable, str(settings.BASE_DIR / "manage.py"), "bench_startup",
+            "--child", mode, "--vendors", str(vendors), "--paths", paths,
+        ]
+        proc = subprocess.run(cmd, capture_output=True, text=True)
+        if proc.returncode:
+            raise CommandError(f"{mode} run failed:\n{proc.stderr}")
+        # Last line is the result; anything before it is stray output
+        return json.loads(proc.stdout.strip().splitlines()[-1])
+
+    def _child(self, mode, vendors, urls):
+        logging.disable(logging.CRITICAL)
+        warmup_ms = 0.0
+        if mode == "warm":
+            from core import warmup
+
+            started = time.perf_counter()
+            warmup.warm(vendors=vendors)
+            warmup_ms = (time.perf_counter() - started) * 1000
+
+        client = Client()
+        result = {"warmup_ms": warmup_ms, "first": {}, "second": {}}
+        with override_settings(QUERY_INSTRUMENTATION_SAMPLE_RATE=0):
+            for attempt in ("first", "second"):
+                for name, url in urls:
+                    started = time.perf_counter()
+                    client.get(url)
+                    result[attempt][name] = (time.perf_counter() - started) * 1000
+        self.stdout.write(json.dumps(result))
+
+
+def _median(values):
+    return round(statistics.median(list(values)), 2)
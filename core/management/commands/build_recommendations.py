@@ -0,0 +1,98 @@
+# core/management/commands/build_recommendations.py
+import multiprocessing
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, DEFAULT_DB_ALIAS
+
+from core import recommender
+from orders.models import Order
+
+VENDOR_CHUNK = 50
+
+
+def _init_worker():
+    # Needed under the spawn/forkserver start methods; a no-op after fork.
+    import django
+    django.setup()
+
+
+def _count_chunk(task):
+    vendor_ids, upto_id, using = task
+    try:
+        counts = recommender.count_baskets(vendor_ids=vendor_ids, upto_id=upto_id, using=using)
+        return {vendor_id: (c, c.neighbours()) for vendor_id, c in counts.items()}
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = (
+        "Update the \"frequently ordered together\" index from orders placed since the last "
+        "run. Use --full nightly: it recounts every vendor in a process pool (and drops "
+        "orders cancelled after they were counted)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--full", action="store_true", help="Recount every vendor from scratch.")
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        if options["workers"] < 1:
+            raise CommandError("--workers must be at least 1")
+        using = options["database"]
+        started = time.perf_counter()
+
+        state = None if options["full"] else recommender.RecommenderState.load()
+        upto = recommender.settled_high_water(using=using)
+
+        if state is None:
+            state = self.full_build(upto, options["workers"], using)
+            changed = len(state.counts)
+        elif upto > state.high_water or state.drafts:
+            changed = recommender.update(state, upto, using=using)
+            if not changed:
+                state.save()  # high-water mark / waiting drafts moved, the index didn't
+                self.stdout.write("Nothing new since the last run.")
+                return
+        else:
+            self.stdout.write("Nothing new since the last run.")
+            return
+
+        items, entries = recommender.write_index(state.rows)
+        state.save()
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Re-ranked {changed:,} vendors up to order #{state.high_water}: "
+            f"{items:,} items, {entries:,} suggestions in {time.perf_counter() - started:.2f}s."
+        ))
+
+    def full_build(self, upto, workers, using):
+        vendor_ids = sorted(
+            Order.objects.using(using).filter(id__lte=upto).order_by().values_list("vendor_id", flat=True).distinct()
+        )
+        tasks = [
+            (vendor_ids[i:i + VENDOR_CHUNK], upto, using)
+            for i in range(0, len(vendor_ids), VENDOR_CHUNK)
+        ]
+        drafts = recommender.draft_ids(upto_id=upto, using=using)
+        state = recommender.RecommenderState(high_water=upto, drafts=drafts)
+
+        # Children must open their own connections.
+        connections.close_all()
+        if workers > 1 and len(tasks) > 1:
+            with multiprocessing.Pool(min(workers, len(tasks)), initializer=_init_worker) as pool:
+                results = pool.imap_unordered(_count_chunk, tasks)
+                for chunk in results:
+                    self.collect(state, chunk)
+        else:
+            for task in tasks:
+                self.collect(state, _count_chunk(task))
+        return state
+
+    @staticmethod
+    def collect(state, chunk):
+        for vendor_id, (counts, rows) in chunk.items():
+            state.counts[vendor_id] = counts
+            state.rows[vendor_id] = rows
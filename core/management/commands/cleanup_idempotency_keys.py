@@ -0,0 +1,20 @@
+# core/management/commands/cleanup_idempotency_keys.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from orders.idempotency import clear_expired
+
+
+class Command(BaseCommand):
+    help = "Delete expired idempotency keys (orders/idempotency.py) in batches. Safe to run from cron."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5_000, help="Rows deleted per statement.")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        deleted = clear_expired(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Deleted {deleted:,} expired idempotency keys ({time.perf_counter() - started:.2f}s)."
+        ))
@@ -0,0 +1,23 @@
+# core/management/commands/cleanup_sessions.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.sessions import SessionStore
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired rows from django_session in batches, so the cleanup never holds "
+        "one long delete on a large table. Safe to run from cron while the site is live."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5_000, help="Rows deleted per statement.")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        deleted = SessionStore.clear_expired(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Deleted {deleted:,} expired sessions ({time.perf_counter() - started:.2f}s)."
+        ))
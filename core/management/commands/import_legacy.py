@@ -0,0 +1,54 @@
+# core/management/commands/import_legacy.py
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from core.legacy_import import LegacyImporter, DEFAULT_BATCH_SIZE, ON_CONFLICT_CHOICES
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream legacy dumpdata files (vendors.json, menuitems.json, orders.json) "
+        "into the current schema using batched bulk_create."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "paths", nargs="+",
+            help="Fixture files, in dependency order (vendors → menu items → orders).",
+        )
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument(
+            "--on-conflict", choices=ON_CONFLICT_CHOICES, default="ignore",
+            help="What to do with rows whose primary key already exists.",
+        )
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+        parser.add_argument("--dry-run", action="store_true", help="Parse and map without writing.")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1")
+
+        importer = LegacyImporter(
+            batch_size=options["batch_size"],
+            on_conflict=options["on_conflict"],
+            using=options["database"],
+            dry_run=options["dry_run"],
+        )
+
+        for path in options["paths"]:
+            try:
+                importer.import_file(path)
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Failed to import {path}: {exc}") from exc
+        importer.reset_sequences()
+        slugs = importer.fill_vendor_slugs()
+
+        for label, count in importer.counts.items():
+            self.stdout.write(f"{label}: {count} row(s)")
+        if slugs:
+            self.stdout.write(f"Generated slugs for {slugs} vendor(s)")
+        for label, count in importer.skipped.items():
+            self.stdout.write(self.style.WARNING(f"Skipped {count} row(s) of unknown model '{label}'"))
+
+        verb = "Mapped" if options["dry_run"] else "Imported"
+        self.stdout.write(self.style.SUCCESS(f"✅ {verb} {sum(importer.counts.values())} row(s)."))
@@ -0,0 +1,80 @@
+# core/management/commands/load_pincodes.py
+import csv
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from core.models import Pincode
+
+# Accepted header spellings (India Post exports use pincode / district / latitude / longitude)
+COLUMNS = {
+    "code": ("code", "pincode", "pin"),
+    "city": ("city", "district", "districtname"),
+    "latitude": ("latitude", "lat"),
+    "longitude": ("longitude", "lon", "lng"),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Load pincode centroids (code, city, latitude, longitude) from a CSV for proximity "
+        "search. Rows repeating a pincode (one per post office) are averaged."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", nargs="?", default=settings.PINCODE_CSV)
+        parser.add_argument("--batch-size", type=int, default=2_000)
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            fh = open(options["path"], newline="", encoding="utf-8-sig")
+        except OSError as e:
+            raise CommandError(f"Cannot read {options['path']}: {e}")
+
+        with fh:
+            reader = csv.DictReader(fh)
+            headers = {h.strip().lower(): h for h in reader.fieldnames or ()}
+            column = {
+                field: next((headers[name] for name in names if name in headers), None)
+                for field, names in COLUMNS.items()
+            }
+            if not all(column[f] for f in ("code", "latitude", "longitude")):
+                raise CommandError(f"CSV needs pincode, latitude and longitude columns; got {reader.fieldnames}")
+
+            sums = defaultdict(lambda: [0.0, 0.0, 0, ""])
+            skipped = 0
+            for row in reader:
+                try:
+                    code = row[column["code"]].strip()
+                    lat, lon = float(row[column["latitude"]]), float(row[column["longitude"]])
+                except (TypeError, ValueError):
+                    skipped += 1
+                    continue
+                if not code or not (-90 <= lat <= 90 and -180 <= lon <= 180):
+                    skipped += 1
+                    continue
+                entry = sums[code]
+                entry[0] += lat
+                entry[1] += lon
+                entry[2] += 1
+                if column["city"] and not entry[3]:
+                    entry[3] = (row[column["city"]] or "").strip().title()
+
+        rows = [
+            Pincode(code=code, city=city, latitude=round(lat / n, 6), longitude=round(lon / n, 6))
+            for code, (lat, lon, n, city) in sums.items()
+        ]
+        Pincode.objects.using(options["database"]).bulk_create(
+            rows, batch_size=options["batch_size"],
+            update_conflicts=True, unique_fields=["code"],
+            update_fields=["latitude", "longitude"] + (["city"] if column["city"] else []),
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Loaded {len(rows):,} pincode centroids ({skipped:,} rows skipped) "
+            f"in {time.perf_counter() - started:.2f}s."
+        ))
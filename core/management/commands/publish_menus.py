@@ -0,0 +1,33 @@
+# core/management/commands/publish_menus.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from vendors import snapshots
+from vendors.models import Vendor
+
+
+class Command(BaseCommand):
+    help = (
+        "Write the static JSON menu snapshots (vendors/snapshots.py) of active vendors. "
+        "Signals republish after admin edits; run this after bulk imports or on each "
+        "app server after a deploy when MENU_SNAPSHOT_ROOT isn't shared."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("vendor_codes", nargs="*", help="Only these vendors (default: all active).")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        vendors = Vendor.objects.filter(is_active=True, vendor_code__isnull=False)
+        if options["vendor_codes"]:
+            vendors = vendors.filter(vendor_code__in=options["vendor_codes"])
+
+        published = 0
+        for vendor_id in vendors.order_by("id").values_list("id", flat=True).iterator():
+            if snapshots.publish(vendor_id) is not None:
+                published += 1
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Published menu snapshots of {published:,} vendors to {snapshots.snapshot_root()} "
+            f"({time.perf_counter() - started:.2f}s)."
+        ))
@@ -0,0 +1,20 @@
+# core/management/commands/rebuild_fulfilment.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from vendors import fulfilment
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute which vendors can serve which combos. Signals keep the table current "
+        "after admin edits; run this after bulk imports (seed_scale, import_legacy)."
+    )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        pairs = fulfilment.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {pairs:,} vendor × combo pairs can be fulfilled ({time.perf_counter() - started:.2f}s)."
+        ))
@@ -0,0 +1,22 @@
+# core/management/commands/refresh_nutrition.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from menuitem import nutrition
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-derive menu item nutrients from their recipes (ingredient table) and store "
+        "nutrition labels on every Combo and CustomCombo in one pass."
+    )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        items = nutrition.derive_menu_items()
+        combos, custom_combos = nutrition.refresh_labels()
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Derived {items:,} menu items from recipes; relabelled {combos:,} combos and "
+            f"{custom_combos:,} custom combos in {time.perf_counter() - started:.2f}s."
+        ))
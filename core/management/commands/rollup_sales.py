@@ -0,0 +1,26 @@
+# core/management/commands/rollup_sales.py
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from core import rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "Update the per-vendor daily sales rollups from orders created or changed since "
+        "the last run (high-water mark on Order.updated_at). Run it every few minutes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--full", action="store_true", help="Rebuild every vendor-day from scratch.")
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        result = rollups.refresh(using=options["database"], full=options["full"])
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Rebuilt {result['vendor_days']:,} vendor-days (high-water {result['high_water']}) "
+            f"in {time.perf_counter() - started:.2f}s."
+        ))
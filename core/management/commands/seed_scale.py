@@ -0,0 +1,106 @@
+# core/management/commands/seed_scale.py
+import multiprocessing
+import os
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, DEFAULT_DB_ALIAS
+
+from core import factories
+
+
+def _init_worker():
+    # Needed under the spawn/forkserver start methods; a no-op after fork.
+    import django
+    django.setup()
+
+
+def _write_chunk(task):
+    plan, phase, start, stop, batch_size, using = task
+    try:
+        return factories.write_chunk(plan, phase, start, stop, batch_size, using)
+    finally:
+        connections.close_all()
+
+
+def _compile_chunk(task):
+    plan, phase, start, stop, batch_size, using = task
+    rows = factories.build_chunk(plan, phase, start, stop)
+    return factories.compile_rows(rows, batch_size, using), stop - start
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a deterministic synthetic dataset (vendors, menus, combos, customers, "
+        "orders with items and tracking history) in parallel worker processes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--vendors", type=int, default=1_000)
+        parser.add_argument("--items-per-vendor", type=int, default=12)
+        parser.add_argument("--combos", type=int, default=200)
+        parser.add_argument("--customers", type=int, default=50_000)
+        parser.add_argument("--orders", type=int, default=100_000)
+        parser.add_argument("--days", type=int, default=90, help="Spread orders over this many days.")
+        parser.add_argument("--end-date", type=date.fromisoformat,
+                            help="Last order day (YYYY-MM-DD). Defaults to today; fix it for byte-identical reruns.")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+        parser.add_argument("--chunk", type=int, default=10_000, help="Rows per worker transaction.")
+        parser.add_argument("--batch-size", type=int, default=5_000, help="Rows per INSERT statement.")
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        if options["workers"] < 1 or options["chunk"] < 1:
+            raise CommandError("--workers and --chunk must be at least 1")
+        using = options["database"]
+
+        plan = factories.ScalePlan.for_database(
+            using=using,
+            seed=options["seed"],
+            vendors=options["vendors"],
+            items_per_vendor=options["items_per_vendor"],
+            customers=options["customers"],
+            orders=options["orders"],
+            combos=options["combos"],
+            days=options["days"],
+            end_date=options["end_date"],
+        )
+        factories.bulk_insert(plan.pincode_rows(), options["batch_size"], using, ignore_conflicts=True)
+
+        workers = options["workers"]
+        # SQLite allows a single writer: workers build and compile the INSERTs,
+        # this process only executes them.
+        parent_writes = connections[using].vendor == "sqlite"
+
+        # Children must open their own connections.
+        connections.close_all()
+        started = time.perf_counter()
+        pool = multiprocessing.Pool(workers, initializer=_init_worker) if workers > 1 else None
+        try:
+            for phase in factories.PHASES:
+                phase_started = time.perf_counter()
+                tasks = [
+                    (plan, phase, start, stop, options["batch_size"], using)
+                    for start, stop in factories.chunk_ranges(plan, phase, options["chunk"])
+                ]
+                if parent_writes:
+                    done = 0
+                    compiled = pool.imap_unordered(_compile_chunk, tasks) if pool else map(_compile_chunk, tasks)
+                    for statements, count in compiled:
+                        factories.execute_statements(statements, using)
+                        done += count
+                else:
+                    done = sum(pool.imap_unordered(_write_chunk, tasks) if pool else map(_write_chunk, tasks))
+                self.stdout.write(f"  {phase:10} {done:>10,} in {time.perf_counter() - phase_started:6.1f}s")
+        finally:
+            if pool:
+                pool.close()
+                pool.join()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Seeded {plan.vendors:,} vendors, {plan.vendors * plan.items_per_vendor:,} menu items, "
+            f"{plan.combos:,} combos, {plan.customers:,} customers and {plan.orders:,} orders "
+            f"in {time.perf_counter() - started:.1f}s."
+        ))
@@ -0,0 +1,304 @@
+# core/metrics.py
+"""
+Minimal Prometheus-style metrics without external dependencies.
+
+Each process records into plain dicts (no locks on the hot path). When
+`METRICS_MULTIPROC_DIR` is set, every process periodically dumps its values to
+`<dir>/metrics_<pid>.json`; the process answering `/metrics` merges all files,
+so counters survive worker recycling and gauges only count live workers.
+"""
+import atexit
+import bisect
+import fcntl
+import json
+import os
+import time
+from math import inf
+
+from django.conf import settings
+
+FLUSH_INTERVAL = 1.0  # seconds between per-process dumps
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+_ARCHIVE_FILE = "metrics_archive.json"
+_LOCK_FILE = "metrics.lock"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _format_labels(names, values, extra=None) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value) -> str:
+    if value == inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+# ----------------------
+# Metric types
+# ----------------------
+class _Metric:
+    kind = ""
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}  # label values tuple → value
+
+    def _key(self, labels):
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def reset(self):
+        self.values = {}
+
+    def merge(self, values, into):
+        for key, value in values.items():
+            into[key] = into.get(key, 0) + value
+
+    def render(self, values):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for key in sorted(values):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(values[key])}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """Gauges are summed over live processes only."""
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        self.values[self._key(labels)] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        # [count per bucket..., +Inf bucket, sum]
+        slots = self.values.get(key)
+        if slots is None:
+            slots = self.values[key] = [0] * (len(self.buckets) + 2)
+        slots[bisect.bisect_left(self.buckets, value)] += 1
+        slots[-1] += value
+
+    def merge(self, values, into):
+        for key, slots in values.items():
+            current = into.get(key)
+            into[key] = list(slots) if current is None else [a + b for a, b in zip(current, slots)]
+
+    def render(self, values):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for key in sorted(values):
+            slots = values[key]
+            cumulative = 0
+            for bound, count in zip(self.buckets + (inf,), slots[:-1]):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(slots[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+# ----------------------
+# Registry
+# ----------------------
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+        self._last_flush = 0.0
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def reset(self):
+        for metric in self.metrics.values():
+            metric.reset()
+
+    # ---- multiprocess mode ----
+    @property
+    def directory(self):
+        return getattr(settings, "METRICS_MULTIPROC_DIR", None)
+
+    def _dump(self):
+        return {
+            name: [[list(key), value] for key, value in metric.values.items()]
+            for name, metric in self.metrics.items() if metric.values
+        }
+
+    def flush(self):
+        """Write this process's values to its own file (atomic replace)."""
+        directory = self.directory
+        if not directory:
+            return
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"metrics_{os.getpid()}.json")
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as fh:
+            json.dump(self._dump(), fh)
+        os.replace(tmp, path)
+        self._last_flush = time.monotonic()
+
+    def maybe_flush(self):
+        if self.directory and time.monotonic() - self._last_flush >= FLUSH_INTERVAL:
+            self.flush()
+
+    def _read(self, path):
+        try:
+            with open(path) as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            return {}
+        return {name: {tuple(k): v for k, v in rows} for name, rows in data.items()}
+
+    def _merge_into(self, merged, data, include_gauges=True):
+        for name, values in data.items():
+            metric = self.metrics.get(name)
+            if metric is None or (isinstance(metric, Gauge) and not include_gauges):
+                continue
+            metric.merge(values, merged.setdefault(name, {}))
+
+    def _compact(self, directory):
+        """Fold files of dead workers into the archive so the directory stays small."""
+        with open(os.path.join(directory, _LOCK_FILE), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            archive_path = os.path.join(directory, _ARCHIVE_FILE)
+            archive = {}
+            self._merge_into(archive, self._read(archive_path), include_gauges=False)
+            dead = []
+            for filename in os.listdir(directory):
+                pid = _pid_from_filename(filename)
+                if pid is not None and not _pid_alive(pid):
+                    self._merge_into(archive, self._read(os.path.join(directory, filename)), include_gauges=False)
+                    dead.append(filename)
+            if dead:
+                tmp = f"{archive_path}.tmp"
+                with open(tmp, "w") as fh:
+                    json.dump({n: [[list(k), v] for k, v in vals.items()] for n, vals in archive.items()}, fh)
+                os.replace(tmp, archive_path)
+                for filename in dead:
+                    os.remove(os.path.join(directory, filename))
+            return archive
+
+    def collect(self):
+        """Return {metric name: {labels: value}} merged over all processes."""
+        directory = self.directory
+        if not directory:
+            return {name: metric.values for name, metric in self.metrics.items()}
+
+        self.flush()
+        merged = {}
+        self._merge_into(merged, self._compact(directory))
+        for filename in os.listdir(directory):
+            if _pid_from_filename(filename) is not None:
+                self._merge_into(merged, self._read(os.path.join(directory, filename)))
+        return merged
+
+    def render(self):
+        collected = self.collect()
+        lines = []
+        for name, metric in self.metrics.items():
+            lines.extend(metric.render(collected.get(name, {})))
+        return "\n".join(lines) + "\n"
+
+
+def _pid_from_filename(filename):
+    if filename.startswith("metrics_") and filename.endswith(".json"):
+        pid = filename[len("metrics_"):-len(".json")]
+        return int(pid) if pid.isdigit() else None
+    return None
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+REGISTRY = Registry()
+
+# A forked worker must not re-report what the (preloaded) master recorded.
+os.register_at_fork(after_in_child=REGISTRY.reset)
+atexit.register(lambda: REGISTRY.flush())
+
+
+# ----------------------
+# Application metrics
+# ----------------------
+REQUEST_LATENCY = REGISTRY.histogram(
+    "http_request_duration_seconds", "Request latency by URL name.", ["url_name", "method"],
+)
+REQUESTS = REGISTRY.counter(
+    "http_requests_total", "Requests by URL name and status code.", ["url_name", "method", "status"],
+)
+DB_QUERIES = REGISTRY.histogram(
+    "db_queries_per_request", "Database queries executed per request.", ["url_name"],
+    buckets=QUERY_COUNT_BUCKETS,
+)
+DB_TIME = REGISTRY.histogram(
+    "db_time_per_request_seconds", "Time spent in the database per request.", ["url_name"],
+)
+CACHE_LOOKUPS = REGISTRY.counter(
+    "cache_lookups_total", "Cache lookups by cache name and result (hit/miss).", ["cache", "result"],
+)
+ORDERS_PLACED = REGISTRY.counter(
+    "orders_placed_total", "Orders created, per vendor id.", ["vendor_id"],
+)
+SSE_CONNECTIONS = REGISTRY.gauge(
+    "sse_connections", "Open server-sent-event streams.", ["stream"],
+)
+REQUESTS_SHED = REGISTRY.counter(
+    "http_requests_shed_total", "Requests refused by rate limits (429) or admission control (503).", ["reason"],
+)
+JOB_QUEUE_DEPTH = REGISTRY.gauge(
+    "job_queue_depth", "Pending items per background job queue.", ["queue"],
+)
+
+
+def record_cache_lookup(cache_name: str, hit: bool):
+    CACHE_LOOKUPS.inc(cache=cache_name, result="hit" if hit else "miss")
@@ -0,0 +1,396 @@
+# core/middleware.py
+import json
+import logging
+import random
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseNotModified, JsonResponse
+from django.urls import Resolver404, resolve
+
+from . import db_router, metrics, pagecache, ratelimit
+
+logger = logging.getLogger(__name__)
+
+# `IN (%s, %s, %s)` → `IN (%s, ...)` so batches of different sizes share a signature
+_PLACEHOLDER_LIST = re.compile(r"%s(?:\s*,\s*%s)+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def query_signature(sql: str) -> str:
+    """Normalize a parametrized SQL string into a signature for duplicate detection."""
+    sql = _PLACEHOLDER_LIST.sub("%s, ...", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+# ----------------------
+# Query Recorder
+# ----------------------
+class QueryRecorder:
+    """`connection.execute_wrapper` callable counting queries and DB time."""
+
+    def __init__(self, track_signatures=True):
+        self.count = 0
+        self.duration = 0.0
+        self.signatures = Counter()
+        self.track_signatures = track_signatures
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            if self.track_signatures:
+                self.signatures[query_signature(sql)] += 1
+
+    def duplicates(self, threshold=2):
+        """Signatures executed at least `threshold` times, most repeated first."""
+        return [(sig, n) for sig, n in self.signatures.most_common() if n >= threshold]
+
+
+def _instrument_connections(stack, recorder):
+    for conn in connections.all():
+        stack.enter_context(conn.execute_wrapper(recorder))
+
+
+def _call_instrumented(get_response, request, recorder):
+    with ExitStack() as stack:
+        _instrument_connections(stack, recorder)
+        return get_response(request)
+
+
+async def _acall_instrumented(get_response, request, recorder):
+    # The async ORM runs queries on the request's thread-sensitive executor
+    # thread, whose connection objects differ from the event loop's; install
+    # (and remove) the wrappers there.
+    stack = ExitStack()
+    await sync_to_async(_instrument_connections)(stack, recorder)
+    try:
+        return await get_response(request)
+    finally:
+        await sync_to_async(stack.close)()
+
+
+def _url_name(request):
+    match = getattr(request, "resolver_match", None)
+    return match.view_name if match else "<unmatched>"
+
+
+# ----------------------
+# Per-request instrumentation
+# ----------------------
+class QueryInstrumentationMiddleware:
+    """
+    Record query count, DB time, duplicate queries and view time for a sample
+    of requests. Sampled responses get a `Server-Timing` header and one
+    JSON log line on the `core.middleware` logger.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = float(getattr(settings, "QUERY_INSTRUMENTATION_SAMPLE_RATE", 0.0))
+        self.n_plus_one_threshold = getattr(settings, "QUERY_INSTRUMENTATION_N_PLUS_ONE", 5)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def _sampled(self):
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self._sampled():
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        response = _call_instrumented(self.get_response, request, recorder)
+        return self._finish(request, response, recorder, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        if not self._sampled():
+            return await self.get_response(request)
+
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        response = await _acall_instrumented(self.get_response, request, recorder)
+        return self._finish(request, response, recorder, time.perf_counter() - start)
+
+    def _finish(self, request, response, recorder, view_time):
+        request.query_recorder = recorder
+        self._add_server_timing(response, recorder, view_time)
+        self._log(request, response, recorder, view_time)
+        return response
+
+    def _add_server_timing(self, response, recorder, view_time):
+        db_ms = recorder.duration * 1000
+        view_ms = view_time * 1000
+        timing = (
+            f'db;dur={db_ms:.1f};desc="{recorder.count} queries", '
+            f"app;dur={view_ms - db_ms:.1f}, "
+            f"total;dur={view_ms:.1f}"
+        )
+        existing = response.get("Server-Timing")
+        response["Server-Timing"] = f"{existing}, {timing}" if existing else timing
+
+    def _log(self, request, response, recorder, view_time):
+        n_plus_one = recorder.duplicates(self.n_plus_one_threshold)
+        record = {
+            "event": "request_queries",
+            "method": request.method,
+            "path": request.path,
+            "view": _url_name(request),
+            "status": response.status_code,
+            "queries": recorder.count,
+            "db_ms": round(recorder.duration * 1000, 2),
+            "view_ms": round(view_time * 1000, 2),
+            "duplicate_queries": sum(n - 1 for _, n in recorder.duplicates()),
+            "n_plus_one": [{"sql": sig[:200], "count": n} for sig, n in n_plus_one],
+        }
+        level = logging.WARNING if n_plus_one else logging.INFO
+        logger.log(level, json.dumps(record, ensure_ascii=False))
+
+
+# ----------------------
+# Prometheus metrics
+# ----------------------
+class MetricsMiddleware:
+    """Feed request latency, status codes and per-request DB usage into `core.metrics`."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        recorder = QueryRecorder(track_signatures=False)
+        start = time.perf_counter()
+        response = _call_instrumented(self.get_response, request, recorder)
+        return self._record(request, response, recorder, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        recorder = QueryRecorder(track_signatures=False)
+        start = time.perf_counter()
+        response = await _acall_instrumented(self.get_response, request, recorder)
+        return self._record(request, response, recorder, time.perf_counter() - start)
+
+    def _record(self, request, response, recorder, elapsed):
+        url_name = _url_name(request)
+        metrics.REQUEST_LATENCY.observe(elapsed, url_name=url_name, method=request.method)
+        metrics.REQUESTS.inc(url_name=url_name, method=request.method, status=response.status_code)
+        metrics.DB_QUERIES.observe(recorder.count, url_name=url_name)
+        metrics.DB_TIME.observe(recorder.duration, url_name=url_name)
+        metrics.REGISTRY.maybe_flush()
+        return response
+
+
+# ----------------------
+# Read replicas
+# ----------------------
+class ReplicaRoutingMiddleware:
+    """Scope `core.db_router` state to the request and set the sticky-after-write cookie."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state, token = db_router.begin_request(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            db_router.end_request(token)
+        return db_router.set_sticky_cookie(state, response)
+
+    async def __acall__(self, request):
+        state, token = db_router.begin_request(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            db_router.end_request(token)
+        return db_router.set_sticky_cookie(state, response)
+
+
+# ----------------------
+# Full-page cache (core.pagecache)
+# ----------------------
+class PageCacheMiddleware:
+    """Serve `PAGE_CACHE_URLS` to anonymous GETs from stored, precompressed bytes."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    @staticmethod
+    def _applies(request):
+        return request.path in pagecache.cached_paths() and pagecache.is_anonymous_get(request)
+
+    @staticmethod
+    def _serve(request, page):
+        if request.headers.get("If-None-Match") == page.etag:
+            response = HttpResponseNotModified()
+        else:
+            encoding = page.encoding_for(request.headers.get("Accept-Encoding", ""))
+            response = HttpResponse(page.bodies[encoding])
+            for name, value in page.headers.items():
+                response[name] = value
+            if encoding != "identity":
+                response["Content-Encoding"] = encoding
+        response["ETag"] = page.etag
+        response["Vary"] = "Accept-Encoding, Cookie"
+        response["Cache-Control"] = f"public, max-age={settings.PAGE_CACHE_MAX_AGE}"
+        response["X-Page-Cache"] = "hit"
+        return response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self._applies(request):
+            return self.get_response(request)
+        page = pagecache.get(request.path)
+        if page is None:
+            response = self.get_response(request)
+            if not pagecache.is_cacheable(request, response):
+                return response
+            page = pagecache.store(request.path, response)
+        return self._serve(request, page)
+
+    async def __acall__(self, request):
+        if not self._applies(request):
+            return await self.get_response(request)
+        page = await pagecache.aget(request.path)
+        if page is None:
+            response = await self.get_response(request)
+            if not pagecache.is_cacheable(request, response):
+                return response
+            page = await pagecache.astore(request.path, response)
+        return self._serve(request, page)
+
+
+# ----------------------
+# Load shedding (core.ratelimit)
+# ----------------------
+def _refused(status, message, retry_after):
+    response = JsonResponse({"success": False, "message": message}, status=status)
+    response["Retry-After"] = str(retry_after)
+    return response
+
+
+class AdmissionControlMiddleware:
+    """
+    503 + Retry-After once this process already handles `MAX_IN_FLIGHT`
+    requests, before any session/auth/view work is spent on it.
+    Streaming bodies (SSE) only count while their view runs.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.limit = settings.MAX_IN_FLIGHT
+        self.exempt = tuple(settings.MAX_IN_FLIGHT_EXEMPT_PATHS)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def _shed(self, request):
+        metrics.REQUESTS_SHED.inc(reason="in_flight")
+        logger.warning(f"Shedding {request.method} {request.path}: {ratelimit.in_flight.count} requests in flight")
+        return _refused(503, "Server busy, please retry shortly.", 1)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if request.path.startswith(self.exempt):
+            return self.get_response(request)
+        if not ratelimit.in_flight.enter(self.limit):
+            return self._shed(request)
+        try:
+            return self.get_response(request)
+        finally:
+            ratelimit.in_flight.leave()
+
+    async def __acall__(self, request):
+        if request.path.startswith(self.exempt):
+            return await self.get_response(request)
+        if not ratelimit.in_flight.enter(self.limit):
+            return self._shed(request)
+        try:
+            return await self.get_response(request)
+        finally:
+            ratelimit.in_flight.leave()
+
+
+class RateLimitMiddleware:
+    """429 + Retry-After for routes in `RATE_LIMITS` once the client's token bucket is empty."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    @staticmethod
+    def _route(request):
+        if not settings.RATE_LIMITS:
+            return None, None
+        try:
+            url_name = resolve(request.path_info).view_name
+        except Resolver404:
+            return None, None
+        return url_name, ratelimit.rate_for(url_name)
+
+    @staticmethod
+    def _limited(request, url_name, retry_after):
+        metrics.REQUESTS_SHED.inc(reason="rate_limit")
+        logger.info(f"Rate limited {url_name} for {ratelimit.client_ip(request)} (retry in {retry_after}s)")
+        return _refused(429, "Too many requests, please slow down.", retry_after)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        url_name, rate = self._route(request)
+        if rate is not None:
+            user = request.user
+            key = ratelimit.bucket_key(url_name, user.pk if user.is_authenticated else None, ratelimit.client_ip(request))
+            retry_after = ratelimit.take(key, rate)
+            if retry_after:
+                return self._limited(request, url_name, retry_after)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        url_name, rate = self._route(request)
+        if rate is not None:
+            user = await request.auser()
+            key = ratelimit.bucket_key(url_name, user.pk if user.is_authenticated else None, ratelimit.client_ip(request))
+            retry_after = await ratelimit.atake(key, rate)
+            if retry_after:
+                return self._limited(request, url_name, retry_after)
+        return await self.get_response(request)
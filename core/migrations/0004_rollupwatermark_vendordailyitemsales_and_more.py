@@ -0,0 +1,63 @@
+# Generated by Django 5.2.6 on 2026-10-19 08:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_alter_featuredcombo_combo_alter_quickmenu_combo'),
+        ('menuitem', '0012_alter_comborule_required_chutney'),
+        ('vendors', '0006_vendor_created_at_vendor_slug_vendor_updated_at_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('high_water', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='VendorDailyItemSales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('quantity', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('order_count', models.PositiveIntegerField(default=0)),
+                ('cancelled_quantity', models.PositiveIntegerField(default=0)),
+                ('menu_item', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='daily_sales', to='menuitem.menuitem')),
+                ('vendor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_item_sales', to='vendors.vendor')),
+            ],
+            options={
+                'verbose_name_plural': 'Vendor daily item sales',
+                'ordering': ['-day', 'vendor', '-revenue'],
+                'indexes': [models.Index(fields=['vendor', 'day'], name='core_vendor_vendor__afccd4_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='VendorDailySales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('orders', models.PositiveIntegerField(default=0)),
+                ('items_sold', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('average_basket', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('cancellations', models.PositiveIntegerField(default=0)),
+                ('cancelled_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('vendor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_sales', to='vendors.vendor')),
+            ],
+            options={
+                'verbose_name_plural': 'Vendor daily sales',
+                'ordering': ['-day', 'vendor'],
+                'indexes': [models.Index(fields=['day'], name='core_vendor_day_6b4193_idx')],
+                'constraints': [models.UniqueConstraint(fields=('vendor', 'day'), name='unique_vendordailysales_vendor_day')],
+            },
+        ),
+    ]
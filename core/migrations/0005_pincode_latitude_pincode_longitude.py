@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-19 08:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_rollupwatermark_vendordailyitemsales_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pincode',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='pincode',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
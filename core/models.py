@@ -2,7 +2,7 @@
 from django.db import models
 from django.db.models import F
 from vendors.models import Vendor
-from menuitem.models import Combo   # ✅ yaha se import karna hai
+from menuitem.models import Combo, MenuItem   # ✅ yaha se import karna hai
 
 
 # ----------------------
@@ -12,6 +12,9 @@ class Pincode(models.Model):
     code = models.CharField(max_length=10, unique=True)
     city = models.CharField(max_length=100, blank=True)
     is_active = models.BooleanField(default=True)
+    # Centroid for proximity search (core.geo), from `manage.py load_pincodes`
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
 
     class Meta:
         ordering = ["code"]
@@ -66,6 +69,64 @@ class VendorAnalytics(models.Model):
         return f"Analytics ({self.vendor.name})"
 
 
+# ----------------------
+# Sales Rollups (maintained by core.rollups / `manage.py rollup_sales`)
+# ----------------------
+class VendorDailySales(models.Model):
+    """One row per vendor per (local) day; cancelled and draft orders are not sales."""
+    vendor = models.ForeignKey(Vendor, on_delete=models.CASCADE, related_name="daily_sales")
+    day = models.DateField()
+    orders = models.PositiveIntegerField(default=0)
+    items_sold = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    average_basket = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    cancellations = models.PositiveIntegerField(default=0)
+    cancelled_revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["vendor", "day"], name="unique_vendordailysales_vendor_day")
+        ]
+        indexes = [models.Index(fields=["day"])]
+        ordering = ["-day", "vendor"]
+        verbose_name_plural = "Vendor daily sales"
+
+    def __str__(self):
+        return f"{self.vendor.name} · {self.day}: ₹{self.revenue} / {self.orders} orders"
+
+
+class VendorDailyItemSales(models.Model):
+    """Per menu item breakdown of `VendorDailySales`; menu_item NULL = combo / custom combo lines."""
+    vendor = models.ForeignKey(Vendor, on_delete=models.CASCADE, related_name="daily_item_sales")
+    day = models.DateField()
+    menu_item = models.ForeignKey(
+        MenuItem, on_delete=models.CASCADE, null=True, blank=True, related_name="daily_sales"
+    )
+    quantity = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    order_count = models.PositiveIntegerField(default=0)
+    cancelled_quantity = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [models.Index(fields=["vendor", "day"])]
+        ordering = ["-day", "vendor", "-revenue"]
+        verbose_name_plural = "Vendor daily item sales"
+
+    def __str__(self):
+        name = self.menu_item.name if self.menu_item else "Combos"
+        return f"{self.vendor.name} · {self.day} · {name} ×{self.quantity}"
+
+
+class RollupWatermark(models.Model):
+    """High-water mark (max Order.updated_at processed) per incremental job."""
+    name = models.CharField(max_length=50, unique=True)
+    high_water = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.high_water}"
+
+
 # ----------------------
 # Featured / Quick Access Combos
 # ----------------------
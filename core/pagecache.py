@@ -0,0 +1,186 @@
+# core/pagecache.py
+"""
+Full-page cache for anonymous static-content pages.
+
+The pages in `PAGE_CACHE_URLS` (about, mission, ...) only change on deploy.
+`PageCacheMiddleware` serves them to anonymous GETs as stored bytes,
+identity plus gzip and Brotli (skipped if `brotli` is missing), picked by
+Accept-Encoding, before the session, auth, CSRF or the view run.
+
+- Who gets cached pages: only requests without a session or messages
+  cookie, without an Authorization header and without a query string.
+  Everybody else goes through the normal stack, so nothing user-specific
+  is ever served from here.
+- What gets stored: only plain 200s that set no cookie, didn't ask for a
+  CSRF token and didn't touch the session (no `Vary: Cookie`). A page
+  that starts using `{% csrf_token %}` stops being cached by itself.
+- Invalidation: keys carry `BUILD_ID`, so a deploy starts from an empty
+  cache and nothing has to be deleted.
+
+Pages live in a per-process dict backed by the shared cache. `prerender()`
+(a core.warmup step) renders them in the gunicorn master before fork, so
+workers start with every page in memory.
+"""
+import gzip
+import hashlib
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.handlers.wsgi import WSGIHandler
+from django.test import RequestFactory
+from django.urls import NoReverseMatch, reverse
+
+from .metrics import record_cache_lookup
+
+try:  # optional: Brotli variants are skipped without the package
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+CACHE_TIMEOUT = 7 * 24 * 60 * 60  # the build id changes long before this
+MIN_COMPRESS_BYTES = 200
+# Response headers not replayed (recomputed per response, or meaningless for stored bytes)
+DROPPED_HEADERS = {"content-length", "content-encoding", "vary", "set-cookie", "etag", "server-timing"}
+
+
+class CachedPage:
+    """Rendered bytes of one URL in every encoding, plus the headers to replay."""
+
+    __slots__ = ("bodies", "headers", "etag")
+
+    def __init__(self, content, headers):
+        self.headers = {k: v for k, v in headers.items() if k.lower() not in DROPPED_HEADERS}
+        self.bodies = {"identity": content}
+        if len(content) >= MIN_COMPRESS_BYTES:
+            self.bodies["gzip"] = gzip.compress(content, compresslevel=9, mtime=0)
+            if brotli is not None:
+                self.bodies["br"] = brotli.compress(content, quality=11)
+        self.etag = f'"{hashlib.sha256(content).hexdigest()[:16]}"'
+
+    def encoding_for(self, accept_encoding):
+        accepted = {e.split(";")[0].strip() for e in accept_encoding.lower().split(",")}
+        for encoding in ("br", "gzip"):
+            if encoding in accepted and encoding in self.bodies:
+                return encoding
+        return "identity"
+
+
+# ----------------------
+# Which requests / responses qualify
+# ----------------------
+_paths = None
+
+
+def cached_paths():
+    """URL paths of `PAGE_CACHE_URLS` (resolved once)."""
+    global _paths
+    if _paths is None:
+        paths = set()
+        for name in settings.PAGE_CACHE_URLS:
+            try:
+                paths.add(reverse(name))
+            except NoReverseMatch:
+                logger.warning(f"PAGE_CACHE_URLS: no URL named {name!r}")
+        _paths = frozenset(paths)
+    return _paths
+
+
+def is_anonymous_get(request):
+    if request.method != "GET" or request.META.get("QUERY_STRING") or "Authorization" in request.headers:
+        return False
+    return not any(name in request.COOKIES for name in bypass_cookies())
+
+
+def bypass_cookies():
+    return (settings.SESSION_COOKIE_NAME, *settings.PAGE_CACHE_BYPASS_COOKIES)
+
+
+def is_cacheable(request, response):
+    if response.status_code != 200 or getattr(response, "streaming", False) or response.cookies:
+        return False
+    if request.META.get("CSRF_COOKIE_NEEDS_UPDATE"):  # rendered a CSRF token
+        return False
+    vary = response.get("Vary", "").lower()
+    return "cookie" not in vary and not response.has_header("Content-Encoding")
+
+
+# ----------------------
+# Storage: process dict → shared cache
+# ----------------------
+_pages = {}  # key → CachedPage
+
+
+def _key(path):
+    return f"pagecache:{settings.BUILD_ID}:{path}"
+
+
+def get(path):
+    key = _key(path)
+    page = _pages.get(key)
+    if page is None:
+        page = cache.get(key)
+        if page is not None:
+            _pages[key] = page
+    record_cache_lookup("page", page is not None)
+    return page
+
+
+async def aget(path):
+    key = _key(path)
+    page = _pages.get(key)
+    if page is None:
+        page = await cache.aget(key)
+        if page is not None:
+            _pages[key] = page
+    record_cache_lookup("page", page is not None)
+    return page
+
+
+def store(path, response):
+    page = CachedPage(response.content, response.headers)
+    key = _key(path)
+    _pages[key] = page
+    cache.set(key, page, CACHE_TIMEOUT)
+    return page
+
+
+async def astore(path, response):
+    page = CachedPage(response.content, response.headers)
+    key = _key(path)
+    _pages[key] = page
+    await cache.aset(key, page, CACHE_TIMEOUT)
+    return page
+
+
+def clear():
+    """Forget this process's pages (the shared cache entries expire with the build id)."""
+    _pages.clear()
+
+
+# ----------------------
+# Pre-rendering
+# ----------------------
+def _host():
+    for host in settings.ALLOWED_HOSTS:
+        if host and host != "*":
+            return host.lstrip(".")
+    return "localhost"
+
+
+def prerender():
+    """Render every cached page through the full middleware stack; returns how many got stored."""
+    handler = WSGIHandler()
+    factory = RequestFactory()
+    stored = 0
+    for path in sorted(cached_paths()):
+        request = factory.get(path, HTTP_HOST=_host(), secure=settings.SECURE_SSL_REDIRECT)
+        response = handler.get_response(request)
+        response.close()
+        if get(path) is not None:
+            stored += 1
+        else:
+            logger.warning(f"Page cache: {path} not cacheable (status {response.status_code})")
+    return stored
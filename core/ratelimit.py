@@ -0,0 +1,151 @@
+# core/ratelimit.py
+"""
+Token-bucket rate limits in the cache, and per-process admission control.
+
+Rate limits (`RATE_LIMITS`, by URL name) are token buckets per route and
+client, where the client is the user if logged in and the IP address if
+not. "60/m" means a bucket of 60 tokens refilled at one per second.
+The bucket is stored GCRA-style as a single integer, the theoretical
+arrival time (TAT, in ms): the moment the bucket would be full again. A
+request atomically adds one emission interval to it with `cache.incr`
+and is allowed while TAT - now stays within the bucket size. A rejected
+request gives its interval back. The key expires at TAT, so a missing
+key is a full bucket and `cache.add` creates it. No read-modify-write,
+so workers sharing Redis can't race each other. The key's TTL is rounded
+up to whole seconds, so a key can outlive its TAT; an `incr` that lands in
+the past is moved up to now + one interval (another `incr`), otherwise the
+idle time would count as banked tokens. Concurrent requests doing that at
+once can leave a bucket slightly emptier than exact, never fuller.
+
+The buckets live wherever the default cache does. With Redis (REDIS_URL)
+a limit holds across all workers and hosts; with the fallback LocMemCache
+every worker process keeps its own buckets, so a client can get up to
+"limit × workers" through before being refused.
+
+Admission control caps the requests one worker process handles at once
+(`MAX_IN_FLIGHT`). Past that it answers 503 at once instead of queueing
+more work on a saturated worker.
+"""
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+class Rate:
+    """Parsed "<count>/<period>", e.g. "60/m": burst of 60, refill 60 per minute."""
+    __slots__ = ("count", "seconds", "interval_ms", "capacity_ms")
+
+    def __init__(self, spec):
+        count, _, period = spec.partition("/")
+        self.count = int(count)
+        self.seconds = PERIODS[period[-1]] * int(period[:-1] or 1)
+        if self.count <= 0:
+            raise ValueError(f"Rate {spec!r} must allow at least one request")
+        self.interval_ms = self.seconds * 1000 / self.count  # one token's worth of time
+        self.capacity_ms = self.seconds * 1000
+
+    def __repr__(self):
+        return f"Rate({self.count}/{self.seconds}s)"
+
+
+_rates = {}
+
+
+def rate_for(url_name):
+    """Parsed rate for `url_name`, or None if it isn't limited."""
+    spec = settings.RATE_LIMITS.get(url_name)
+    if spec is None:
+        return None
+    rate = _rates.get(spec)
+    if rate is None:
+        rate = _rates[spec] = Rate(spec)
+    return rate
+
+
+def client_ip(request):
+    """The caller's address; behind `RATE_LIMIT_PROXY_COUNT` proxies, as seen by the first one."""
+    proxies = settings.RATE_LIMIT_PROXY_COUNT
+    if proxies:
+        hops = [h.strip() for h in request.META.get("HTTP_X_FORWARDED_FOR", "").split(",") if h.strip()]
+        if len(hops) >= proxies:
+            return hops[-proxies]
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def bucket_key(url_name, user_id, ip):
+    client = f"u{user_id}" if user_id else f"ip{ip}"
+    return f"ratelimit:{url_name}:{client}"
+
+
+def _ttl(tat, now):
+    return max(1, math.ceil((tat - now) / 1000))
+
+
+def take(key, rate):
+    """Take one token: 0 if allowed, else the seconds until one is available."""
+    now = int(time.time() * 1000)
+    interval = int(rate.interval_ms)
+    if cache.add(key, now + interval, _ttl(now + interval, now)):
+        return 0  # no key: full bucket
+    try:
+        tat = cache.incr(key, interval)
+        if tat < now + interval:  # stale key kept by the rounded-up TTL
+            tat = cache.incr(key, now + interval - tat)
+    except ValueError:  # expired between add and incr
+        cache.add(key, now + interval, _ttl(now + interval, now))
+        return 0
+    if tat - now > rate.capacity_ms:
+        cache.decr(key, interval)
+        return max(1, math.ceil((tat - now - rate.capacity_ms) / 1000))
+    cache.touch(key, _ttl(tat, now))
+    return 0
+
+
+async def atake(key, rate):
+    """`take` through the cache's async API."""
+    now = int(time.time() * 1000)
+    interval = int(rate.interval_ms)
+    if await cache.aadd(key, now + interval, _ttl(now + interval, now)):
+        return 0
+    try:
+        tat = await cache.aincr(key, interval)
+        if tat < now + interval:
+            tat = await cache.aincr(key, now + interval - tat)
+    except ValueError:
+        await cache.aadd(key, now + interval, _ttl(now + interval, now))
+        return 0
+    if tat - now > rate.capacity_ms:
+        await cache.adecr(key, interval)
+        return max(1, math.ceil((tat - now - rate.capacity_ms) / 1000))
+    await cache.atouch(key, _ttl(tat, now))
+    return 0
+
+
+# ----------------------
+# Admission control
+# ----------------------
+class InFlight:
+    """Requests this process is handling right now, capped at `limit` (0 = no cap)."""
+
+    def __init__(self):
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def enter(self, limit):
+        with self.lock:
+            if limit and self.count >= limit:
+                return False
+            self.count += 1
+            return True
+
+    def leave(self):
+        with self.lock:
+            self.count -= 1
+
+
+in_flight = InFlight()
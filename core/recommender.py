@@ -0,0 +1,342 @@
+# core/recommender.py
+"""
+"Frequently ordered together" recommendations from order history.
+
+Per vendor we count, over non-cancelled orders, how many orders contain each
+menu item and each pair of items, and score pairs by PMI (how much more often
+they share a basket than chance), shrunk towards zero for rare pairs.
+
+Only the top `TOP_K` neighbours of every item are kept, as CSR arrays in one
+binary file that web workers memory-map:
+
+    header   magic, item count, entry count
+    items    sorted menu item ids           int64[n_items]
+    indptr   row offsets                    uint32[n_items + 1]
+    nbrs     neighbour menu item ids        int64[n_entries]  (best first)
+    scores   neighbour scores               float32[n_entries]
+
+A lookup is a binary search plus a slice — no unpickling, nothing per
+request but a few microseconds. Menu item ids are global, so one file serves
+every vendor. The counts live in a pickle next to it so the builder can fold
+in new orders incrementally; a nightly `--full` run recounts everything.
+Orders still in "draft" when their id passes the high-water mark are kept
+in the state and counted by the first run that sees them placed.
+"""
+import bisect
+import math
+import mmap
+import os
+import pickle
+import struct
+import threading
+import time
+from array import array
+from collections import Counter, defaultdict
+from datetime import timedelta
+from itertools import combinations
+
+from django.conf import settings
+from django.db.models import Max
+from django.utils import timezone
+
+from orders.models import Order, OrderItem
+
+TOP_K = 10
+MIN_SUPPORT = 2  # a pair needs this many shared orders to be suggested
+SHRINK = 5.0  # score = pmi * c / (c + SHRINK)
+SETTLE = timedelta(minutes=2)  # orders younger than this may still be getting items
+NOT_SALES = ("draft", "cancelled")
+DRAFT_WAIT = timedelta(days=2)  # drafts older than this are given up on (--full still finds them)
+
+_MAGIC = b"SKRECO01"
+_HEADER = struct.Struct("<8sII")
+RELOAD_CHECK_INTERVAL = 5.0  # seconds between stat() calls for a rebuilt file
+
+
+def data_path():
+    return str(settings.RECOMMENDER_PATH)
+
+
+def state_path():
+    return f"{data_path()}.state"
+
+
+# ----------------------
+# Counting
+# ----------------------
+class VendorCounts:
+    """Order / item / pair counts of one vendor."""
+
+    __slots__ = ("orders", "items", "pairs")
+
+    def __init__(self):
+        self.orders = 0
+        self.items = Counter()
+        self.pairs = Counter()  # (low id, high id) → shared orders
+
+    def add_basket(self, item_ids):
+        basket = sorted(set(item_ids))
+        self.orders += 1
+        self.items.update(basket)
+        self.pairs.update(combinations(basket, 2))
+
+    def merge(self, other):
+        self.orders += other.orders
+        self.items.update(other.items)
+        self.pairs.update(other.pairs)
+
+    def neighbours(self, k=TOP_K):
+        """{item: [(neighbour, score), ...] best first}."""
+        rows = defaultdict(list)
+        n = self.orders
+        for (a, b), shared in self.pairs.items():
+            if shared < MIN_SUPPORT:
+                continue
+            pmi = math.log(shared * n / (self.items[a] * self.items[b]))
+            if pmi <= 0:
+                continue
+            score = pmi * shared / (shared + SHRINK)
+            rows[a].append((score, b))
+            rows[b].append((score, a))
+        return {
+            item: [(other, score) for score, other in sorted(pairs, key=lambda p: (-p[0], p[1]))[:k]]
+            for item, pairs in rows.items()
+        }
+
+    def __getstate__(self):
+        return self.orders, self.items, self.pairs
+
+    def __setstate__(self, state):
+        self.orders, self.items, self.pairs = state
+
+
+def count_baskets(vendor_ids=None, after_id=0, upto_id=None, using=None, order_ids=None):
+    """Count baskets of orders in (after_id, upto_id] (or of `order_ids`); returns {vendor_id: VendorCounts}."""
+    lines = (
+        OrderItem.objects.filter(order_id__gt=after_id, menu_item__isnull=False)
+        .exclude(order__status__in=NOT_SALES)
+        .values_list("order__vendor_id", "order_id", "menu_item_id")
+        .order_by("order_id")
+    )
+    if using:
+        lines = lines.using(using)
+    if upto_id is not None:
+        lines = lines.filter(order_id__lte=upto_id)
+    if vendor_ids is not None:
+        lines = lines.filter(order__vendor_id__in=vendor_ids)
+    if order_ids is not None:
+        lines = lines.filter(order_id__in=order_ids)
+
+    counts = defaultdict(VendorCounts)
+    current, vendor_id, basket = None, None, []
+    for line_vendor, order_id, item_id in lines.iterator(chunk_size=5_000):
+        if order_id != current:
+            if basket:
+                counts[vendor_id].add_basket(basket)
+            current, vendor_id, basket = order_id, line_vendor, []
+        basket.append(item_id)
+    if basket:
+        counts[vendor_id].add_basket(basket)
+    return dict(counts)
+
+
+def settled_high_water(using=None):
+    """Highest order id old enough that its items are all written."""
+    orders = Order.objects.using(using) if using else Order.objects
+    return orders.filter(created_at__lte=timezone.now() - SETTLE).aggregate(m=Max("id"))["m"] or 0
+
+
+def draft_ids(after_id=0, upto_id=None, using=None):
+    """Ids of recent draft orders in (after_id, upto_id]: not counted yet, maybe placed later."""
+    orders = Order.objects.using(using) if using else Order.objects
+    drafts = orders.filter(id__gt=after_id, status="draft", created_at__gte=timezone.now() - DRAFT_WAIT)
+    if upto_id is not None:
+        drafts = drafts.filter(id__lte=upto_id)
+    return set(drafts.values_list("id", flat=True))
+
+
+# ----------------------
+# Persistence
+# ----------------------
+class RecommenderState:
+    """Everything the incremental builder needs between runs."""
+
+    drafts = frozenset()  # states pickled before drafts were tracked
+
+    def __init__(self, high_water=0, counts=None, rows=None, drafts=None):
+        self.high_water = high_water
+        self.counts = counts or {}  # vendor_id → VendorCounts
+        self.rows = rows or {}  # vendor_id → {item: [(neighbour, score)]}
+        self.drafts = drafts or set()  # draft order ids ≤ high_water, not counted yet
+
+    @classmethod
+    def load(cls, path=None):
+        try:
+            with open(path or state_path(), "rb") as fh:
+                return pickle.load(fh)
+        except FileNotFoundError:
+            return None
+
+    def save(self, path=None):
+        path = path or state_path()
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as fh:
+            pickle.dump(self, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    def add(self, counts):
+        """Fold new baskets ({vendor_id: VendorCounts}) in and re-rank those vendors."""
+        for vendor_id, new in counts.items():
+            self.counts.setdefault(vendor_id, VendorCounts()).merge(new)
+            self.rows[vendor_id] = self.counts[vendor_id].neighbours()
+
+
+def update(state, upto, using=None):
+    """
+    Fold orders in (state.high_water, upto] into `state`, plus earlier drafts
+    that have been placed since; returns the number of vendors re-ranked.
+    """
+    orders = Order.objects.using(using) if using else Order.objects
+    statuses = dict(orders.filter(id__in=state.drafts).values_list("id", "status")) if state.drafts else {}
+    placed = [order_id for order_id, status in statuses.items() if status not in NOT_SALES]
+
+    counts = count_baskets(after_id=state.high_water, upto_id=upto, using=using)
+    if placed:
+        for vendor_id, new in count_baskets(order_ids=placed, using=using).items():
+            counts.setdefault(vendor_id, VendorCounts()).merge(new)
+
+    # Still-draft orders keep waiting (deleted and cancelled ones drop out)
+    waiting = {order_id for order_id, status in statuses.items() if status == "draft"}
+    state.drafts = waiting | draft_ids(after_id=state.high_water, upto_id=upto, using=using)
+    state.add(counts)
+    state.high_water = max(state.high_water, upto)
+    return len(counts)
+
+
+def write_index(rows_by_vendor, path=None):
+    """Write the CSR file atomically; returns (items, entries)."""
+    path = path or data_path()
+    rows = {}
+    for vendor_rows in rows_by_vendor.values():
+        rows.update(vendor_rows)
+
+    items = array("q", sorted(rows))
+    indptr, nbrs, scores = array("I", [0]), array("q"), array("f")
+    for item in items:
+        for other, score in rows[item]:
+            nbrs.append(other)
+            scores.append(score)
+        indptr.append(len(nbrs))
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as fh:
+        fh.write(_HEADER.pack(_MAGIC, len(items), len(nbrs)))
+        for part in (items, indptr, nbrs, scores):
+            part.tofile(fh)
+    os.replace(tmp, path)
+    return len(items), len(nbrs)
+
+
+# ----------------------
+# Serving
+# ----------------------
+class Recommendations:
+    """Read-only view over a memory-mapped index file."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as fh:
+            self.stat = os.fstat(fh.fileno())
+            self._mmap = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, n_items, n_entries = _HEADER.unpack_from(self._mmap, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"{path} is not a recommendations index")
+
+        view, offset = memoryview(self._mmap), _HEADER.size
+
+        def take(fmt, count, size):
+            nonlocal offset
+            part = view[offset:offset + count * size].cast(fmt)
+            offset += count * size
+            return part
+
+        self.items = take("q", n_items, 8)
+        self.indptr = take("I", n_items + 1, 4)
+        self.nbrs = take("q", n_entries, 8)
+        self.scores = take("f", n_entries, 4)
+
+    def row(self, item_id):
+        i = bisect.bisect_left(self.items, item_id)
+        if i == len(self.items) or self.items[i] != item_id:
+            return ()
+        start, end = self.indptr[i], self.indptr[i + 1]
+        return zip(self.nbrs[start:end], self.scores[start:end])
+
+    def for_item(self, item_id, k=TOP_K):
+        """[(menu_item_id, score)] most often ordered with `item_id`."""
+        return list(self.row(item_id))[:k]
+
+    def for_basket(self, item_ids, k=5, exclude=()):
+        """Add-ons for a basket: neighbour scores summed over its items."""
+        basket = set(item_ids)
+        skip = basket | set(exclude)
+        totals = defaultdict(float)
+        for item_id in basket:
+            for other, score in self.row(item_id):
+                if other not in skip:
+                    totals[other] += score
+        return sorted(totals.items(), key=lambda p: (-p[1], p[0]))[:k]
+
+    def top_pairs(self, item_ids, k=5):
+        """Strongest distinct pairs among `item_ids` (e.g. one vendor's menu)."""
+        allowed = set(item_ids)
+        pairs = {}
+        for item_id in allowed:
+            for other, score in self.row(item_id):
+                if other in allowed:
+                    pairs[(min(item_id, other), max(item_id, other))] = score
+        return sorted(((a, b, s) for (a, b), s in pairs.items()), key=lambda p: (-p[2], p[0], p[1]))[:k]
+
+
+class _NoRecommendations(Recommendations):
+    """Stand-in until the first build has written an index."""
+
+    def __init__(self):
+        self.path, self.stat = None, None
+        self.items = self.indptr = self.nbrs = self.scores = ()
+
+
+_current = None
+_checked = 0.0
+_lock = threading.Lock()
+
+
+def get_recommendations():
+    """Process-wide mapped index, re-opened when the builder replaces the file."""
+    global _current, _checked
+    now = time.monotonic()
+    if _current is not None and now - _checked < RELOAD_CHECK_INTERVAL:
+        return _current
+    with _lock:
+        _checked = now
+        path = data_path()
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            _current = _NoRecommendations()
+            return _current
+        if _current is None or _current.stat is None or (stat.st_ino, stat.st_mtime_ns) != (
+            _current.stat.st_ino, _current.stat.st_mtime_ns
+        ):
+            _current = Recommendations(path)
+    return _current
+
+
+def pairs_for_menu(menu_items, k=5):
+    """Top "ordered together" pairs of a menu: [{"item", "partner", "score"}] of MenuItem objects."""
+    by_id = {item.id: item for item in menu_items}
+    return [
+        {"item": by_id[a], "partner": by_id[b], "score": round(score, 3)}
+        for a, b, score in get_recommendations().top_pairs(by_id, k=k)
+    ]
@@ -0,0 +1,218 @@
+# core/rollups.py
+"""
+Incremental per-vendor daily sales rollups.
+
+`refresh()` looks at orders whose `updated_at` moved past the stored
+high-water mark (new orders, status changes, re-totalled orders) and
+recomputes every affected vendor × day from Order / OrderItem, replacing its
+`VendorDailySales` and `VendorDailyItemSales` rows. Rebuilding whole days
+keeps the job idempotent, so each scan overlaps the previous one a little to
+pick up transactions that committed after it ran.
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Max, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from orders.models import Order, OrderItem
+from .models import RollupWatermark, VendorDailyItemSales, VendorDailySales
+
+WATERMARK = "vendor_daily_sales"
+OVERLAP = timedelta(minutes=5)
+NOT_SALES = ("draft", "cancelled")
+VENDOR_CHUNK = 200  # vendors per aggregate query (bounds IN lists and rows in memory)
+
+CENT = Decimal("0.01")
+LINE_TOTAL = ExpressionWrapper(F("price") * F("quantity"), output_field=DecimalField(max_digits=12, decimal_places=2))
+
+
+def _money(value):
+    return Decimal(value or 0).quantize(CENT)
+
+
+def day_bounds(day):
+    """[start, end) of a local calendar day as aware datetimes."""
+    tz = timezone.get_current_timezone()
+    return (
+        timezone.make_aware(datetime.combine(day, time.min), tz),
+        timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min), tz),
+    )
+
+
+# ----------------------
+# Rebuild
+# ----------------------
+def _aggregate(vendor_ids, days, using):
+    """Rollup rows for every (vendor in vendor_ids, day in days), one query per table."""
+    start, end = day_bounds(min(days))[0], day_bounds(max(days))[1]
+    local_day = TruncDate("created_at")
+    sold = ~Q(status__in=NOT_SALES)
+    cancelled = Q(status="cancelled")
+    daily = (
+        Order.objects.using(using)
+        .filter(vendor_id__in=vendor_ids, created_at__gte=start, created_at__lt=end)
+        .annotate(day=local_day)
+        .values("vendor_id", "day")
+        .annotate(
+            n_orders=Count("id", filter=sold),
+            n_revenue=Sum("total_price", filter=sold),
+            n_cancellations=Count("id", filter=cancelled),
+            n_cancelled_revenue=Sum("total_price", filter=cancelled),
+        )
+        .order_by()
+    )
+
+    item_sold = ~Q(order__status__in=NOT_SALES)
+    items = (
+        OrderItem.objects.using(using)
+        .filter(order__vendor_id__in=vendor_ids, order__created_at__gte=start, order__created_at__lt=end)
+        .exclude(order__status="draft")
+        .annotate(day=TruncDate("order__created_at"))
+        .values("order__vendor_id", "day", "menu_item_id")
+        .annotate(
+            n_quantity=Sum("quantity", filter=item_sold),
+            n_revenue=Sum(LINE_TOTAL, filter=item_sold),
+            n_orders=Count("order_id", filter=item_sold, distinct=True),
+            n_cancelled=Sum("quantity", filter=Q(order__status="cancelled")),
+        )
+        .order_by()
+    )
+
+    daily_rows, item_rows = [], []
+    items_sold = defaultdict(int)
+    for row in items:
+        if row["day"] not in days:
+            continue
+        key = (row["order__vendor_id"], row["day"])
+        items_sold[key] += row["n_quantity"] or 0
+        item_rows.append(VendorDailyItemSales(
+            vendor_id=key[0],
+            day=key[1],
+            menu_item_id=row["menu_item_id"],
+            quantity=row["n_quantity"] or 0,
+            revenue=_money(row["n_revenue"]),
+            order_count=row["n_orders"],
+            cancelled_quantity=row["n_cancelled"] or 0,
+        ))
+    for row in daily:
+        if row["day"] not in days:
+            continue
+        revenue = _money(row["n_revenue"])
+        daily_rows.append(VendorDailySales(
+            vendor_id=row["vendor_id"],
+            day=row["day"],
+            orders=row["n_orders"],
+            items_sold=items_sold[(row["vendor_id"], row["day"])],
+            revenue=revenue,
+            average_basket=_money(revenue / row["n_orders"]) if row["n_orders"] else _money(0),
+            cancellations=row["n_cancellations"],
+            cancelled_revenue=_money(row["n_cancelled_revenue"]),
+        ))
+    return daily_rows, item_rows
+
+
+def rebuild(vendor_days, using=DEFAULT_DB_ALIAS):
+    """
+    Recompute the rollup rows of the given (vendor_id, day) pairs. Each vendor
+    chunk is rebuilt for the union of its touched days (a superset, which is
+    harmless). Returns the number of vendor-days rewritten.
+    """
+    days_by_vendor = defaultdict(set)
+    for vendor_id, day in vendor_days:
+        days_by_vendor[vendor_id].add(day)
+
+    count = 0
+    vendor_ids = sorted(days_by_vendor)
+    for i in range(0, len(vendor_ids), VENDOR_CHUNK):
+        chunk = vendor_ids[i:i + VENDOR_CHUNK]
+        days = set().union(*(days_by_vendor[v] for v in chunk))
+        daily_rows, item_rows = _aggregate(chunk, days, using)
+        with transaction.atomic(using=using):
+            VendorDailySales.objects.using(using).filter(vendor_id__in=chunk, day__in=days).delete()
+            VendorDailyItemSales.objects.using(using).filter(vendor_id__in=chunk, day__in=days).delete()
+            VendorDailySales.objects.using(using).bulk_create(daily_rows, batch_size=2_000)
+            VendorDailyItemSales.objects.using(using).bulk_create(item_rows, batch_size=2_000)
+        count += len(chunk) * len(days)
+    return count
+
+
+# ----------------------
+# Incremental job
+# ----------------------
+def refresh(using=DEFAULT_DB_ALIAS, full=False):
+    """
+    Bring the rollups up to date with orders changed since the last run
+    (everything if `full`). Returns {"vendor_days": n, "high_water": datetime | None}.
+    """
+    mark, _ = RollupWatermark.objects.using(using).get_or_create(name=WATERMARK)
+    orders = Order.objects.using(using).order_by()
+    if mark.high_water and not full:
+        orders = orders.filter(updated_at__gt=mark.high_water - OVERLAP)
+
+    # Freeze the window first so orders updated while we work go to the next run.
+    upper = orders.aggregate(upper=Max("updated_at"))["upper"]
+    if upper is None:
+        return {"vendor_days": 0, "high_water": mark.high_water}
+
+    vendor_days = (
+        orders.filter(updated_at__lte=upper)
+        .annotate(day=TruncDate("created_at"))
+        .values_list("vendor_id", "day")
+        .distinct()
+    )
+    count = rebuild(vendor_days, using=using)
+
+    if full or mark.high_water is None or upper > mark.high_water:
+        mark.high_water = upper
+        mark.save(using=using, update_fields=["high_water", "updated_at"])
+    return {"vendor_days": count, "high_water": mark.high_water}
+
+
+# ----------------------
+# Reporting
+# ----------------------
+def vendor_report(vendor, start, end, top_items=10):
+    """Daily series, totals and best sellers of one vendor for [start, end] from the rollups."""
+    days = VendorDailySales.objects.filter(vendor=vendor, day__range=(start, end))
+    items = VendorDailyItemSales.objects.filter(vendor=vendor, day__range=(start, end))
+
+    totals = days.aggregate(
+        n_orders=Sum("orders"), n_items=Sum("items_sold"), n_revenue=Sum("revenue"),
+        n_cancellations=Sum("cancellations"), n_cancelled_revenue=Sum("cancelled_revenue"),
+    )
+    orders = totals["n_orders"] or 0
+    revenue = _money(totals["n_revenue"])
+    best = (
+        items.values("menu_item_id", "menu_item__name")
+        .annotate(n_quantity=Sum("quantity"), n_revenue=Sum("revenue"), n_orders=Sum("order_count"))
+        .order_by("-n_revenue")[:top_items]
+    )
+    return {
+        "start": start,
+        "end": end,
+        "totals": {
+            "orders": orders,
+            "items_sold": totals["n_items"] or 0,
+            "revenue": revenue,
+            "average_basket": _money(revenue / orders) if orders else _money(0),
+            "cancellations": totals["n_cancellations"] or 0,
+            "cancelled_revenue": _money(totals["n_cancelled_revenue"]),
+        },
+        "days": list(days.order_by("day").values(
+            "day", "orders", "items_sold", "revenue", "average_basket", "cancellations",
+        )),
+        "top_items": [
+            {
+                "menu_item_id": row["menu_item_id"],
+                "name": row["menu_item__name"] or "Combos",
+                "quantity": row["n_quantity"],
+                "orders": row["n_orders"],
+                "revenue": _money(row["n_revenue"]),
+            }
+            for row in best
+        ],
+    }
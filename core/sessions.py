@@ -0,0 +1,241 @@
+# core/sessions.py
+"""
+Cache-first session engine with database write-behind.
+
+Sessions are read from the cache (`SESSION_CACHE_ALIAS`) and only fall back
+to `django_session` on a miss. On save, the session is compared with what
+was loaded:
+
+* auth / application keys changed (login, logout, customer id) → written to
+  the database immediately, then to the cache;
+* only volatile keys changed (flash messages) → cache now, database row
+  queued for the write-behind thread;
+* nothing changed → nothing is written, unless the last expiry refresh is
+  older than `SESSION_TOUCH_INTERVAL`, in which case the sliding expiry is
+  refreshed the same write-behind way.
+
+A load that finds the refresh due marks the session modified, so the
+session middleware saves it: sliding expiry at the cost of at most one
+queued write per session per touch interval, without
+`SESSION_SAVE_EVERY_REQUEST`. The write-behind thread flushes queued rows
+every `SESSION_WRITE_BEHIND_DELAY` seconds as one upsert per batch; a
+crash loses at most that window of message / expiry updates, never a
+login. The queue length is exported as `job_queue_depth`.
+
+Set SESSION_ENGINE = "core.sessions" only with a cache shared by every
+worker (Redis): a process-local cache would serve each worker its own stale
+copy of a session. CoreConfig.ready() refuses to start in that case.
+"""
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.sessions.backends import cached_db
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+from django.db import close_old_connections, router
+from django.utils import timezone
+
+from .metrics import JOB_QUEUE_DEPTH
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "core.sessions:"
+QUEUE_NAME = "session_write_behind"  # job_queue_depth label
+# Keys whose changes don't justify a synchronous database write
+VOLATILE_KEYS = frozenset({"_messages"})
+
+
+def _dump(data):
+    return json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def _fingerprints(data):
+    """(durable, volatile) JSON of the session data, for change detection."""
+    return (
+        _dump({k: v for k, v in data.items() if k not in VOLATILE_KEYS}),
+        _dump({k: v for k, v in data.items() if k in VOLATILE_KEYS}),
+    )
+
+
+# ----------------------
+# Write-behind
+# ----------------------
+class WriteBehind(threading.Thread):
+    """Flushes queued Session rows (last write per key wins) from its own thread."""
+
+    def __init__(self, interval):
+        super().__init__(name="session-write-behind", daemon=True)
+        self.interval = interval
+        self.pending = {}  # session_key → Session instance
+        # Held around every session DB write in this process, so a flush
+        # can never overwrite a newer synchronous write with older data
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+
+    def _report(self):
+        JOB_QUEUE_DEPTH.set(len(self.pending), queue=QUEUE_NAME)
+
+    def enqueue(self, obj):
+        with self.lock:
+            self.pending[obj.session_key] = obj
+            self._report()
+
+    def discard(self, session_key):
+        """Drop a queued row; call with `lock` held, before writing the session synchronously."""
+        self.pending.pop(session_key, None)
+        self._report()
+
+    def flush(self):
+        with self.lock:
+            batch, self.pending = list(self.pending.values()), {}
+            self._report()
+            if not batch:
+                return 0
+            model = type(batch[0])
+            model.objects.using(router.db_for_write(model)).bulk_create(
+                batch,
+                batch_size=500,
+                update_conflicts=True,
+                unique_fields=["session_key"],
+                update_fields=["session_data", "expire_date"],
+            )
+        return len(batch)
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                self.flush()
+            except Exception as exc:
+                logger.warning(f"Session write-behind flush failed: {exc}")
+            finally:
+                close_old_connections()
+
+    def stop(self):
+        self.stopped.set()
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_writer():
+    """The write-behind thread of this process, started on first use."""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                writer = WriteBehind(settings.SESSION_WRITE_BEHIND_DELAY)
+                writer.start()
+                atexit.register(writer.flush)
+                _writer = writer
+    return _writer
+
+
+def _reset_after_fork():
+    # The parent's thread does not exist in the child; the parent flushes its own queue.
+    global _writer, _writer_lock
+    _writer = None
+    _writer_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+# ----------------------
+# Store
+# ----------------------
+class SessionStore(cached_db.SessionStore):
+    cache_key_prefix = KEY_PREFIX
+
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        self._durable = self._volatile = None  # fingerprints of the loaded data
+        self._touched = 0.0  # epoch seconds of the last expiry write
+
+    def _remember(self, data, touched):
+        self._durable, self._volatile = _fingerprints(data)
+        self._touched = touched
+
+    def load(self):
+        try:
+            record = self._cache.get(self.cache_key)
+        except Exception:
+            record = None
+
+        if record is None:
+            s = self._get_session_from_db()
+            if not s:
+                self._remember({}, 0.0)
+                return {}
+            # The row was last written one cookie age before it expires
+            record = (self.decode(s.session_data), s.expire_date.timestamp() - self.get_session_cookie_age())
+            self._cache.set(self.cache_key, record, self.get_expiry_age(expiry=s.expire_date))
+
+        data, touched = record
+        self._remember(data, touched)
+        if data and time.time() - touched >= settings.SESSION_TOUCH_INTERVAL:
+            self.modified = True  # due for an expiry refresh: have the middleware save
+        return data
+
+    async def aload(self):
+        return await sync_to_async(self.load)()
+
+    def save(self, must_create=False):
+        if self.session_key is None:
+            return self.create()
+        data = self._get_session(no_load=must_create)
+        durable, volatile = _fingerprints(data)
+        now = time.time()
+        writer = get_writer()
+
+        if must_create or durable != self._durable:
+            with writer.lock:
+                writer.discard(self.session_key)
+                DBStore.save(self, must_create)
+        elif volatile != self._volatile or now - self._touched >= settings.SESSION_TOUCH_INTERVAL:
+            writer.enqueue(self.create_model_instance(data))
+        else:
+            return
+
+        try:
+            self._cache.set(self.cache_key, (data, now), self.get_expiry_age())
+        except Exception:
+            logger.exception(f"Error saving session to cache ({self._cache})")
+        self._durable, self._volatile, self._touched = durable, volatile, now
+
+    async def asave(self, must_create=False):
+        await sync_to_async(self.save)(must_create)
+
+    def delete(self, session_key=None):
+        key = session_key or self.session_key
+        if key is not None:
+            writer = get_writer()
+            with writer.lock:
+                writer.discard(key)
+        super().delete(session_key)
+
+    async def adelete(self, session_key=None):
+        await sync_to_async(self.delete)(session_key)
+
+    @classmethod
+    def clear_expired(cls, batch_size=5_000):
+        """Delete expired rows `batch_size` at a time; returns the number deleted."""
+        model = cls.get_model_class()
+        deleted = 0
+        while True:
+            keys = list(
+                model.objects.filter(expire_date__lt=timezone.now())
+                .values_list("session_key", flat=True)[:batch_size]
+            )
+            if not keys:
+                return deleted
+            deleted += model.objects.filter(session_key__in=keys).delete()[0]
+
+    @classmethod
+    async def aclear_expired(cls, batch_size=5_000):
+        return await sync_to_async(cls.clear_expired)(batch_size)
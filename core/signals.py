@@ -0,0 +1,22 @@
+# core/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from orders.models import Order
+from vendors.models import Vendor
+from . import geo
+from .metrics import ORDERS_PLACED
+from .models import Pincode
+
+
+@receiver(post_save, sender=Order)
+def count_order_placed(sender, instance, created, **kwargs):
+    """Business counter: orders created per vendor."""
+    if created:
+        ORDERS_PLACED.inc(vendor_id=instance.vendor_id)
+
+
+@receiver([post_save, post_delete], sender=Vendor)
+@receiver([post_save, post_delete], sender=Pincode)
+def drop_proximity_index(sender, **kwargs):
+    geo.invalidate()
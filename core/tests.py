@@ -1,3 +1,243 @@
-from django.test import TestCase
+import random
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from customers.models import Customer
+from menuitem.models import MenuItem
+from orders import state as order_state
+from orders.models import Order, OrderItem
+from vendors.models import Vendor
+from . import db_router, geo, pagecache, ratelimit, recommender
+from .middleware import ReplicaRoutingMiddleware
+
+
+class RecommenderIncrementalTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user("reco-customer", password="pw")
+        self.customer, _ = Customer.objects.get_or_create(user=user)  # created by customers.signals
+        self.vendor = Vendor.objects.create(name="Reco Kitchen", vendor_code="RECO01")
+        self.idli = MenuItem.objects.create(vendor=self.vendor, name="Idli", price=10)
+        self.vada = MenuItem.objects.create(vendor=self.vendor, name="Vada", price=15)
+
+    def make_order(self, status):
+        order = Order.objects.create(customer=self.customer, vendor=self.vendor, status=status)
+        OrderItem.objects.bulk_create(
+            OrderItem(order=order, menu_item=item) for item in (self.idli, self.vada)
+        )
+        return order
+
+    def test_draft_confirmed_after_incremental_pass_is_counted(self):
+        self.make_order("placed")
+        draft = self.make_order("draft")
+        state = recommender.RecommenderState()
+
+        recommender.update(state, draft.pk)
+        counts = state.counts[self.vendor.pk]
+        self.assertEqual(counts.orders, 1)
+        self.assertEqual(state.drafts, {draft.pk})
+
+        order_state.transition(draft.pk, 0, "placed")
+        order_state.transition(draft.pk, 1, "confirmed")
+        self.assertEqual(recommender.update(state, draft.pk), 1)
+        self.assertEqual(counts.orders, 2)
+        self.assertEqual(counts.pairs[(self.idli.pk, self.vada.pk)], 2)
+        self.assertEqual(state.drafts, set())
+
+        # Nothing is counted twice on the next pass
+        self.assertEqual(recommender.update(state, draft.pk), 0)
+        self.assertEqual(counts.orders, 2)
+
+    def test_cancelled_draft_stops_waiting(self):
+        draft = self.make_order("draft")
+        state = recommender.RecommenderState()
+        recommender.update(state, draft.pk)
+
+        order_state.transition(draft.pk, 0, "cancelled")
+        recommender.update(state, draft.pk)
+        self.assertEqual(state.drafts, set())
+        self.assertNotIn(self.vendor.pk, state.counts)
+
+
+@mock.patch("core.ratelimit.time.time", return_value=1_000_000.0)
+class RateLimitTests(TestCase):
+    rate = ratelimit.Rate("3/m")  # bucket of 3, one token every 20s
+
+    def setUp(self):
+        cache.clear()
+
+    def allowed(self, key, attempts=10):
+        return sum(ratelimit.take(key, self.rate) == 0 for _ in range(attempts))
+
+    def test_burst_then_retry_after(self, _time):
+        self.assertEqual(self.allowed("rl:burst", attempts=3), 3)
+        self.assertEqual(ratelimit.take("rl:burst", self.rate), 20)
+
+    def test_refill(self, time_):
+        self.allowed("rl:refill")
+        time_.return_value += 20
+        self.assertEqual(self.allowed("rl:refill"), 1)
+
+    def test_stale_key_is_not_fuller_than_a_new_bucket(self, _time):
+        # TAT 30s in the past, kept alive by a rounded-up TTL
+        cache.set("rl:stale", 1_000_000_000 - 30_000, 60)
+        self.assertEqual(self.allowed("rl:stale"), 3)
+
+    def test_clients_have_separate_buckets(self, _time):
+        self.allowed(ratelimit.bucket_key("core:x", None, "10.0.0.1"))
+        self.assertEqual(ratelimit.take(ratelimit.bucket_key("core:x", None, "10.0.0.2"), self.rate), 0)
+        self.assertEqual(ratelimit.take(ratelimit.bucket_key("core:x", 7, "10.0.0.1"), self.rate), 0)
+
+
+@override_settings(DATABASE_REPLICAS=["replica_1"])
+class ReplicaRoutingTests(TransactionTestCase):
+    """Routing decisions only: `QuerySet.db` is the alias a read would run on."""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.vendor = Vendor.objects.create(name="Routing Kitchen", vendor_code="ROUTE01")
+
+    def handle(self, view, cookies=None):
+        request = self.factory.get("/")
+        request.COOKIES.update(cookies or {})
+        return ReplicaRoutingMiddleware(view)(request)
+
+    def reading_view(self, seen, decorate=True):
+        def view(request):
+            seen.append(Vendor.objects.all().db)
+            return HttpResponse()
+        return db_router.replica_reads(view) if decorate else view
+
+    def test_decorated_reads_go_to_the_replica(self):
+        seen = []
+        response = self.handle(self.reading_view(seen))
+        self.assertEqual(seen, ["replica_1"])
+        self.assertNotIn(settings.DATABASE_STICKY_COOKIE, response.cookies)
+
+    def test_undecorated_reads_stay_on_primary(self):
+        seen = []
+        self.handle(self.reading_view(seen, decorate=False))
+        self.assertEqual(seen, ["default"])
+
+    def test_reads_after_a_write_stay_on_primary_within_the_sticky_window(self):
+        def writing_view(request):
+            Vendor.objects.filter(pk=self.vendor.pk).update(city="Madurai")
+            return HttpResponse()
+
+        response = self.handle(writing_view)
+        cookie = response.cookies[settings.DATABASE_STICKY_COOKIE]
+        self.assertEqual(cookie["max-age"], settings.DATABASE_STICKY_SECONDS)
+
+        seen = []
+        self.handle(self.reading_view(seen), cookies={settings.DATABASE_STICKY_COOKIE: cookie.value})
+        self.assertEqual(seen, ["default"])
+
+    def test_expired_sticky_cookie_reads_from_replica(self):
+        seen = []
+        self.handle(self.reading_view(seen), cookies={settings.DATABASE_STICKY_COOKIE: "1"})
+        self.assertEqual(seen, ["replica_1"])
+
+    def test_untracked_writes_do_not_start_a_sticky_window(self):
+        def counting_view(request):
+            with db_router.untracked_writes():
+                Vendor.objects.filter(pk=self.vendor.pk).update(view_count=1)
+            return HttpResponse()
+
+        self.assertNotIn(settings.DATABASE_STICKY_COOKIE, self.handle(counting_view).cookies)
+
+    def test_reads_inside_a_write_transaction_use_primary(self):
+        seen = []
+
+        @db_router.replica_reads
+        def view(request):
+            with transaction.atomic():
+                seen.append(Vendor.objects.all().db)
+            return HttpResponse()
+
+        self.handle(view)
+        self.assertEqual(seen, ["default"])
+
+
+class ProximityIndexTests(SimpleTestCase):
+    def test_kd_tree_matches_brute_force_haversine(self):
+        rng = random.Random(7)
+        pincodes = [(f"{600000 + i}", rng.uniform(8, 20), rng.uniform(72, 88)) for i in range(400)]
+        vendors = [(i, code) for i, (code, _, _) in enumerate(pincodes) if i % 3]
+        index = geo.ProximityIndex(pincodes, vendors)
+        with_vendors = {code for _, code in vendors}
+
+        for code, lat, lon in rng.sample(pincodes, 25):
+            for km in (5, 50, 300):
+                expected = sorted(
+                    (other, geo.haversine_km(lat, lon, other_lat, other_lon))
+                    for other, other_lat, other_lon in pincodes
+                    if other in with_vendors and geo.haversine_km(lat, lon, other_lat, other_lon) <= km
+                )
+                found = index.pincodes_within(code, km)
+                self.assertEqual(sorted(found), expected)
+                self.assertEqual([d for _, d in found], sorted(d for _, d in found))  # nearest first
+
+    def test_vendors_within_and_unknown_pincode(self):
+        # 600001 and 600002 about 11 km apart, 110001 in Delhi
+        index = geo.ProximityIndex(
+            [("600001", 13.08, 80.28), ("600002", 13.0, 80.22), ("110001", 28.63, 77.22)],
+            [(1, "600001"), (2, " 600002"), (3, "600002"), (4, "110001"), (5, None)],
+        )
+        self.assertEqual([v for v, _ in index.vendors_within("600001", 20)], [1, 2, 3])
+        self.assertEqual([v for v, _ in index.vendors_within("600001", 20, limit=2)], [1, 2])
+        self.assertEqual([v for v, _ in index.vendors_within("600001", 5)], [1])
+        self.assertEqual(index.vendors_within("999999", 20), [])
+        self.assertFalse(index.knows("999999"))
+
+
+class PageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        pagecache.clear()
+        self.addCleanup(pagecache.clear)
+        self.path = reverse("core:about_us")
+
+    def test_anonymous_get_is_stored_and_served(self):
+        first = self.client.get(self.path)
+        self.assertEqual(first.status_code, 200)
+        self.assertIsNotNone(pagecache.get(self.path))
+
+        hit = self.client.get(self.path)
+        self.assertEqual(hit["X-Page-Cache"], "hit")
+        self.assertEqual(hit.content, first.content)
+        self.assertFalse(hit.cookies)
+
+        gzipped = self.client.get(self.path, headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(gzipped["Content-Encoding"], "gzip")
+        self.assertEqual(self.client.get(self.path, headers={"If-None-Match": hit["ETag"]}).status_code, 304)
+
+    def test_requests_with_state_bypass_the_cache(self):
+        self.client.get(self.path)
+        self.client.cookies[settings.SESSION_COOKIE_NAME] = "abc"
+        self.assertFalse(self.client.get(self.path).has_header("X-Page-Cache"))
+        del self.client.cookies[settings.SESSION_COOKIE_NAME]
+        self.assertFalse(self.client.get(self.path, {"utm": "x"}).has_header("X-Page-Cache"))
+        with_auth = self.client.get(self.path, headers={"Authorization": "Bearer t"})
+        self.assertFalse(with_auth.has_header("X-Page-Cache"))
+
+    def test_only_plain_responses_are_cacheable(self):
+        request = RequestFactory().get(self.path)
+        self.assertTrue(pagecache.is_cacheable(request, HttpResponse("page")))
+        self.assertFalse(pagecache.is_cacheable(request, HttpResponse("gone", status=404)))
+
+        with_cookie = HttpResponse("page")
+        with_cookie.set_cookie("seen", "1")
+        self.assertFalse(pagecache.is_cacheable(request, with_cookie))
+
+        varies = HttpResponse("page")
+        varies["Vary"] = "Accept-Language, Cookie"
+        self.assertFalse(pagecache.is_cacheable(request, varies))
+
+        request.META["CSRF_COOKIE_NEEDS_UPDATE"] = True
+        self.assertFalse(pagecache.is_cacheable(request, HttpResponse("page")))
@@ -15,6 +15,9 @@ urlpatterns = [
     path("search/", views.search_vendor, name="search"),
     path("vendor/<str:code>/", views.vendor_detail, name="vendor_detail"),
     path("vendor/<str:code>/create-order/", views.create_order, name="create_order"),
+    path("ajax/search-vendor/", views.ajax_search_vendor, name="ajax_search_vendor"),
+    path("vendor/<str:code>/click/", views.track_vendor_click, name="track_vendor_click"),
+    path("api/vendors/nearby/", views.nearby_vendors_api, name="nearby_vendors_api"),
 
     # 📬 Contact
     path("contact/", views.contact_view, name="contact"),
@@ -28,7 +31,13 @@ urlpatterns = [
     # 🛒 Products & Menu
     path("products/", views.products, name="products"),
     path("menu/", views.menu, name="menu"),
-    
+
+    # 📊 Sales reports (staff, from daily rollups)
+    path("reports/vendor/<str:code>/sales/", views.vendor_sales_report, name="vendor_sales_report"),
+
+    # 📈 Monitoring (Prometheus scrape target)
+    path("metrics", views.metrics, name="metrics"),
+
 ]
 
 # Serve media files in development
@@ -1,17 +1,29 @@
 # core/views.py
 import logging
+from datetime import date, timedelta
+
+from asgiref.sync import sync_to_async
+
 from django.shortcuts import render, redirect, get_object_or_404
-from django.db.models import Q
+from django.db.models import F, Q
 from django.core.paginator import Paginator
-from django.http import JsonResponse
+from django.http import JsonResponse, HttpResponse
+from django.conf import settings
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib import messages
+from django.contrib.admin.views.decorators import staff_member_required
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
 from .forms import ContactForm
 from vendors.models import Vendor
+from vendors.page import load_vendor_page, page_context
 from menuitem.models import Combo
 from menuitem.models import MenuItem
 from orders.models import Order
 from .forms import ContactForm
+from .metrics import REGISTRY
+from .db_router import replica_reads, untracked_writes
+from . import geo, rollups
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +31,7 @@ logger = logging.getLogger(__name__)
 # ----------------------
 # Homepage
 # ----------------------
+@replica_reads
 def home(request):
     """
     Homepage: search, featured vendors, premium combos & contact form.
@@ -84,16 +97,30 @@ def contact_view(request):
 # ----------------------
 # Vendor Search & Listing
 # ----------------------
+def _radius_km(request):
+    """`?km=` clamped to (0, GEO_MAX_RADIUS_KM]; default GEO_DEFAULT_RADIUS_KM."""
+    try:
+        km = float(request.GET.get("km", settings.GEO_DEFAULT_RADIUS_KM))
+    except ValueError:
+        km = settings.GEO_DEFAULT_RADIUS_KM
+    return min(max(km, 0.1), settings.GEO_MAX_RADIUS_KM)
+
+
+@replica_reads
 def search_vendor(request):
     query = request.GET.get("query", "").strip()
 
-    vendors = Vendor.objects.filter(
-        Q(pincode__icontains=query) |
-        Q(city__icontains=query) |
-        Q(name__icontains=query) |
-        Q(vendor_code__icontains=query),
-        is_active=True
-    )
+    # 📍 A known pincode → vendors around it, nearest first
+    if query.isdigit() and geo.knows(query):
+        vendors = geo.vendors_near(query, _radius_km(request))
+    else:
+        vendors = Vendor.objects.filter(
+            Q(pincode__icontains=query) |
+            Q(city__icontains=query) |
+            Q(name__icontains=query) |
+            Q(vendor_code__icontains=query),
+            is_active=True
+        )
 
     return render(request, "vendors/home.html", {
         "vendors": vendors,  # ✅ match template
@@ -121,25 +148,19 @@ def vendors_by_pincode(request, code=None):
 # ----------------------
 # Vendor Detail & Orders
 # ----------------------
+@replica_reads
 def vendor_detail(request, code: str):
     """Vendor detail page using vendor_code (e.g., SOT001)."""
-    vendor = get_object_or_404(Vendor, vendor_code=code, is_active=True)
-    menu_items = MenuItem.objects.filter(vendor=vendor, available=True)
-    moods = menu_items.values_list("mood", flat=True).distinct()
+    page = load_vendor_page(code)
 
-    # Track view count (optional field)
-    if hasattr(vendor, "view_count"):
-        try:
-            vendor.view_count += 1
-            vendor.save(update_fields=["view_count"])
-        except Exception as e:
-            logger.error(f"Failed to update view count for vendor {vendor.vendor_code}: {str(e)}")
+    try:
+        # F() on the primary: the page may be cached
+        with untracked_writes():
+            Vendor.objects.filter(pk=page.vendor.id).update(view_count=F("view_count") + 1)
+    except Exception as e:
+        logger.error(f"Failed to update view count for vendor {page.vendor.vendor_code}: {str(e)}")
 
-    return render(request, "vendors/vendor_detail.html", {
-        "vendor": vendor,
-        "menu_items": menu_items,
-        "moods": moods,
-    })
+    return render(request, "vendors/vendor_detail.html", page_context(page))
 
 
 def create_order(request, code: str):
@@ -189,7 +210,8 @@ def create_order(request, code: str):
 # ----------------------
 # AJAX / API Endpoints
 # ----------------------
-def ajax_search_vendor(request):
+@replica_reads
+async def ajax_search_vendor(request):
     """Live search API for vendors (autocomplete)."""
     query = request.GET.get("q", "").strip()
     vendors = Vendor.objects.filter(
@@ -207,11 +229,46 @@ def ajax_search_vendor(request):
         "pincode": getattr(v, "pincode", ""),
         "mobile": getattr(v, "mobile", ""),
         "image": v.image.url if v.image else "",
-    } for v in vendors]
+    } async for v in vendors]
 
     return JsonResponse({"vendors": results})
 
 
+@replica_reads
+async def nearby_vendors_api(request):
+    """Active, available vendors within `km` of `pincode`, nearest first."""
+    pincode = request.GET.get("pincode", "").strip()
+    km = _radius_km(request)
+    try:
+        limit = max(1, min(int(request.GET.get("limit", 50)), 200))
+    except ValueError:
+        limit = 50
+
+    if not pincode or not await sync_to_async(geo.knows)(pincode):
+        return JsonResponse({"error": "Unknown pincode", "pincode": pincode}, status=404)
+
+    hits = await sync_to_async(geo.nearby_vendors)(pincode, km, limit)
+    by_id = await Vendor.objects.only(
+        "vendor_code", "name", "city", "pincode", "image"
+    ).ain_bulk([vendor_id for vendor_id, _ in hits])
+
+    results = []
+    for vendor_id, distance in hits:
+        v = by_id.get(vendor_id)
+        if v is None:
+            continue
+        results.append({
+            "code": v.vendor_code,
+            "name": v.name,
+            "city": v.city,
+            "pincode": v.pincode,
+            "distance_km": round(distance, 2),
+            "image": v.image.url if v.image else "",
+        })
+
+    return JsonResponse({"pincode": pincode, "km": km, "vendors": results})
+
+
 @csrf_exempt
 def track_vendor_click(request, code: str):
     """Track vendor card clicks for analytics."""
@@ -225,6 +282,39 @@ def track_vendor_click(request, code: str):
     return JsonResponse({"status": "success"})
 
 
+# ----------------------
+# Monitoring
+# ----------------------
+def metrics(request):
+    """Prometheus text exposition of `core.metrics` (merged across workers); staff or METRICS_TOKEN only."""
+    token = getattr(settings, "METRICS_TOKEN", "")
+    if not request.user.is_staff:
+        if not token or not constant_time_compare(request.headers.get("Authorization", ""), f"Bearer {token}"):
+            return HttpResponse("Unauthorized", status=401, content_type="text/plain")
+
+    return HttpResponse(REGISTRY.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+# ----------------------
+# Sales Reports (served from the daily rollups, see core.rollups)
+# ----------------------
+@staff_member_required
+@replica_reads
+def vendor_sales_report(request, code: str):
+    """JSON sales of one vendor: ?start=&end= (YYYY-MM-DD, default the last 30 days)."""
+    vendor = get_object_or_404(Vendor, vendor_code__iexact=code)
+    try:
+        end = date.fromisoformat(request.GET["end"]) if request.GET.get("end") else timezone.localdate()
+        start = date.fromisoformat(request.GET["start"]) if request.GET.get("start") else end - timedelta(days=29)
+    except ValueError:
+        return JsonResponse({"error": "start and end must be YYYY-MM-DD"}, status=400)
+    if start > end or (end - start).days > 366:
+        return JsonResponse({"error": "start must be before end, at most a year apart"}, status=400)
+
+    report = rollups.vendor_report(vendor, start, end)
+    return JsonResponse({"vendor": vendor.vendor_code, "name": vendor.name, **report})
+
+
 # ----------------------
 # Admin / Dashboard
 # ----------------------
@@ -259,6 +349,7 @@ def filter_vendors(query=None, pincode=None, city=None):
         filters &= Q(city__icontains=city)
     return Vendor.objects.filter(filters)
 
+@replica_reads
 def menu(request):
     # build context for menu page (replace with your actual menu logic)
     context = {
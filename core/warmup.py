@@ -0,0 +1,108 @@
+# core/warmup.py
+"""
+Process warmup for preforked servers.
+
+`warm()` pays the first-request costs once: it compiles every URL pattern,
+compiles every template into the cached loader, builds the proximity index,
+maps the recommendations file, fills the page, nutrition and combo-rule
+caches of the most viewed vendors and pre-renders the full-page cache.
+gunicorn.conf.py runs it in the master after `preload_app` and then calls
+`prepare_fork()`, so workers start with all of it already in memory and
+share those pages copy-on-write.
+"""
+import gc
+import logging
+import time
+from pathlib import Path
+
+from django.db import connections
+from django.template import TemplateSyntaxError, engines
+from django.urls import URLResolver, get_resolver
+
+from menuitem import nutrition
+from orders import combo_rules
+from vendors.models import Vendor
+from vendors.page import load_vendor_page
+from . import geo, pagecache, recommender
+
+logger = logging.getLogger(__name__)
+
+WARM_VENDORS = 200
+
+
+def _compile_patterns(patterns):
+    count = 0
+    for pattern in patterns:
+        pattern.pattern.regex  # compiled lazily on first access
+        count += 1
+        if isinstance(pattern, URLResolver):
+            count += _compile_patterns(pattern.url_patterns)
+    return count
+
+
+def warm_urls():
+    resolver = get_resolver()
+    resolver.reverse_dict  # populates reverse / namespace dicts
+    return _compile_patterns(resolver.url_patterns)
+
+
+def warm_templates():
+    count = 0
+    for engine in engines.all():
+        dirs = list(engine.template_dirs)
+        for root in map(Path, dirs):
+            for path in root.rglob("*.html"):
+                try:
+                    engine.get_template(path.relative_to(root).as_posix())
+                    count += 1
+                except TemplateSyntaxError as exc:
+                    logger.warning(f"Warmup skipped template {path}: {exc}")
+    return count
+
+
+def warm_vendors(limit=WARM_VENDORS):
+    """Page, nutrition and combo-rule caches of the `limit` most viewed vendors."""
+    vendors = (
+        Vendor.objects.filter(is_active=True, vendor_code__isnull=False)
+        .order_by("-view_count", "id")
+        .values_list("id", "vendor_code")[:limit]
+    )
+    count = 0
+    for vendor_id, code in vendors:
+        load_vendor_page(code)
+        nutrition.vendor_matrix(vendor_id)
+        combo_rules.for_vendor(vendor_id)
+        count += 1
+    return count
+
+
+def warm(vendors=WARM_VENDORS):
+    """Run every warmup step; returns {step: (items, seconds)}."""
+    steps = (
+        ("urls", warm_urls),
+        ("templates", warm_templates),
+        ("geo_index", lambda: len(geo.get_index().coords)),
+        ("recommendations", lambda: len(recommender.get_recommendations().items)),
+        ("vendors", lambda: warm_vendors(vendors)),
+        ("pages", pagecache.prerender),
+    )
+    timings = {}
+    for name, step in steps:
+        started = time.perf_counter()
+        try:
+            items = step()
+        except Exception as exc:  # a cold cache is slower, not broken
+            logger.warning(f"Warmup step {name} failed: {exc}")
+            items = None
+        timings[name] = (items, time.perf_counter() - started)
+    return timings
+
+
+def prepare_fork():
+    """Call in the master right before workers are forked."""
+    # Sockets must not be shared between workers
+    connections.close_all()
+    # Move everything allocated so far out of the collector's reach, so GC
+    # passes in the workers don't touch (and un-share) those pages
+    gc.collect()
+    gc.freeze()
@@ -0,0 +1,81 @@
+# customers/middleware.py
+"""
+Request-scoped customer resolution.
+
+The Customer row is created once, at signup or login (customers/signals.py),
+and its id is kept in the session. `request.customer` is then a model
+instance built from that id without a query: every other field is deferred
+and only loaded if a view reads it, so ownership checks such as
+`Order.objects.filter(pk=..., customer=request.customer)` never touch the
+customers table. Sessions that predate the login hook fall back to one
+get_or_create, after which the id is cached the same way.
+"""
+from functools import partial
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.utils.functional import SimpleLazyObject
+
+from .models import Customer
+
+SESSION_KEY = "_customer_id"
+
+
+def _from_id(customer_id, user):
+    """Customer with only id / user_id loaded; other fields load on first access."""
+    customer = Customer.from_db("default", ["id", "user_id"], [customer_id, user.pk])
+    Customer._meta.get_field("user").set_cached_value(customer, user)
+    return customer
+
+
+def remember(session, customer):
+    session[SESSION_KEY] = customer.pk
+
+
+def get_customer(request):
+    user = request.user
+    if not user.is_authenticated:
+        return None
+    customer_id = request.session.get(SESSION_KEY)
+    if customer_id is None:
+        customer, _ = Customer.objects.get_or_create(user=user, defaults={"name": user.get_username()})
+        remember(request.session, customer)
+        return customer
+    return _from_id(customer_id, user)
+
+
+async def aget_customer(request):
+    user = await request.auser()
+    if not user.is_authenticated:
+        return None
+    customer_id = await request.session.aget(SESSION_KEY)
+    if customer_id is None:
+        customer, _ = await Customer.objects.aget_or_create(user=user, defaults={"name": user.get_username()})
+        await request.session.aset(SESSION_KEY, customer.pk)
+        return customer
+    return _from_id(customer_id, user)
+
+
+class CustomerMiddleware:
+    """Adds lazy `request.customer` and `await request.acustomer()`; needs AuthenticationMiddleware."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def _attach(self, request):
+        request.customer = SimpleLazyObject(partial(get_customer, request))
+        request.acustomer = partial(aget_customer, request)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        self._attach(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        self._attach(request)
+        return await self.get_response(request)
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-19 08:32
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['pincode', 'id'], name='customers_c_pincode_088e96_idx'),
+        ),
+    ]
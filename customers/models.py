@@ -24,6 +24,7 @@ class Customer(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [models.Index(fields=["pincode", "id"])]  # 📇 directory API: pincode filter + keyset
 
     def __str__(self):
         return self.name or (self.user.username if self.user else f"Customer #{self.id}")
@@ -0,0 +1,21 @@
+# customers/signals.py
+from django.contrib.auth import get_user_model
+from django.contrib.auth.signals import user_logged_in
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .middleware import remember
+from .models import Customer
+
+
+@receiver(post_save, sender=get_user_model())
+def create_customer_on_signup(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        Customer.objects.get_or_create(user=instance, defaults={"name": instance.get_username()})
+
+
+@receiver(user_logged_in)
+def remember_customer_on_login(sender, request, user, **kwargs):
+    customer, _ = Customer.objects.get_or_create(user=user, defaults={"name": user.get_username()})
+    if request is not None and hasattr(request, "session"):
+        remember(request.session, customer)
@@ -1,6 +1,7 @@
 # customers/views.py
 from django.shortcuts import render, get_object_or_404
-from django.http import JsonResponse
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
 from django.contrib.auth.decorators import login_required
 from .models import Customer
 
@@ -12,14 +13,86 @@ def customer_profile(request):
     return render(request, "customers/profile.html", {"customer": customer})
 
 
+# ----------------------
+# Customer directory API
+# ----------------------
+# Public field name → ORM lookup
+LIST_FIELDS = {
+    "id": "id",
+    "username": "user__username",
+    "name": "name",
+    "phone": "phone",
+    "email": "email",
+    "city": "city",
+    "pincode": "pincode",
+    "created_at": "created_at",
+}
+DEFAULT_LIST_FIELDS = ("id", "username", "name", "phone", "city", "pincode", "created_at")
+LIST_PAGE_SIZE = 100
+LIST_MAX_PAGE_SIZE = 1_000
+STREAM_CHUNK_SIZE = 2_000
+
+
+def _list_query(request):
+    """(values queryset newest first, public field names) from ?fields=&city=&pincode=&cursor=."""
+    names = [f.strip() for f in request.GET.get("fields", "").split(",") if f.strip()] or list(DEFAULT_LIST_FIELDS)
+    unknown = [f for f in names if f not in LIST_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+
+    # Keyset pagination on the primary key: `cursor` is the last id of the previous page
+    qs = Customer.objects.order_by("-id")
+    if request.GET.get("city"):
+        qs = qs.filter(city__iexact=request.GET["city"].strip())
+    if request.GET.get("pincode"):
+        qs = qs.filter(pincode=request.GET["pincode"].strip())
+    if request.GET.get("cursor"):
+        qs = qs.filter(id__lt=int(request.GET["cursor"]))
+
+    lookups = [LIST_FIELDS[f] for f in names]
+    if "id" not in names:
+        lookups.append("id")  # needed for next_cursor
+    return qs.values_list(*lookups), names
+
+
+def _ndjson_lines(rows, names):
+    encoder = DjangoJSONEncoder(separators=(",", ":"))
+    for row in rows:
+        yield encoder.encode(dict(zip(names, row))) + "\n"
+
+
 @login_required
 def customer_list(request):
-    """Admin/staff can see all customers (basic example)."""
+    """
+    Staff-only customer directory.
+
+    JSON pages of `?limit=` rows with a `next_cursor` to pass back as
+    `?cursor=`; `?format=ndjson` instead streams every matching row, one
+    JSON object per line, iterating with a server-side cursor.
+    """
     if not request.user.is_staff:
         return JsonResponse({"error": "Unauthorized"}, status=403)
-    
-    customers = Customer.objects.all().values("id", "user__username", "mobile", "city", "pincode", "created_at")
-    return JsonResponse(list(customers), safe=False)
+
+    try:
+        rows, names = _list_query(request)
+        limit = min(max(int(request.GET.get("limit", LIST_PAGE_SIZE)), 1), LIST_MAX_PAGE_SIZE)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    if request.GET.get("format") == "ndjson":
+        return StreamingHttpResponse(
+            _ndjson_lines(rows.iterator(chunk_size=STREAM_CHUNK_SIZE), names),
+            content_type="application/x-ndjson",
+        )
+
+    page = list(rows[:limit + 1])
+    more = len(page) > limit
+    page = page[:limit]
+    id_at = names.index("id") if "id" in names else len(names)
+    return JsonResponse({
+        "results": [dict(zip(names, row)) for row in page],
+        "next_cursor": page[-1][id_at] if more else None,
+    })
 
 
 @login_required
@@ -28,11 +101,11 @@ def customer_detail(request, pk):
     customer = get_object_or_404(Customer, pk=pk)
     data = {
         "id": customer.id,
-        "username": customer.user.username,
-        "mobile": customer.mobile,
+        "username": customer.user.username if customer.user else None,
+        "name": customer.name,
+        "phone": customer.phone,
         "city": customer.city,
         "pincode": customer.pincode,
-        "address": customer.address,
         "created_at": customer.created_at,
     }
     return JsonResponse(data)
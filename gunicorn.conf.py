@@ -0,0 +1,47 @@
+# gunicorn.conf.py
+"""
+Gunicorn settings (picked up automatically from the project root).
+
+The app is imported once in the master (`preload_app`), warmed there by
+`core.warmup` — URL patterns, templates, proximity index, recommendations,
+vendor page / nutrition / combo-rule caches — and only then forked, so every
+worker starts warm and shares that memory copy-on-write instead of paying
+cold imports and cold caches on its first requests after each deploy.
+
+Workers are recycled after GUNICORN_MAX_REQUESTS (± jitter, so they don't
+all restart at once); the replacement is forked from the warm master.
+Bind address and worker count follow gunicorn's own PORT / WEB_CONCURRENCY.
+"""
+import os
+
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "uvicorn_worker.UvicornWorker")
+# Sync / threaded workers need the WSGI entry point
+wsgi_app = (
+    "streetkitchen.wsgi:application" if worker_class in ("sync", "gthread")
+    else "streetkitchen.asgi:application"
+)
+
+preload_app = True
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "2000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "200"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = 30
+keepalive = 5
+accesslog = "-"
+errorlog = "-"
+
+# Vendors warmed before fork (most viewed first); 0 skips the vendor caches
+WARM_VENDORS = int(os.getenv("GUNICORN_WARM_VENDORS", "200"))
+
+
+def when_ready(server):
+    # Runs in the master after the preloaded app is imported, before the first fork
+    from core import warmup
+
+    for name, (items, seconds) in warmup.warm(vendors=WARM_VENDORS).items():
+        server.log.info(f"🔥 warmup {name}: {items} in {seconds * 1000:.0f}ms")
+    warmup.prepare_fork()
+
+
+def post_fork(server, worker):
+    server.log.info(f"👷 worker {worker.pid} forked from warm master")
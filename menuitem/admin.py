@@ -1,8 +1,22 @@
 from django.contrib import admin
-from .models import MenuItem
+from .models import Ingredient, MenuItem, MenuItemIngredient
+
+
+class MenuItemIngredientInline(admin.TabularInline):
+    model = MenuItemIngredient
+    extra = 1
+    autocomplete_fields = ["ingredient"]
+
+
+@admin.register(Ingredient)
+class IngredientAdmin(admin.ModelAdmin):
+    list_display = ("name", "unit", "calories", "protein", "carbs", "fat", "fiber")
+    search_fields = ("name",)
+
 
 @admin.register(MenuItem)
 class MenuItemAdmin(admin.ModelAdmin):
     list_display = ('name', 'price', 'vendor')  # only actual fields
     list_filter = ('vendor',)  # only actual fields
     search_fields = ('name',)  # needed for autocomplete_fields in other inlines
+    inlines = [MenuItemIngredientInline]  # recipe → nutrient fields (menuitem.signals)
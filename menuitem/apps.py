@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class MenuitemConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'menuitem'
+
+    def ready(self):
+        from . import signals  # noqa: F401  (registers receivers)
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.6 on 2026-10-19 08:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menuitem', '0012_alter_comborule_required_chutney'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Ingredient',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('unit', models.CharField(default='100 g', max_length=50)),
+                ('calories', models.DecimalField(decimal_places=2, default=0, max_digits=8)),
+                ('protein', models.DecimalField(decimal_places=2, default=0, max_digits=8)),
+                ('carbs', models.DecimalField(decimal_places=2, default=0, max_digits=8)),
+                ('fat', models.DecimalField(decimal_places=2, default=0, max_digits=8)),
+                ('fiber', models.DecimalField(decimal_places=2, default=0, max_digits=8)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='combo',
+            name='nutrition',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.CreateModel(
+            name='MenuItemIngredient',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.DecimalField(decimal_places=3, default=1, max_digits=8)),
+                ('ingredient', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='menu_items', to='menuitem.ingredient')),
+                ('menu_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ingredients', to='menuitem.menuitem')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('menu_item', 'ingredient'), name='unique_menuitem_ingredient')],
+            },
+        ),
+    ]
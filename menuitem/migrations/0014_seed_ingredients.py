@@ -0,0 +1,36 @@
+from django.db import migrations
+
+# Per-serving values that used to be hardcoded in vendors.views.ai_combo_suggestions
+INGREDIENTS = [
+    # name, unit, calories, protein, carbs, fat, fiber
+    ("Idli", "1 idli (~50 g)", 58, 2, 12, 0.4, 0.7),
+    ("Sambar", "100 ml", 100, 5, 12, 3, 3),
+    ("Coconut Chutney", "1 serving", 80, 1, 4, 7, 2),
+    ("Peanut Chutney", "1 serving", 90, 4, 5, 7, 2),
+    ("Onion-Tomato Chutney", "1 serving", 50, 1, 8, 1, 2),
+]
+
+
+def seed(apps, schema_editor):
+    Ingredient = apps.get_model("menuitem", "Ingredient")
+    for name, unit, calories, protein, carbs, fat, fiber in INGREDIENTS:
+        Ingredient.objects.get_or_create(name=name, defaults={
+            "unit": unit, "calories": calories, "protein": protein,
+            "carbs": carbs, "fat": fat, "fiber": fiber,
+        })
+
+
+def unseed(apps, schema_editor):
+    Ingredient = apps.get_model("menuitem", "Ingredient")
+    Ingredient.objects.filter(name__in=[row[0] for row in INGREDIENTS], menu_items__isnull=True).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menuitem', '0013_ingredient_combo_nutrition_menuitemingredient'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed, unseed),
+    ]
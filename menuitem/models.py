@@ -2,6 +2,23 @@ from django.db import models
 from django.utils import timezone
 
 
+# 🔹 Canonical ingredient nutrition (per unit, e.g. "1 idli (~50 g)" or "100 ml")
+class Ingredient(models.Model):
+    name = models.CharField(max_length=100, unique=True)
+    unit = models.CharField(max_length=50, default="100 g")
+    calories = models.DecimalField(max_digits=8, decimal_places=2, default=0)
+    protein = models.DecimalField(max_digits=8, decimal_places=2, default=0)
+    carbs = models.DecimalField(max_digits=8, decimal_places=2, default=0)
+    fat = models.DecimalField(max_digits=8, decimal_places=2, default=0)
+    fiber = models.DecimalField(max_digits=8, decimal_places=2, default=0)
+
+    class Meta:
+        ordering = ["name"]
+
+    def __str__(self):
+        return f"{self.name} (per {self.unit})"
+
+
 # 🔹 Individual menu item (raw items)
 class MenuItem(models.Model):
     CATEGORY_CHOICES = [
@@ -23,7 +40,7 @@ class MenuItem(models.Model):
     # ✅ Availability toggle
     is_available = models.BooleanField(default=True)
 
-    # ✅ Nutrition fields
+    # ✅ Nutrition fields (derived from `ingredients` when the recipe is known)
     calories = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True)
     protein = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True)
     carbs = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True)
@@ -39,6 +56,21 @@ class MenuItem(models.Model):
         verbose_name_plural = "Menu Items"
 
 
+# 🔹 Recipe line: how many units of an ingredient one serving of a menu item uses
+class MenuItemIngredient(models.Model):
+    menu_item = models.ForeignKey(MenuItem, on_delete=models.CASCADE, related_name="ingredients")
+    ingredient = models.ForeignKey(Ingredient, on_delete=models.PROTECT, related_name="menu_items")
+    quantity = models.DecimalField(max_digits=8, decimal_places=3, default=1)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["menu_item", "ingredient"], name="unique_menuitem_ingredient")
+        ]
+
+    def __str__(self):
+        return f"{self.menu_item.name}: {self.quantity} × {self.ingredient.name}"
+
+
 # 🔹 Rule for forming a predefined combo
 class ComboRule(models.Model):
     vendor = models.ForeignKey(
@@ -76,6 +108,9 @@ class Combo(models.Model):
     price = models.DecimalField(max_digits=10, decimal_places=2, default=80)
     is_available = models.BooleanField(default=True)
 
+    # 🔹 Nutrition label, batch-filled by `manage.py refresh_nutrition`
+    nutrition = models.JSONField(default=dict, blank=True)
+
     # 🔹 Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
 
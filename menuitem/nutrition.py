@@ -0,0 +1,240 @@
+# menuitem/nutrition.py
+"""
+Nutrition vectors and basket totals.
+
+Every menu item has a fixed-width vector (NUTRIENTS). Items with a recipe
+(`MenuItemIngredient` rows) get it derived from the canonical `Ingredient`
+table and written to their own fields; the others keep what the vendor
+entered. Per vendor, all vectors are packed row-major into one flat
+`array("d")` (items × nutrients), cached in the Django cache and dropped
+whenever one of the vendor's items changes, so a basket total is one pass
+of qty × row over the flat matrix instead of a Decimal per field per item.
+"""
+from array import array
+from collections import defaultdict
+from decimal import Decimal
+
+from django.core.cache import cache
+
+from core.metrics import record_cache_lookup
+from orders.models import CustomCombo, CustomComboItem
+from vendors.models import ComboItem
+from vendors.page import bump_menu_version
+from .models import Combo, Ingredient, MenuItem, MenuItemIngredient
+
+NUTRIENTS = ("calories", "protein", "carbs", "fat", "fiber")
+WIDTH = len(NUTRIENTS)
+CACHE_TIMEOUT = 60 * 60
+_VERSION = 1  # bump when NutritionMatrix changes shape
+
+
+def _vector(obj):
+    return tuple(float(getattr(obj, name) or 0) for name in NUTRIENTS)
+
+
+def label(values):
+    """Rounded {nutrient: amount} dict for templates and JSON."""
+    return {name: round(value, 1) for name, value in zip(NUTRIENTS, values)}
+
+
+# ----------------------
+# Matrix
+# ----------------------
+class NutritionMatrix:
+    """Nutrient vectors of one vendor's menu, packed into a flat array."""
+
+    __slots__ = ("vendor_id", "rows", "names", "values")
+
+    def __init__(self, vendor_id, items):
+        self.vendor_id = vendor_id
+        self.rows = {}  # menu item id → row
+        self.names = {}  # lowercase name → row (first item wins)
+        self.values = array("d")
+        for row, (item_id, name, vector) in enumerate(items):
+            self.rows[item_id] = row
+            self.names.setdefault(name.lower(), row)
+            self.values.extend(vector)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def vector(self, item_id):
+        row = self.rows[item_id]
+        return tuple(self.values[row * WIDTH:(row + 1) * WIDTH])
+
+    def _dot(self, weighted_rows):
+        totals = [0.0] * WIDTH
+        values = self.values
+        for row, qty in weighted_rows:
+            base = row * WIDTH
+            for j in range(WIDTH):
+                totals[j] += qty * values[base + j]
+        return totals
+
+    def totals(self, quantities):
+        """Basket totals for {menu_item_id: qty}; unknown items count as zero."""
+        rows = self.rows
+        return self._dot((rows[i], float(q)) for i, q in quantities.items() if i in rows)
+
+    def totals_by_name(self, quantities):
+        """
+        Basket totals for {name: qty}, falling back to the ingredient table
+        for names not on the menu or on it without any nutrients entered.
+        """
+        found, missing = [], {}
+        for name, qty in quantities.items():
+            row = self.names.get(name.lower())
+            if row is not None and any(self.values[row * WIDTH:(row + 1) * WIDTH]):
+                found.append((row, float(qty)))
+            else:
+                missing[name.lower()] = qty
+        totals = self._dot(found)
+        if missing:
+            fallback = ingredient_vectors()
+            for name, qty in missing.items():
+                for j, value in enumerate(fallback.get(name, ())):
+                    totals[j] += float(qty) * value
+        return totals
+
+
+def _cache_key(vendor_id):
+    return f"nutrition:v{_VERSION}:vendor:{vendor_id}"
+
+
+def vendor_matrix(vendor_id):
+    """The vendor's NutritionMatrix (available items), from the cache when possible."""
+    key = _cache_key(vendor_id)
+    matrix = cache.get(key)
+    record_cache_lookup("nutrition_matrix", matrix is not None)
+    if matrix is None:
+        items = MenuItem.objects.filter(vendor_id=vendor_id, is_available=True).order_by("id")
+        matrix = NutritionMatrix(
+            vendor_id, ((item.id, item.name, _vector(item)) for item in items.only("id", "name", *NUTRIENTS))
+        )
+        cache.set(key, matrix, CACHE_TIMEOUT)
+    return matrix
+
+
+def basket_by_name(vendor_id, quantities):
+    return vendor_matrix(vendor_id).totals_by_name(quantities)
+
+
+def invalidate_vendor(*vendor_ids):
+    cache.delete_many([_cache_key(vendor_id) for vendor_id in vendor_ids])
+
+
+def ingredient_vectors():
+    """{lowercase ingredient name: vector} of the canonical table."""
+    key = f"nutrition:v{_VERSION}:ingredients"
+    vectors = cache.get(key)
+    record_cache_lookup("nutrition_ingredients", vectors is not None)
+    if vectors is None:
+        vectors = {i.name.lower(): _vector(i) for i in Ingredient.objects.all()}
+        cache.set(key, vectors, CACHE_TIMEOUT)
+    return vectors
+
+
+def invalidate_ingredients():
+    cache.delete(f"nutrition:v{_VERSION}:ingredients")
+
+
+# ----------------------
+# Recipes → menu item vectors
+# ----------------------
+def derive_menu_items(menu_item_ids=None, recipe_removed=False):
+    """
+    Recompute the nutrient fields of menu items that have a recipe from the
+    ingredient table (all such items if `menu_item_ids` is None). Items
+    without recipe lines keep what the vendor entered, except with
+    `recipe_removed` (the requested items just lost recipe lines): those
+    left with none get their derived nutrients cleared. Returns the number
+    of items updated.
+    """
+    from vendors import snapshots  # vendors.snapshots imports this module
+
+    lines = MenuItemIngredient.objects.values_list(
+        "menu_item_id", "quantity", *(f"ingredient__{name}" for name in NUTRIENTS)
+    )
+    cleared = set()
+    if menu_item_ids is not None:
+        menu_item_ids = set(menu_item_ids)
+        lines = lines.filter(menu_item_id__in=menu_item_ids)
+        if recipe_removed:
+            cleared = menu_item_ids
+
+    totals = defaultdict(lambda: [Decimal("0")] * WIDTH)
+    for item_id, qty, *values in lines:
+        vector = totals[item_id]
+        for j, value in enumerate(values):
+            vector[j] += qty * value
+    ids = cleared | set(totals)
+    if not ids:
+        return 0
+
+    items = list(MenuItem.objects.filter(id__in=ids).only("id", "vendor_id", *NUTRIENTS))
+    for item in items:
+        vector = totals.get(item.id)
+        for j, name in enumerate(NUTRIENTS):
+            setattr(item, name, None if vector is None else vector[j].quantize(Decimal("0.01")))
+    if not items:
+        return 0
+    MenuItem.objects.bulk_update(items, NUTRIENTS, batch_size=1_000)
+    # bulk_update sends no signals
+    vendor_ids = {item.vendor_id for item in items}
+    invalidate_vendor(*vendor_ids)
+    bump_menu_version(*vendor_ids)
+    snapshots.schedule_publish(*vendor_ids)
+    return len(items)
+
+
+# ----------------------
+# Combo labels
+# ----------------------
+def _labels(lines):
+    """{owner_id: label} from (owner_id, menu_item_id, qty) rows, vectors fetched in one query."""
+    lines = list(lines)
+    vectors = {
+        item.id: _vector(item)
+        for item in MenuItem.objects.filter(id__in={line[1] for line in lines}).only("id", *NUTRIENTS)
+    }
+    totals = defaultdict(lambda: [0.0] * WIDTH)
+    for owner_id, item_id, qty in lines:
+        vector = vectors.get(item_id)
+        if vector is None:
+            continue
+        row = totals[owner_id]
+        for j in range(WIDTH):
+            row[j] += qty * vector[j]
+    return {owner_id: label(values) for owner_id, values in totals.items()}
+
+
+def combo_labels(combo_ids=None):
+    lines = ComboItem.objects.values_list("combo_id", "menu_item_id", "quantity")
+    if combo_ids is not None:
+        lines = lines.filter(combo_id__in=combo_ids)
+    return _labels(lines)
+
+
+def custom_combo_labels(custom_combo_ids=None):
+    lines = CustomComboItem.objects.filter(custom_combo__isnull=False, menu_item__isnull=False).values_list(
+        "custom_combo_id", "menu_item_id", "quantity"
+    )
+    if custom_combo_ids is not None:
+        lines = lines.filter(custom_combo_id__in=custom_combo_ids)
+    return _labels(lines)
+
+
+def refresh_labels():
+    """Store a nutrition label on every Combo and CustomCombo; returns (combos, custom combos) updated."""
+    counts = []
+    for model, labels in ((Combo, combo_labels()), (CustomCombo, custom_combo_labels())):
+        empty = label([0.0] * WIDTH)
+        changed = []
+        for obj in model.objects.only("id", "nutrition").iterator(chunk_size=2_000):
+            new = labels.get(obj.id, empty)
+            if obj.nutrition != new:
+                obj.nutrition = new
+                changed.append(obj)
+        model.objects.bulk_update(changed, ["nutrition"], batch_size=1_000)
+        counts.append(len(changed))
+    return tuple(counts)
@@ -0,0 +1,28 @@
+# menuitem/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import nutrition
+from .models import Ingredient, MenuItem, MenuItemIngredient
+
+
+@receiver([post_save, post_delete], sender=MenuItem)
+def drop_vendor_matrix(sender, instance, **kwargs):
+    """Availability, names and nutrients all live in the vendor's nutrition matrix."""
+    nutrition.invalidate_vendor(instance.vendor_id)
+
+
+@receiver(post_save, sender=MenuItemIngredient)
+def rederive_menu_item(sender, instance, **kwargs):
+    nutrition.derive_menu_items([instance.menu_item_id])
+
+
+@receiver(post_delete, sender=MenuItemIngredient)
+def rederive_menu_item_without_line(sender, instance, **kwargs):
+    nutrition.derive_menu_items([instance.menu_item_id], recipe_removed=True)
+
+
+@receiver([post_save, post_delete], sender=Ingredient)
+def rederive_ingredient_users(sender, instance, **kwargs):
+    nutrition.invalidate_ingredients()
+    nutrition.derive_menu_items(instance.menu_items.values_list("menu_item_id", flat=True))
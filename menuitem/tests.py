@@ -1,3 +1,29 @@
+from decimal import Decimal
+
 from django.test import TestCase
 
-# Create your tests here.
+from vendors.models import Vendor
+from . import nutrition
+from .models import Ingredient, MenuItem, MenuItemIngredient
+
+
+class DeriveMenuItemsTests(TestCase):
+    def setUp(self):
+        self.vendor = Vendor.objects.create(name="Derive Kitchen", vendor_code="DERIVE01")
+        self.rice = Ingredient.objects.create(name="Rice", calories=100, protein=2, carbs=20, fat=1, fiber=1)
+
+    def test_hand_entered_nutrients_are_kept(self):
+        item = MenuItem.objects.create(vendor=self.vendor, name="Vada", price=15, calories=130, protein=5)
+        nutrition.derive_menu_items([item.pk])
+        item.refresh_from_db()
+        self.assertEqual((item.calories, item.protein), (Decimal("130"), Decimal("5")))
+
+    def test_removing_the_last_recipe_line_clears_derived_nutrients(self):
+        item = MenuItem.objects.create(vendor=self.vendor, name="Rice Bowl", price=40)
+        line = MenuItemIngredient.objects.create(menu_item=item, ingredient=self.rice, quantity=2)
+        item.refresh_from_db()
+        self.assertEqual(item.calories, Decimal("200.00"))
+
+        line.delete()
+        item.refresh_from_db()
+        self.assertIsNone(item.calories)
@@ -1,5 +1,6 @@
 # orders/admin.py
-from django.contrib import admin
+from django.contrib import admin, messages
+from . import state
 from .models import Order, OrderItem, CustomCombo, CustomComboItem, ComboRule
 
 
@@ -143,7 +144,8 @@ class OrderAdmin(admin.ModelAdmin):
     search_fields = ("id", "customer__name", "customer__user__username", "vendor__name")
     ordering = ("-created_at",)
     inlines = [OrderItemInline]
-    readonly_fields = ("total_price",)
+    # Status changes go through the actions (orders.state), never a form save
+    readonly_fields = ("total_price", "status", "version")
 
     def get_customer_name(self, obj):
         customer = obj.customer
@@ -169,14 +171,22 @@ class OrderAdmin(admin.ModelAdmin):
     # Bulk actions
     actions = ["mark_confirmed", "mark_delivered", "mark_cancelled"]
 
+    def _transition(self, request, queryset, new_status):
+        # Each order guarded by the version read here; updated_at bump keeps sales rollups current
+        moved, conflicts = state.transition_many(state.current_versions(queryset), new_status, note="Admin action")
+        if moved:
+            self.message_user(request, f"{len(moved)} order(s) marked {new_status}.", messages.SUCCESS)
+        for conflict in conflicts:
+            self.message_user(request, str(conflict), messages.WARNING)
+
     def mark_confirmed(self, request, queryset):
-        queryset.update(status="confirmed")
+        self._transition(request, queryset, "confirmed")
     mark_confirmed.short_description = "Mark selected orders as Confirmed"
 
     def mark_delivered(self, request, queryset):
-        queryset.update(status="delivered")
+        self._transition(request, queryset, "delivered")
     mark_delivered.short_description = "Mark selected orders as Delivered"
 
     def mark_cancelled(self, request, queryset):
-        queryset.update(status="cancelled")
+        self._transition(request, queryset, "cancelled")
     mark_cancelled.short_description = "Mark selected orders as Cancelled"
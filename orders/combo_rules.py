@@ -0,0 +1,106 @@
+# orders/combo_rules.py
+"""
+ComboRule evaluation.
+
+A vendor's active rules are loaded once, compiled into a tuple of plain
+rows and kept in the Django cache until a rule (or the menu item it points
+at) changes. Evaluating a basket is then a pass over those rows with a
+{menu_item_id: quantity} map — no queries — and reports every violation
+and every triggered discount at once.
+"""
+from decimal import Decimal
+
+from django.core.cache import cache
+
+from core.metrics import record_cache_lookup
+from .models import ComboRule
+
+CACHE_TIMEOUT = 60 * 60
+
+
+class CompiledRule:
+    __slots__ = ("menu_item_id", "menu_item_name", "min_quantity", "discount_percentage")
+
+    def __init__(self, menu_item_id, menu_item_name, min_quantity, discount_percentage):
+        self.menu_item_id = menu_item_id
+        self.menu_item_name = menu_item_name
+        self.min_quantity = min_quantity
+        self.discount_percentage = discount_percentage
+
+
+class Evaluation:
+    __slots__ = ("violations", "triggered")
+
+    def __init__(self):
+        self.violations = []  # human-readable messages
+        self.triggered = []  # CompiledRule met by the basket
+
+    @property
+    def ok(self):
+        return not self.violations
+
+    @property
+    def discount_percentage(self):
+        return sum((rule.discount_percentage for rule in self.triggered), Decimal("0"))
+
+
+class RuleSet:
+    """A vendor's active rules, ready to evaluate baskets."""
+
+    __slots__ = ("vendor_id", "rules")
+
+    def __init__(self, vendor_id, rules):
+        self.vendor_id = vendor_id
+        self.rules = tuple(rules)
+
+    def __iter__(self):
+        return iter(self.rules)
+
+    def __len__(self):
+        return len(self.rules)
+
+    def evaluate(self, quantities):
+        """Check a {menu_item_id: quantity} basket against every rule."""
+        result = Evaluation()
+        for rule in self.rules:
+            qty = quantities.get(rule.menu_item_id, 0)
+            if qty >= rule.min_quantity:
+                result.triggered.append(rule)
+            else:
+                result.violations.append(
+                    f"'{rule.menu_item_name}' requires at least {rule.min_quantity} item(s), but got {qty}."
+                )
+        return result
+
+
+def _cache_key(vendor_id):
+    return f"comborules:vendor:{vendor_id}"
+
+
+def for_vendor(vendor_id):
+    """The vendor's compiled RuleSet (one query on a cache miss)."""
+    key = _cache_key(vendor_id)
+    ruleset = cache.get(key)
+    record_cache_lookup("combo_rules", ruleset is not None)
+    if ruleset is None:
+        rows = (
+            ComboRule.objects.filter(menu_item__vendor_id=vendor_id, is_active=True)
+            .order_by("menu_item__name", "min_quantity")
+            .values_list("menu_item_id", "menu_item__name", "min_quantity", "discount_percentage")
+        )
+        ruleset = RuleSet(vendor_id, (CompiledRule(*row) for row in rows))
+        cache.set(key, ruleset, CACHE_TIMEOUT)
+    return ruleset
+
+
+def invalidate(*vendor_ids):
+    cache.delete_many([_cache_key(vendor_id) for vendor_id in vendor_ids])
+
+
+def quantities(lines):
+    """{menu_item_id: total quantity} from (menu_item_id, quantity) pairs."""
+    totals = {}
+    for menu_item_id, qty in lines:
+        if menu_item_id is not None:
+            totals[menu_item_id] = totals.get(menu_item_id, 0) + (qty or 0)
+    return totals
@@ -0,0 +1,201 @@
+# orders/idempotency.py
+"""
+Idempotent order creation.
+
+Clients on flaky networks retry order-creating requests. `@idempotent`
+runs the view once per key and replays its stored response to every retry:
+
+- key: the `Idempotency-Key` header, scoped to the user and endpoint. If
+  the header is missing, a fingerprint of the path and body (same customer,
+  same cart) is used instead, with a short TTL that catches double-submits
+  but still lets a customer deliberately order the same thing again later.
+- lock: the first request inserts an IdempotencyKey row (unique on user and
+  key). A concurrent duplicate hits the unique constraint and waits for that
+  row to complete instead of running the view a second time. This works
+  across workers without a shared cache.
+- replay: completed responses (status < 500) are kept until the TTL ends,
+  both in the cache and in the row. A 5xx or an exception releases the key
+  so the retry runs again. Reusing a key for a different request gets 422.
+"""
+import functools
+import hashlib
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.http import HttpResponse, JsonResponse
+from django.utils import timezone
+
+from core.metrics import record_cache_lookup
+from .models import IdempotencyKey
+
+HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+REPLAYED_HEADERS = ("Content-Type", "Location")
+POLL_INTERVAL = 0.05  # seconds between checks while a duplicate waits
+
+
+def _digest(*parts):
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part if isinstance(part, bytes) else str(part).encode())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def _cache_key(user_id, key):
+    return f"idempotency:{user_id}:{key}"
+
+
+def _mismatch():
+    return JsonResponse(
+        {"success": False, "message": f"{HEADER} was already used for a different request."},
+        status=422,
+    )
+
+
+def _replay(status_code, content, headers):
+    response = HttpResponse(bytes(content), status=status_code)
+    for name, value in headers.items():
+        response[name] = value
+    response["Idempotent-Replayed"] = "true"
+    return response
+
+
+def _in_progress():
+    response = JsonResponse(
+        {"success": False, "message": f"A request with this {HEADER} is still being processed."},
+        status=409,
+    )
+    response["Retry-After"] = "1"
+    return response
+
+
+class _Claim:
+    """Outcome of trying to own a key: `owned`, or the stored `record` to replay."""
+    __slots__ = ("owned", "record")
+
+    def __init__(self, owned=False, record=None):
+        self.owned = owned
+        self.record = record
+
+
+def _claim(user_id, key, fingerprint, ttl):
+    now = timezone.now()
+    locked_until = now + timedelta(seconds=settings.IDEMPOTENCY_LOCK_TIMEOUT)
+    expires_at = now + timedelta(seconds=ttl)
+    try:
+        with transaction.atomic():
+            IdempotencyKey.objects.create(
+                user_id=user_id, key=key, fingerprint=fingerprint,
+                locked_until=locked_until, expires_at=expires_at,
+            )
+        return _Claim(owned=True)
+    except IntegrityError:
+        pass
+
+    # Take over an expired record, or a lock whose holder died mid-request
+    taken = IdempotencyKey.objects.filter(user_id=user_id, key=key).filter(
+        Q(expires_at__lte=now) | Q(status_code__isnull=True, locked_until__lte=now)
+    ).update(
+        fingerprint=fingerprint, status_code=None, content=b"", headers={},
+        locked_until=locked_until, expires_at=expires_at,
+    )
+    if taken:
+        return _Claim(owned=True)
+    return _Claim(record=IdempotencyKey.objects.filter(user_id=user_id, key=key).first())
+
+
+def _complete(user_id, key, fingerprint, response, expires_at):
+    headers = {name: response[name] for name in REPLAYED_HEADERS if response.has_header(name)}
+    IdempotencyKey.objects.filter(user_id=user_id, key=key).update(
+        status_code=response.status_code, content=response.content, headers=headers,
+    )
+    timeout = max(1, int((expires_at - timezone.now()).total_seconds()))
+    cache.set(_cache_key(user_id, key), (fingerprint, response.status_code, response.content, headers), timeout)
+
+
+def _release(user_id, key):
+    IdempotencyKey.objects.filter(user_id=user_id, key=key, status_code__isnull=True).delete()
+
+
+def idempotent(view=None, *, methods=("POST",)):
+    """
+    Run `view` at most once per idempotency key (see module docstring).
+
+    Goes inside @login_required: keys are per user. Requests with other
+    methods pass straight through.
+    """
+    if view is None:
+        return functools.partial(idempotent, methods=methods)
+
+    endpoint = f"{view.__module__}.{view.__qualname__}"
+
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method not in methods or not request.user.is_authenticated:
+            return view(request, *args, **kwargs)
+
+        fingerprint = _digest(request.method, request.get_full_path(), request.body)
+        client_key = request.headers.get(HEADER)
+        if client_key:
+            if len(client_key) > MAX_KEY_LENGTH:
+                return JsonResponse(
+                    {"success": False, "message": f"{HEADER} must be at most {MAX_KEY_LENGTH} characters."},
+                    status=400,
+                )
+            key, ttl = _digest(endpoint, client_key), settings.IDEMPOTENCY_TTL
+        else:
+            key, ttl = _digest(endpoint, fingerprint), settings.IDEMPOTENCY_FALLBACK_TTL
+        user_id = request.user.pk
+
+        cached = cache.get(_cache_key(user_id, key))
+        record_cache_lookup("idempotency", cached is not None)
+        if cached is not None:
+            stored_fingerprint, *stored = cached
+            return _replay(*stored) if stored_fingerprint == fingerprint else _mismatch()
+
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT
+        while True:
+            claim = _claim(user_id, key, fingerprint, ttl)
+            if claim.owned:
+                break
+            record = claim.record
+            if record is not None and record.fingerprint != fingerprint:
+                return _mismatch()
+            if record is not None and record.status_code is not None:
+                return _replay(record.status_code, record.content, record.headers)
+            # Held by a concurrent duplicate (or just released): wait, then look again
+            if time.monotonic() >= deadline:
+                return _in_progress()
+            time.sleep(POLL_INTERVAL)
+
+        expires_at = timezone.now() + timedelta(seconds=ttl)
+        try:
+            response = view(request, *args, **kwargs)
+        except BaseException:
+            _release(user_id, key)
+            raise
+        if response.status_code >= 500 or getattr(response, "streaming", False):
+            _release(user_id, key)
+        else:
+            _complete(user_id, key, fingerprint, response, expires_at)
+        return response
+
+    return wrapper
+
+
+def clear_expired(batch_size=5_000):
+    """Delete expired keys in batches; returns the number deleted."""
+    deleted = 0
+    while True:
+        ids = list(
+            IdempotencyKey.objects.filter(expires_at__lte=timezone.now())
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            return deleted
+        deleted += IdempotencyKey.objects.filter(id__in=ids).delete()[0]
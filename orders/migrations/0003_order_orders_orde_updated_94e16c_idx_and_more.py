@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-19 08:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0001_initial'),
+        ('orders', '0002_alter_orderitem_combo'),
+        ('vendors', '0006_vendor_created_at_vendor_slug_vendor_updated_at_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['updated_at'], name='orders_orde_updated_94e16c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['vendor', 'created_at'], name='orders_orde_vendor__d3be3d_idx'),
+        ),
+    ]
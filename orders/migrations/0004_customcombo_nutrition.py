@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 08:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0003_order_orders_orde_updated_94e16c_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customcombo',
+            name='nutrition',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
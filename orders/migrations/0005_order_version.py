@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 08:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0004_customcombo_nutrition'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -1,4 +1,5 @@
 # orders/models.py
+from django.contrib.auth.models import User
 from django.db import models
 from django.utils import timezone
 from decimal import Decimal   # 👈 added
@@ -25,21 +26,14 @@ class CustomCombo(TimeStampedModel):
     vendor = models.ForeignKey(Vendor, on_delete=models.CASCADE, related_name="custom_combos")
     title = models.CharField(max_length=255)
     description = models.TextField(blank=True, null=True)
+    nutrition = models.JSONField(default=dict, blank=True)  # label, see menuitem.nutrition
 
     def validate_requirements(self):
-        """Check if this combo meets all required rules."""
-        rules = ComboRule.objects.filter(is_active=True)
-        errors = []
+        """Violations of this vendor's active combo rules (empty list = valid)."""
+        from .combo_rules import for_vendor, quantities
 
-        for rule in rules:
-            item = self.items.filter(menu_item=rule.menu_item).first()
-            qty = item.quantity if item else 0
-            if qty < rule.min_quantity:
-                errors.append(
-                    f"{rule.menu_item.name} requires at least {rule.min_quantity}, but got {qty}."
-                )
-
-        return errors
+        basket = quantities(self.items.values_list("menu_item_id", "quantity"))
+        return for_vendor(self.vendor_id).evaluate(basket).violations
 
     def calculate_total(self):
         """Sum price of all items in this combo."""
@@ -116,9 +110,15 @@ class Order(TimeStampedModel):
     # Payment & Status
     payment_method = models.CharField(max_length=20, choices=PAYMENT_CHOICES, default="cod")
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="draft")
+    # Bumped by every status transition (orders/state.py); guards against lost updates
+    version = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["updated_at"]),  # 📊 incremental sales rollups scan by this
+            models.Index(fields=["vendor", "created_at"]),
+        ]
 
     def __str__(self):
         return f"Order #{self.id} - {self.vendor.name} ({self.status})"
@@ -142,6 +142,13 @@ class Order(TimeStampedModel):
 
     def save(self, *args, **kwargs):
         is_new = self.pk is None
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            # status / version only change through orders.state: a full save of a
+            # stale instance must not undo a transition made in the meantime
+            kwargs["update_fields"] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in ("status", "version", "created_at")
+            ]
         super().save(*args, **kwargs)
 
         if not is_new:  # update totals after first save
@@ -153,9 +160,11 @@ class Order(TimeStampedModel):
     # Status Update + Tracking
     # ----------------------
     def update_status(self, new_status, note=None):
+        """Transition from this instance's version; raises orders.state.TransitionConflict."""
+        from .state import transition
+
+        self.version = transition(self.pk, self.version, new_status, note=note)
         self.status = new_status
-        self.save()
-        OrderTracking.objects.create(order=self, status=new_status, note=note)
 
 
 # ======================================================
@@ -249,3 +258,26 @@ class OrderTracking(TimeStampedModel):
 
     def __str__(self):
         return f"{self.order} → {self.status}"
+
+
+# ======================================================
+# Idempotency keys (orders/idempotency.py)
+# ======================================================
+class IdempotencyKey(models.Model):
+    """First response of an order-creating request, replayed to retries of it."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="idempotency_keys")
+    key = models.CharField(max_length=64)  # sha256 of endpoint + client key (or request fingerprint)
+    fingerprint = models.CharField(max_length=64)  # sha256 of path + body: same key, other request → 422
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)  # null while in progress
+    content = models.BinaryField(blank=True, default=b"")
+    headers = models.JSONField(default=dict, blank=True)
+    locked_until = models.DateTimeField()
+    expires_at = models.DateTimeField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["user", "key"], name="unique_idempotency_key")]
+
+    def __str__(self):
+        state = self.status_code or "in progress"
+        return f"{self.user_id}:{self.key[:12]} ({state})"
@@ -0,0 +1,20 @@
+# orders/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from menuitem.models import MenuItem
+from . import combo_rules
+from .models import ComboRule
+
+
+@receiver([post_save, post_delete], sender=ComboRule)
+def drop_compiled_rules(sender, instance, **kwargs):
+    vendor_id = MenuItem.objects.filter(pk=instance.menu_item_id).values_list("vendor_id", flat=True).first()
+    if vendor_id is not None:
+        combo_rules.invalidate(vendor_id)
+
+
+@receiver([post_save, post_delete], sender=MenuItem)
+def drop_compiled_rules_for_item(sender, instance, **kwargs):
+    """Compiled rules carry the item's name."""
+    combo_rules.invalidate(instance.vendor_id)
@@ -0,0 +1,117 @@
+# orders/state.py
+"""
+Order state machine with optimistic concurrency.
+
+Every status change goes through `transition()`: one conditional
+
+    UPDATE orders_order SET status=new, version=version+1, updated_at=now
+    WHERE id=? AND version=? AND status IN (<statuses allowed to reach new>)
+
+and the OrderTracking row, in the same transaction. Zero rows updated means
+someone else changed the order first (or the move isn't allowed from its
+current status); that is raised / returned as a `TransitionConflict` with
+the order's current status and version — no retry loop, the caller decides.
+"""
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Order, OrderTracking
+
+# status → statuses it may move to
+TRANSITIONS = {
+    "draft": {"pending", "placed", "cancelled"},
+    "pending": {"placed", "confirmed", "cancelled"},
+    "placed": {"confirmed", "cancelled"},
+    "confirmed": {"dispatched", "delivered", "cancelled"},
+    "dispatched": {"delivered", "cancelled"},
+    "delivered": set(),
+    "cancelled": set(),
+}
+# status → statuses it may be reached from
+SOURCES = {
+    target: frozenset(src for src, targets in TRANSITIONS.items() if target in targets)
+    for target in TRANSITIONS
+}
+
+
+class TransitionConflict(Exception):
+    """The conditional update matched no row: stale version, disallowed move or missing order."""
+
+    def __init__(self, order_id, new_status, current_status=None, current_version=None):
+        self.order_id = order_id
+        self.new_status = new_status
+        self.current_status = current_status
+        self.current_version = current_version
+        if current_status is None:
+            reason = "does not exist"
+        elif current_status not in SOURCES[new_status]:
+            reason = f"is {current_status} and cannot become {new_status}"
+        else:
+            reason = f"was changed concurrently (now version {current_version})"
+        super().__init__(f"Order #{order_id} {reason}.")
+
+    def as_dict(self):
+        return {
+            "id": self.order_id,
+            "status": self.current_status,
+            "version": self.current_version,
+            "error": str(self),
+        }
+
+
+def can_transition(current_status, new_status):
+    return new_status in TRANSITIONS.get(current_status, ())
+
+
+def _check(new_status):
+    if new_status not in TRANSITIONS:
+        raise ValueError(f"Unknown order status {new_status!r}")
+
+
+def _move(order_id, version, new_status, now):
+    """The conditional UPDATE; True if it moved the row."""
+    return Order.objects.filter(pk=order_id, version=version, status__in=SOURCES[new_status]).update(
+        status=new_status, version=F("version") + 1, updated_at=now,
+    ) == 1
+
+
+def _conflict(order_id, new_status):
+    current = Order.objects.filter(pk=order_id).values_list("status", "version").first()
+    return TransitionConflict(order_id, new_status, *(current or (None, None)))
+
+
+def transition(order_id, version, new_status, note=""):
+    """Move one order from `version` to `new_status`; returns the new version or raises TransitionConflict."""
+    _check(new_status)
+    with transaction.atomic():
+        if not _move(order_id, version, new_status, timezone.now()):
+            raise _conflict(order_id, new_status)
+        OrderTracking.objects.create(order_id=order_id, status=new_status, note=note or "")
+    return version + 1
+
+
+def transition_many(versions, new_status, note=""):
+    """
+    Move several orders, each guarded by its own version, in one transaction.
+
+    `versions` is {order_id: expected version}. Returns (moved order ids,
+    [TransitionConflict]); conflicting orders are left as they are.
+    """
+    _check(new_status)
+    moved, conflicts, now = [], [], timezone.now()
+    with transaction.atomic():
+        for order_id, version in versions.items():
+            if _move(order_id, version, new_status, now):
+                moved.append(order_id)
+            else:
+                conflicts.append(_conflict(order_id, new_status))
+        OrderTracking.objects.bulk_create(
+            [OrderTracking(order_id=order_id, status=new_status, note=note or "") for order_id in moved]
+        )
+    return moved, conflicts
+
+
+def current_versions(queryset):
+    """{order_id: version} as read now — for callers that act on what they just showed."""
+    return dict(queryset.values_list("id", "version"))
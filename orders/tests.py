@@ -1,3 +1,162 @@
-from django.test import TestCase
+from datetime import timedelta
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.http import JsonResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+
+from customers.models import Customer
+from vendors.models import Vendor
+from .idempotency import idempotent
+from .models import IdempotencyKey, Order, OrderTracking
+from . import idempotency, state
+from .state import TransitionConflict
+
+
+class OrderStateTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user("state-customer", password="pw")
+        self.customer, _ = Customer.objects.get_or_create(user=user)  # created by customers.signals
+        self.vendor = Vendor.objects.create(name="State Kitchen", vendor_code="STATE01")
+
+    def make_order(self, status="placed"):
+        return Order.objects.create(customer=self.customer, vendor=self.vendor, status=status)
+
+    def test_transition_bumps_version_and_tracks(self):
+        order = self.make_order()
+        self.assertEqual(state.transition(order.pk, 0, "confirmed"), 1)
+        order.refresh_from_db()
+        self.assertEqual((order.status, order.version), ("confirmed", 1))
+        self.assertTrue(OrderTracking.objects.filter(order=order, status="confirmed").exists())
+
+    def test_stale_version_conflicts(self):
+        order = self.make_order()
+        state.transition(order.pk, 0, "confirmed")
+        with self.assertRaises(TransitionConflict) as ctx:
+            state.transition(order.pk, 0, "cancelled")
+        self.assertEqual((ctx.exception.current_status, ctx.exception.current_version), ("confirmed", 1))
+        order.refresh_from_db()
+        self.assertEqual(order.status, "confirmed")
+
+    def test_disallowed_move_conflicts(self):
+        order = self.make_order(status="delivered")
+        with self.assertRaises(TransitionConflict) as ctx:
+            state.transition(order.pk, 0, "confirmed")
+        self.assertIn("cannot become confirmed", str(ctx.exception))
+        self.assertFalse(OrderTracking.objects.filter(order=order).exists())
+
+    def test_transition_many_returns_partial_conflicts(self):
+        fresh, stale = self.make_order(), self.make_order()
+        state.transition(stale.pk, 0, "confirmed")
+
+        moved, conflicts = state.transition_many({fresh.pk: 0, stale.pk: 0}, "cancelled")
+        self.assertEqual(moved, [fresh.pk])
+        self.assertEqual([c.order_id for c in conflicts], [stale.pk])
+        stale.refresh_from_db()
+        self.assertEqual((stale.status, stale.version), ("confirmed", 1))
+
+    def test_save_does_not_overwrite_status(self):
+        order = self.make_order()
+        stale_copy = Order.objects.get(pk=order.pk)
+        state.transition(order.pk, 0, "confirmed")
+
+        stale_copy.delivery_name = "Renamed"
+        stale_copy.save()
+        order.refresh_from_db()
+        self.assertEqual((order.status, order.version, order.delivery_name), ("confirmed", 1, "Renamed"))
+
+
+class IdempotencyTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.user = User.objects.create_user("idem-customer", password="pw")
+        self.calls = 0
+
+        @idempotent
+        def view(request):
+            self.calls += 1
+            return JsonResponse({"order": self.calls}, status=self.status)
+
+        self.status = 201
+        self.view = view
+
+    def post(self, body=b'{"items": [1]}', key="key-1"):
+        headers = {idempotency.HEADER: key} if key else {}
+        request = self.factory.post("/orders/", body, content_type="application/json", headers=headers)
+        request.user = self.user
+        return self.view(request)
+
+    def test_first_request_claims_and_retry_replays(self):
+        first = self.post()
+        self.assertEqual((first.status_code, self.calls), (201, 1))
+        self.assertFalse(first.has_header("Idempotent-Replayed"))
+
+        retry = self.post()
+        self.assertEqual(self.calls, 1)
+        self.assertEqual((retry.status_code, retry.content), (201, first.content))
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(retry["Content-Type"], "application/json")
+
+    def test_replays_from_the_row_without_the_cache(self):
+        first = self.post()
+        cache.clear()
+        retry = self.post()
+        self.assertEqual(self.calls, 1)
+        self.assertEqual((retry.status_code, retry.content), (201, first.content))
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+
+    def test_reused_key_with_a_different_body_is_422(self):
+        self.post()
+        self.assertEqual(self.post(body=b'{"items": [2]}').status_code, 422)
+        cache.clear()
+        self.assertEqual(self.post(body=b'{"items": [2]}').status_code, 422)
+        self.assertEqual(self.calls, 1)
+
+    def test_keys_are_per_user(self):
+        self.post()
+        self.user = User.objects.create_user("idem-other", password="pw")
+        self.assertEqual(self.post().status_code, 201)
+        self.assertEqual(self.calls, 2)
+
+    @override_settings(IDEMPOTENCY_WAIT=0)
+    def test_duplicate_of_a_request_in_progress_is_409(self):
+        self.post()
+        cache.clear()
+        IdempotencyKey.objects.update(status_code=None)  # as if the first request were still running
+        response = self.post()
+        self.assertEqual((response.status_code, response["Retry-After"]), (409, "1"))
+        self.assertEqual(self.calls, 1)
+
+    def test_lock_left_by_a_dead_request_is_taken_over(self):
+        self.post()
+        cache.clear()
+        IdempotencyKey.objects.update(status_code=None, locked_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(self.post().status_code, 201)
+        self.assertEqual(self.calls, 2)
+
+    def test_server_error_releases_the_key(self):
+        self.status = 503
+        self.assertEqual(self.post().status_code, 503)
+        self.assertFalse(IdempotencyKey.objects.exists())
+        self.status = 201
+        self.assertEqual(self.post().status_code, 201)
+        self.assertEqual(self.calls, 2)
+
+    def test_overlong_key_is_400(self):
+        response = self.post(key="k" * (idempotency.MAX_KEY_LENGTH + 1))
+        self.assertEqual((response.status_code, self.calls), (400, 0))
+
+    def test_without_a_key_identical_bodies_are_deduplicated(self):
+        self.post(key=None)
+        self.assertEqual(self.post(key=None)["Idempotent-Replayed"], "true")
+        self.assertEqual(self.post(body=b'{"items": [2]}', key=None).status_code, 201)
+        self.assertEqual(self.calls, 2)
+
+    def test_fallback_key_expires_with_its_short_ttl(self):
+        self.post(key=None)
+        cache.clear()
+        IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertFalse(self.post(key=None).has_header("Idempotent-Replayed"))
+        self.assertEqual(self.calls, 2)
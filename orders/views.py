@@ -3,7 +3,7 @@ from decimal import Decimal
 from django.db import transaction
 from django.db.models import Sum, F
 from django.http import JsonResponse
-from django.shortcuts import render, get_object_or_404, redirect
+from django.shortcuts import render, get_object_or_404, aget_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.core.mail import send_mail
@@ -11,10 +11,12 @@ from django.conf import settings
 from django.views.decorators.csrf import csrf_exempt
 
 from vendors.models import Vendor
-from customers.models import Customer
 from menuitem.models import MenuItem
-from .models import Order, OrderItem, OrderTracking, CustomCombo, ComboRule
+from .models import Order, OrderItem, CustomCombo
 from .forms import CheckoutForm
+from .state import TransitionConflict
+from .idempotency import idempotent
+from core.db_router import replica_reads
 
 
 # ======================================================
@@ -40,17 +42,6 @@ def vendor_search(request):
 # ======================================================
 # Helpers
 # ======================================================
-def _get_or_create_customer(user):
-    """Return or create a Customer object linked to the logged-in user."""
-    if not user.is_authenticated:
-        return None
-    customer, _ = Customer.objects.get_or_create(
-        user=user,
-        defaults={"name": user.get_username()}
-    )
-    return customer
-
-
 def _send_sms(mobile, text):
     """Dummy SMS sender (replace with real SMS API)."""
     print(f"📱 Sending SMS to {mobile}: {text}")
@@ -75,12 +66,12 @@ def _send_order_confirmation(customer, order):
         send_mail(subject, message, settings.DEFAULT_FROM_EMAIL, recipient, fail_silently=False)
 
     # SMS
-    if customer.mobile:
+    if customer.phone:
         sms_message = (
             f"Hi {customer_name}, your order #{order.id} is {order.status}. "
             f"Total: ₹{order.total_price:.2f}. Thank you for choosing Swad of Tamil!"
         )
-        _send_sms(customer.mobile, sms_message)
+        _send_sms(customer.phone, sms_message)
 
 
 # ======================================================
@@ -88,32 +79,22 @@ def _send_order_confirmation(customer, order):
 # ======================================================
 @login_required
 @csrf_exempt   # remove if CSRF token is already sent via JS
+@idempotent
 def place_order(request, combo_id):
     """Place an order from a CustomCombo."""
-    combo = get_object_or_404(CustomCombo, id=combo_id)
-    customer = _get_or_create_customer(request.user)
+    combo = get_object_or_404(CustomCombo.objects.select_related("vendor"), id=combo_id)
+    customer = request.customer
 
     if request.method != "POST":
         return render(request, "orders/order_summary.html", {"combo": combo})
 
-    # 1) Validate combo rules
+    # 1) Validate against the vendor's combo rules (all violations at once)
     errors = combo.validate_requirements()
     if errors:
-        messages.error(request, "⚠️ Combo not valid: " + ", ".join(errors))
-        return redirect("combo_builder")
-
-    # 2) Global ComboRule validation
-    for rule in ComboRule.objects.all():
-        item = combo.items.filter(menu_item=rule.menu_item).first()
-        qty = item.quantity if item else 0
-        if qty < rule.min_quantity:
-            messages.error(
-                request,
-                f"'{rule.menu_item.name}' requires at least {rule.min_quantity} item(s)."
-            )
-            return redirect("combo_builder")
+        messages.error(request, "⚠️ Combo not valid: " + " ".join(errors))
+        return redirect("vendors:combo_builder", vendor_code=combo.vendor.vendor_code)
 
-    # 3) Create order & items
+    # 2) Create order & items
     try:
         with transaction.atomic():
             order = Order.objects.create(
@@ -150,7 +131,7 @@ def place_order(request, combo_id):
             order.save()
     except Exception as exc:
         messages.error(request, "Failed to place order: " + str(exc))
-        return redirect("combo_builder")
+        return redirect("vendors:combo_builder", vendor_code=combo.vendor.vendor_code)
 
     messages.success(request, "Order placed successfully ✅")
     return redirect("orders:payment_page", pk=order.pk)
@@ -163,16 +144,18 @@ def order_detail(request, order_id):
 @login_required
 def payment_page(request, pk):
     """Payment selection page."""
-    customer = _get_or_create_customer(request.user)
+    customer = request.customer
     order = get_object_or_404(Order, pk=pk, customer=customer)
 
     if request.method == "POST":
         method = request.POST.get("payment_method")
 
         if method == "cod":
-            order.status = "confirmed"
-            order.save()
-            messages.success(request, "✅ Order confirmed! Pay Cash on Delivery.")
+            try:
+                order.update_status("confirmed", note="Cash on Delivery")
+                messages.success(request, "✅ Order confirmed! Pay Cash on Delivery.")
+            except TransitionConflict as exc:
+                messages.error(request, f"⚠️ {exc}")
         elif method == "upi":
             messages.info(request, "📲 Redirecting to UPI app...")
         elif method == "card":
@@ -187,8 +170,9 @@ def payment_page(request, pk):
 # Order Views
 # ======================================================
 @login_required
+@replica_reads
 def order_list(request):
-    customer = _get_or_create_customer(request.user)
+    customer = request.customer
     orders = Order.objects.filter(customer=customer).order_by("-created_at")
     return render(request, "orders/order_list.html", {"orders": orders})
 
@@ -215,19 +199,20 @@ def order_summary(request, order_id):
 
 @login_required
 def confirm_order(request, order_id):
-    customer = _get_or_create_customer(request.user)
+    customer = request.customer
     order = get_object_or_404(Order, pk=order_id, customer=customer)
 
     if request.method == "POST":
-        order.status = "confirmed"
-        order.save()
-        OrderTracking.objects.create(order=order, status="confirmed")
+        try:
+            order.update_status("confirmed")
+        except TransitionConflict as exc:
+            messages.error(request, f"⚠️ {exc}")
     return redirect("orders:order_summary", order_id=order.id)
 
 
 @login_required
 def order_success(request, order_id):
-    customer = _get_or_create_customer(request.user)
+    customer = request.customer
     order = get_object_or_404(Order, pk=order_id, customer=customer)
     return render(request, "orders/order_success.html", {"order": order})
 
@@ -237,17 +222,20 @@ def order_success(request, order_id):
 # ======================================================
 @login_required
 def track_order(request, order_id):
-    customer = _get_or_create_customer(request.user)
+    customer = request.customer
     order = get_object_or_404(Order, pk=order_id, customer=customer)
     return render(request, "orders/track_order.html", {"order": order})
 
 
 @login_required
-def track_status_api(request, order_id):
-    customer = _get_or_create_customer(request.user)
-    order = get_object_or_404(Order, pk=order_id, customer=customer)
+@replica_reads
+async def track_status_api(request, order_id):
+    customer = await request.acustomer()
+    order = await aget_object_or_404(Order, pk=order_id, customer=customer)
 
-    logs = order.tracking_logs.order_by("timestamp").values("status", "timestamp")
+    logs = [
+        log async for log in order.tracking_logs.order_by("timestamp").values("status", "timestamp")
+    ]
 
     eta_seconds = 600 if order.status in ["pending", "confirmed"] else None
     driver = {"name": "Ravi Kumar", "phone": "+91-9876543210"} if order.status == "dispatched" else None
@@ -257,15 +245,16 @@ def track_status_api(request, order_id):
         "status": order.status,
         "eta_seconds": eta_seconds,
         "driver": driver,
-        "logs": list(logs),
+        "logs": logs,
         "last_updated": getattr(order, "updated_at", None).strftime("%Y-%m-%d %H:%M:%S")
         if hasattr(order, "updated_at") else None,
     })
 
 
 @login_required
+@replica_reads
 def order_tracking_status(request, order_id):
-    customer = _get_or_create_customer(request.user)
+    customer = request.customer
     order = get_object_or_404(Order, pk=order_id, customer=customer)
     logs = order.tracking_logs.order_by("-timestamp")
 
@@ -1,14 +1,16 @@
 # pages/views.py
 from django.shortcuts import render
 
+# The info pages share their templates with core's (core/templates/core/)
+
 def about_us(request):
-    return render(request, "pages/about.html")
+    return render(request, "core/about.html")
 
 def mission(request):
-    return render(request, "pages/mission.html")
+    return render(request, "core/mission.html")
 
 def brand_story(request):
-    return render(request, "pages/brand_story.html")
+    return render(request, "core/brand_story.html")
 
 def contact_view(request):
     return render(request, "pages/contact.html")
@@ -0,0 +1,240 @@
+# streaming/kds.py
+"""
+Kitchen display (KDS) fan-out.
+
+One `Hub` per process holds, for every vendor with at least one open
+stream, the vendor's open orders and the subscribers' queues. A single
+watcher task (not one per client) picks up changed orders of all those
+vendors with one query per tick, applies them to the vendor state and
+pushes `order` / `prep` events to that vendor's queues. Saves in this
+process nudge the watcher right away (streaming/signals.py); saves in
+other workers are seen on the next tick (`KDS_POLL_INTERVAL`).
+
+The prep list is the sum of identical items over a vendor's open orders,
+recomputed from the in-memory state — e.g. 18 × Idli, 4 × Sambar.
+"""
+import asyncio
+import contextvars
+import logging
+from collections import Counter
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from orders.models import Order, OrderItem
+
+logger = logging.getLogger(__name__)
+
+# Orders the kitchen still has to prepare
+OPEN_STATUSES = ("pending", "placed", "confirmed")
+# Status a batch acknowledgement moves an order to
+NEXT_STATUS = {"pending": "confirmed", "placed": "confirmed", "confirmed": "dispatched", "dispatched": "delivered"}
+SNAPSHOT_LIMIT = 500
+QUEUE_SIZE = 200
+# Re-read this far behind the high-water mark: rows committed late keep an older updated_at
+OVERLAP = timedelta(seconds=5)
+
+ORDER_FIELDS = ("id", "vendor_id", "status", "version", "created_at", "updated_at", "total_price",
+                "delivery_name", "special_instructions")
+
+
+# ----------------------
+# Queries (run in a worker thread)
+# ----------------------
+def _items_by_order(order_ids):
+    items = {}
+    rows = OrderItem.objects.filter(order_id__in=order_ids).values_list(
+        "order_id", "quantity", "menu_item__name", "combo__name", "custom_combo__title"
+    )
+    for order_id, qty, item_name, combo_name, custom_title in rows:
+        name = item_name or combo_name or custom_title or "Item"
+        items.setdefault(order_id, []).append((name, qty))
+    return items
+
+
+def _entries(rows):
+    rows = list(rows)
+    items = _items_by_order([row["id"] for row in rows])
+    return [order_entry(row, items.get(row["id"], [])) for row in rows]
+
+
+def order_entry(row, items):
+    return {
+        "id": row["id"],
+        "vendor_id": row["vendor_id"],
+        "status": row["status"],
+        "version": row["version"],
+        "created_at": row["created_at"].isoformat(),
+        "updated_at": row["updated_at"],
+        "total": str(row["total_price"]),
+        "customer": row["delivery_name"],
+        "notes": row["special_instructions"] or "",
+        "items": [{"name": name, "quantity": qty} for name, qty in items],
+    }
+
+
+def load_open_orders(vendor_id):
+    try:
+        rows = (
+            Order.objects.filter(vendor_id=vendor_id, status__in=OPEN_STATUSES)
+            .order_by("created_at").values(*ORDER_FIELDS)[:SNAPSHOT_LIMIT]
+        )
+        return _entries(rows)
+    finally:
+        close_old_connections()
+
+
+def load_changes(vendor_ids, since):
+    try:
+        rows = Order.objects.filter(vendor_id__in=vendor_ids, updated_at__gt=since).order_by("updated_at")
+        return _entries(rows.values(*ORDER_FIELDS))
+    finally:
+        close_old_connections()
+
+
+def prep_list(orders):
+    """[{"name", "quantity"}] summed over orders, largest first."""
+    totals = Counter()
+    for order in orders:
+        for item in order["items"]:
+            totals[item["name"]] += item["quantity"]
+    return [{"name": name, "quantity": qty} for name, qty in sorted(totals.items(), key=lambda t: (-t[1], t[0]))]
+
+
+def public(entry):
+    """Order entry without internal fields, ready for JSON."""
+    return {k: v for k, v in entry.items() if k not in ("vendor_id", "updated_at")}
+
+
+# ----------------------
+# Hub
+# ----------------------
+class VendorFeed:
+    __slots__ = ("orders", "queues", "ready")
+
+    def __init__(self):
+        self.orders = {}  # order id → entry (open orders only)
+        self.queues = set()
+        self.ready = asyncio.Event()  # set once the snapshot is loaded
+
+    def snapshot(self):
+        orders = sorted(self.orders.values(), key=lambda o: o["created_at"])
+        return {"orders": [public(o) for o in orders], "prep": prep_list(orders)}
+
+
+class Hub:
+    def __init__(self):
+        self.feeds = {}  # vendor id → VendorFeed
+        self.loop = None
+        self.wakeup = None
+        self.watcher = None
+        self.high_water = None
+        self.seen = {}  # order id → updated_at already applied
+
+    # Subscriptions (event loop only)
+    async def subscribe(self, vendor_id):
+        """(queue, snapshot) for a new stream of `vendor_id`."""
+        self._ensure_watcher()
+        feed = self.feeds.get(vendor_id)
+        if feed is None:
+            feed = self.feeds[vendor_id] = VendorFeed()
+            try:
+                orders = await sync_to_async(load_open_orders, thread_sensitive=False)(vendor_id)
+            except Exception:
+                del self.feeds[vendor_id]
+                feed.ready.set()
+                raise
+            for order in orders:
+                feed.orders[order["id"]] = order
+            feed.ready.set()
+        await feed.ready.wait()
+        queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        feed.queues.add(queue)
+        return queue, feed.snapshot()
+
+    def unsubscribe(self, vendor_id, queue):
+        feed = self.feeds.get(vendor_id)
+        if feed is None:
+            return
+        feed.queues.discard(queue)
+        if not feed.queues:
+            del self.feeds[vendor_id]
+
+    # Watcher
+    def _ensure_watcher(self):
+        if self.watcher is None or self.watcher.done():
+            self.loop = asyncio.get_running_loop()
+            self.wakeup = asyncio.Event()
+            self.high_water = timezone.now()
+            # Fresh context: don't inherit the first request's DB routing state
+            self.watcher = self.loop.create_task(self._watch(), context=contextvars.Context())
+
+    def nudge(self):
+        """Thread-safe: look for changes now instead of at the next tick."""
+        if self.loop is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self.wakeup.set)
+
+    async def _watch(self):
+        # Ends when the last stream closes; the next subscribe starts a new one
+        while self.feeds:
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), settings.KDS_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self.wakeup.clear()
+            try:
+                await self.poll()
+            except Exception as exc:
+                logger.warning(f"KDS poll failed: {exc}")
+
+    async def poll(self):
+        since = self.high_water - OVERLAP
+        changes = await sync_to_async(load_changes, thread_sensitive=False)(list(self.feeds), since)
+        touched = set()
+        for entry in changes:
+            if self.seen.get(entry["id"]) == entry["updated_at"]:
+                continue
+            self.seen[entry["id"]] = entry["updated_at"]
+            self.high_water = max(self.high_water, entry["updated_at"])
+            if self.apply(entry):
+                touched.add(entry["vendor_id"])
+        self.seen = {k: v for k, v in self.seen.items() if v >= since}
+        for vendor_id in touched:
+            feed = self.feeds.get(vendor_id)
+            if feed is not None:
+                self.publish(vendor_id, "prep", {"prep": prep_list(feed.orders.values())})
+
+    def apply(self, entry):
+        """Update the vendor state and publish the order; True if the prep list changed."""
+        feed = self.feeds.get(entry["vendor_id"])
+        if feed is None:
+            return False
+        before = feed.orders.get(entry["id"])
+        if entry["status"] in OPEN_STATUSES:
+            feed.orders[entry["id"]] = entry
+        else:
+            feed.orders.pop(entry["id"], None)
+        if before is None and entry["status"] not in OPEN_STATUSES:
+            return False  # never shown, nothing to remove
+        self.publish(entry["vendor_id"], "order", public(entry))
+        return before is None or entry["status"] not in OPEN_STATUSES or before["items"] != entry["items"]
+
+    def publish(self, vendor_id, event, data):
+        feed = self.feeds.get(vendor_id)
+        if feed is None:
+            return
+        for queue in list(feed.queues):
+            try:
+                queue.put_nowait((event, data))
+            except asyncio.QueueFull:
+                # Client too slow to keep up: end its stream, it reconnects with a fresh snapshot
+                feed.queues.discard(queue)
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+
+
+hub = Hub()
@@ -0,0 +1,14 @@
+# streaming/signals.py
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from orders.models import Order, OrderItem
+from .kds import hub
+
+
+@receiver(post_save, sender=Order)
+@receiver([post_save, post_delete], sender=OrderItem)
+def nudge_kitchen_displays(sender, **kwargs):
+    # Open streams in this process see the change without waiting for the next poll
+    transaction.on_commit(hub.nudge)
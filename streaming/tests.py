@@ -1,3 +1,21 @@
+import json
+
+from django.contrib.auth.models import User
 from django.test import TestCase
+from django.urls import reverse
+
+from vendors.models import Vendor
+
+
+class KdsAcknowledgeTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_user("kds-staff", password="pw", is_staff=True))
+        Vendor.objects.create(name="KDS Kitchen", vendor_code="KDS01")
 
-# Create your tests here.
+    def test_non_integer_version_is_rejected(self):
+        response = self.client.post(
+            reverse("streaming:kds_acknowledge", args=["KDS01"]),
+            data=json.dumps({"orders": [{"id": 1, "version": "abc"}]}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,11 @@
+# streaming/urls.py
+from django.urls import path
+
+from . import views
+
+urlpatterns = [
+    # 🍳 Kitchen display
+    path("kds/<str:vendor_code>/", views.kds_page, name="kds"),
+    path("kds/<str:vendor_code>/stream/", views.kds_stream, name="kds_stream"),
+    path("kds/<str:vendor_code>/ack/", views.kds_acknowledge, name="kds_acknowledge"),
+]
@@ -1,3 +1,112 @@
-from django.shortcuts import render
+# streaming/views.py
+import asyncio
+import json
+import logging
 
-# Create your views here.
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.http import JsonResponse, StreamingHttpResponse
+from django.shortcuts import aget_object_or_404, get_object_or_404, render
+from django.views.decorators.http import require_POST
+
+from core.metrics import SSE_CONNECTIONS
+from orders import state
+from orders.models import Order
+from vendors.models import Vendor
+from .kds import NEXT_STATUS, hub
+
+logger = logging.getLogger(__name__)
+
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n"
+
+
+# ----------------------
+# 🍳 Kitchen display
+# ----------------------
+@staff_member_required
+def kds_page(request, vendor_code: str):
+    vendor = get_object_or_404(Vendor, vendor_code=vendor_code, is_active=True)
+    return render(request, "streaming/kds.html", {"vendor": vendor, "next_status": NEXT_STATUS})
+
+
+@staff_member_required
+async def kds_stream(request, vendor_code: str):
+    """SSE: `snapshot` once, then `order` and `prep` events as the vendor's orders change."""
+    vendor = await aget_object_or_404(Vendor, vendor_code=vendor_code, is_active=True)
+
+    async def events():
+        queue, snapshot = await hub.subscribe(vendor.id)
+        SSE_CONNECTIONS.inc(stream="kds")
+        try:
+            yield "retry: 3000\n\n" + _sse("snapshot", snapshot)
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), settings.KDS_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if message is None:  # dropped as too slow; the browser reconnects
+                    return
+                yield _sse(*message)
+        finally:
+            hub.unsubscribe(vendor.id, queue)
+            SSE_CONNECTIONS.dec(stream="kds")
+
+    response = StreamingHttpResponse(events(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # nginx: don't buffer the stream
+    return response
+
+
+@staff_member_required
+@require_POST
+def kds_acknowledge(request, vendor_code: str):
+    """
+    Advance several orders in one request.
+
+    Body: {"orders": [{"id": 1, "version": 3}, ...], "status": "confirmed"}
+    (or "order_ids": [...] to act on the versions current now). Without
+    "status" each order moves to its NEXT_STATUS. Every order is one
+    version-guarded UPDATE (orders.state), all in one transaction; orders
+    changed elsewhere come back under "conflicts" with their current state.
+    """
+    vendor = get_object_or_404(Vendor, vendor_code=vendor_code, is_active=True)
+    try:
+        data = json.loads(request.body or b"{}")
+        requested = {
+            int(o["id"]): None if o.get("version") is None else int(o["version"])
+            for o in data.get("orders", [])
+        }
+        requested.update({int(i): None for i in data.get("order_ids", []) if int(i) not in requested})
+    except (ValueError, TypeError, KeyError, AttributeError):
+        return JsonResponse({"error": "orders must be [{id, version}] or order_ids a list of ids"}, status=400)
+    target = data.get("status")
+    if target is not None and target not in NEXT_STATUS.values():
+        return JsonResponse({"error": f"Unknown status {target!r}"}, status=400)
+
+    current = Order.objects.filter(vendor=vendor, id__in=requested).values_list("id", "status", "version")
+    by_status = {}
+    for order_id, status, version in current:
+        new_status = target or NEXT_STATUS.get(status)
+        if new_status and new_status != status:
+            expected = requested[order_id] if requested[order_id] is not None else version
+            by_status.setdefault(new_status, {})[order_id] = expected
+
+    updated, conflicts = [], []
+    with transaction.atomic():
+        for new_status, versions in by_status.items():
+            moved, failed = state.transition_many(versions, new_status, note="Kitchen acknowledged")
+            updated += [{"id": i, "status": new_status, "version": versions[i] + 1} for i in moved]
+            conflicts += [c.as_dict() for c in failed]
+        transaction.on_commit(hub.nudge)
+
+    done = {u["id"] for u in updated} | {c["id"] for c in conflicts}
+    return JsonResponse({
+        "updated": updated,
+        "conflicts": conflicts,
+        "skipped": [i for i in requested if i not in done],
+    })
@@ -3,14 +3,51 @@ ASGI config for streetkitchen project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+SERVER_MODE selects how requests are served:
+
+* ``asgi`` (default): everything goes through Django's ASGI handler.
+* ``hybrid``: only async views (the JSON polling APIs) use the ASGI handler;
+  every other path runs through the WSGI application on a per-request thread,
+  exactly as it does under ``streetkitchen.wsgi``.
+
+Run under an ASGI worker, e.g.
+``gunicorn streetkitchen.asgi:application -k uvicorn_worker.UvicornWorker``.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
 
 import os
+from functools import lru_cache
 
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'streetkitchen.settings')
 
-application = get_asgi_application()
+django_asgi_app = get_asgi_application()
+
+SERVER_MODE = os.getenv("SERVER_MODE", "asgi")
+
+if SERVER_MODE == "hybrid":
+    from asgiref.sync import ThreadSensitiveContext, iscoroutinefunction
+    from asgiref.wsgi import WsgiToAsgi
+    from django.core.wsgi import get_wsgi_application
+    from django.urls import resolve, Resolver404
+
+    wsgi_app = WsgiToAsgi(get_wsgi_application())
+
+    @lru_cache(maxsize=4096)
+    def _is_async_path(path):
+        try:
+            return iscoroutinefunction(resolve(path).func)
+        except Resolver404:
+            return False
+
+    async def application(scope, receive, send):
+        if scope["type"] == "http" and not _is_async_path(scope["path"]):
+            # One thread per request instead of a single shared sync thread
+            async with ThreadSensitiveContext():
+                return await wsgi_app(scope, receive, send)
+        return await django_asgi_app(scope, receive, send)
+else:
+    application = django_asgi_app
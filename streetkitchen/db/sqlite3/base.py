@@ -0,0 +1,137 @@
+# streetkitchen/db/sqlite3/base.py
+"""
+SQLite backend tuned for serving concurrent requests from one database file.
+
+* Every new connection switches to WAL and applies `PRAGMAS` plus a
+  `busy_timeout` matching the `timeout` option.
+* `atomic()` blocks start with `BEGIN IMMEDIATE`, so a transaction that reads
+  before it writes waits for the write lock up front instead of failing
+  half-way with "database is locked".
+* A background thread per process and database file checkpoints the WAL and
+  truncates it once it grows past `wal_truncate_pages`, so long-lived readers
+  cannot make it grow without bound. It is not started when the
+  "journal_mode" pragma is overridden to anything but WAL.
+
+Extra OPTIONS (the rest are Django's own):
+    "pragmas"             {name: value} added to / overriding `PRAGMAS`
+    "checkpoint_interval" seconds between checkpoints, 0 disables the thread
+    "wal_truncate_pages"  WAL size (in pages) above which the file is truncated
+"""
+import logging
+import os
+import sqlite3
+import threading
+
+from django.db.backends.sqlite3 import base
+
+logger = logging.getLogger(__name__)
+
+PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",  # safe in WAL mode; a power cut may lose the last commits, never corrupts
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -32_000,  # negative = KiB, per connection
+    "temp_store": "MEMORY",
+    "journal_size_limit": 64 * 1024 * 1024,  # shrink the WAL file back to this after a reset
+}
+
+DEFAULT_TIMEOUT = 10.0  # seconds a writer waits for the lock
+DEFAULT_CHECKPOINT_INTERVAL = 30.0
+DEFAULT_WAL_TRUNCATE_PAGES = 4_000  # ~16 MB with 4 KiB pages
+
+
+def apply_pragmas(conn, pragmas):
+    for name, value in pragmas.items():
+        conn.execute(f"PRAGMA {name} = {value}")
+
+
+# ----------------------
+# WAL checkpoints
+# ----------------------
+class WalCheckpointer(threading.Thread):
+    """Periodically checkpoint one database file from its own connection."""
+
+    def __init__(self, path, interval, truncate_pages):
+        super().__init__(name=f"wal-checkpoint:{os.path.basename(path)}", daemon=True)
+        self.path = path
+        self.interval = interval
+        self.truncate_pages = truncate_pages
+        self.stopped = threading.Event()
+
+    def checkpoint(self, conn):
+        """Return (busy, wal pages, pages checkpointed) of the last checkpoint run."""
+        result = conn.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchone()
+        busy, wal_pages, done = result
+        if wal_pages > self.truncate_pages and done == wal_pages:
+            # Everything is already in the database file; TRUNCATE only needs
+            # a short gap without readers to reset the WAL to zero bytes.
+            result = conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+        return result
+
+    def run(self):
+        # Short busy timeout: TRUNCATE holds the write lock while waiting for
+        # readers, so give up quickly and retry next interval.
+        conn = sqlite3.connect(self.path, timeout=0.1, uri=True, check_same_thread=False)
+        try:
+            while not self.stopped.wait(self.interval):
+                try:
+                    self.checkpoint(conn)
+                except sqlite3.Error as exc:
+                    logger.warning(f"WAL checkpoint of {self.path} failed: {exc}")
+        finally:
+            conn.close()
+
+    def stop(self):
+        self.stopped.set()
+
+
+_checkpointers = {}
+_checkpointers_lock = threading.Lock()
+
+
+def ensure_checkpointer(path, interval, truncate_pages):
+    """Start the checkpoint thread for `path` in this process if not running yet."""
+    with _checkpointers_lock:
+        if path not in _checkpointers:
+            thread = WalCheckpointer(path, interval, truncate_pages)
+            thread.start()
+            _checkpointers[path] = thread
+    return _checkpointers[path]
+
+
+def _reset_after_fork():
+    # Threads do not survive fork(); each worker starts its own on first connect.
+    global _checkpointers_lock
+    _checkpointers.clear()
+    _checkpointers_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+# ----------------------
+# Backend
+# ----------------------
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+        self.pragmas = {
+            **PRAGMAS,
+            "busy_timeout": int(kwargs["timeout"] * 1000),
+            **kwargs.pop("pragmas", {}),
+        }
+        self.checkpoint_interval = kwargs.pop("checkpoint_interval", DEFAULT_CHECKPOINT_INTERVAL)
+        self.wal_truncate_pages = kwargs.pop("wal_truncate_pages", DEFAULT_WAL_TRUNCATE_PAGES)
+        if str(self.pragmas.get("journal_mode", "")).upper() != "WAL":
+            self.checkpoint_interval = 0  # nothing to checkpoint
+        if "transaction_mode" not in self.settings_dict["OPTIONS"]:
+            self.transaction_mode = "IMMEDIATE"
+        return kwargs
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        apply_pragmas(conn, self.pragmas)
+        if self.checkpoint_interval and not self.is_in_memory_db():
+            ensure_checkpointer(str(self.settings_dict["NAME"]), self.checkpoint_interval, self.wal_truncate_pages)
+        return conn
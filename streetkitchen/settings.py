@@ -4,6 +4,7 @@ Django settings for streetkitchen project.
 
 from pathlib import Path
 import os
+import time
 import dj_database_url
 
 # --------------------------
@@ -52,15 +53,42 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",  # ✅ serves static files
+    "core.middleware.PageCacheMiddleware",  # 📄 prerendered static pages for anonymous visitors
+    "core.middleware.AdmissionControlMiddleware",  # 🚦 503 when this worker is saturated
+    "core.middleware.ReplicaRoutingMiddleware",  # 📚 replica reads + sticky-after-write cookie
+    "core.middleware.MetricsMiddleware",  # 📈 Prometheus request/DB metrics
+    "core.middleware.QueryInstrumentationMiddleware",  # 📊 query count / timing (sampled)
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "core.middleware.RateLimitMiddleware",  # 🪣 per-client token buckets (RATE_LIMITS)
+    "customers.middleware.CustomerMiddleware",  # 👤 lazy request.customer (id cached in session)
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
 
+# --------------------------
+# Request Instrumentation
+# --------------------------
+# Fraction of requests that record query count / DB time (0 disables, 1 = every request)
+QUERY_INSTRUMENTATION_SAMPLE_RATE = float(
+    os.getenv("QUERY_INSTRUMENTATION_SAMPLE_RATE", "1.0" if DEBUG else "0.01")
+)
+# Same SQL repeated this many times in one request is logged as a likely N+1
+QUERY_INSTRUMENTATION_N_PLUS_ONE = int(os.getenv("QUERY_INSTRUMENTATION_N_PLUS_ONE", "5"))
+
+
+# --------------------------
+# Metrics (/metrics, Prometheus text format)
+# --------------------------
+# Shared directory for per-worker metric files; unset = single-process mode
+METRICS_MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR") or None
+# /metrics is staff-only; set this to let a scraper in with "Authorization: Bearer <token>"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+
 # --------------------------
 # URL / WSGI
 # --------------------------
@@ -114,6 +142,34 @@ DATABASES = {
     )
 }
 
+# 📚 Read replicas: comma-separated URLs → aliases replica_1, replica_2, ...
+# Only views decorated with core.db_router.replica_reads read from them.
+DATABASE_REPLICAS = []
+for _i, _url in enumerate(filter(None, os.getenv("DATABASE_REPLICA_URLS", "").split(",")), start=1):
+    DATABASES[f"replica_{_i}"] = {
+        **dj_database_url.parse(_url.strip(), conn_max_age=600),
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(f"replica_{_i}")
+
+DATABASE_ROUTERS = ["core.db_router.ReplicaRouter"]
+# After a write, the client reads from the primary for this long (replication lag budget)
+DATABASE_STICKY_SECONDS = int(os.getenv("DATABASE_STICKY_SECONDS", "10"))
+DATABASE_STICKY_COOKIE = "db_primary_until"
+
+# 🗄️ SQLite (no DATABASE_URL): WAL + tuned PRAGMAs, BEGIN IMMEDIATE, background WAL checkpoints.
+# WAL is recorded in the database file; SQLITE_JOURNAL_MODE=DELETE opts out, e.g. to
+# keep the committed db.sqlite3 unmodified while working on something else.
+for _db in DATABASES.values():
+    if _db.get("ENGINE") == "django.db.backends.sqlite3":
+        _db["ENGINE"] = "streetkitchen.db.sqlite3"
+        _options = _db.setdefault("OPTIONS", {})
+        _options.setdefault("timeout", float(os.getenv("SQLITE_BUSY_TIMEOUT", "10")))  # seconds
+        # seconds between WAL checkpoints, 0 disables
+        _options.setdefault("checkpoint_interval", float(os.getenv("SQLITE_CHECKPOINT_INTERVAL", "30")))
+        if os.getenv("SQLITE_JOURNAL_MODE"):
+            _options.setdefault("pragmas", {})["journal_mode"] = os.getenv("SQLITE_JOURNAL_MODE")
+
 
 # --------------------------
 # Authentication
@@ -151,6 +207,118 @@ MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
 
+# --------------------------
+# Proximity search (core.geo)
+# --------------------------
+PINCODE_CSV = os.getenv("PINCODE_CSV", str(BASE_DIR / "data" / "pincodes.csv"))
+GEO_DEFAULT_RADIUS_KM = float(os.getenv("GEO_DEFAULT_RADIUS_KM", "5"))
+GEO_MAX_RADIUS_KM = 50.0
+GEO_INDEX_TTL = float(os.getenv("GEO_INDEX_TTL", "300"))  # seconds; saves in this process rebuild sooner
+
+
+# --------------------------
+# Recommendations ("frequently ordered together")
+# --------------------------
+# Built by `manage.py build_recommendations`, memory-mapped by every worker
+RECOMMENDER_PATH = os.getenv("RECOMMENDER_PATH", str(BASE_DIR / "var" / "recommendations.bin"))
+
+
+# --------------------------
+# Static menu snapshots (vendors.snapshots)
+# --------------------------
+MENU_SNAPSHOT_ROOT = os.getenv("MENU_SNAPSHOT_ROOT", str(BASE_DIR / "var" / "menus"))
+# CDN / web server base URL mapped onto MENU_SNAPSHOT_ROOT; empty → served by vendors:menu_snapshot
+MENU_SNAPSHOT_URL = os.getenv("MENU_SNAPSHOT_URL", "")
+MENU_MANIFEST_MAX_AGE = 30  # seconds clients / CDN may reuse a manifest
+
+
+# --------------------------
+# Kitchen display (streaming.kds)
+# --------------------------
+KDS_POLL_INTERVAL = float(os.getenv("KDS_POLL_INTERVAL", "2"))  # seconds; other workers' changes
+KDS_HEARTBEAT = 15  # seconds between SSE keep-alive comments
+
+
+# --------------------------
+# Idempotent order creation (orders/idempotency.py)
+# --------------------------
+IDEMPOTENCY_TTL = 24 * 3600  # seconds a response is replayed for an Idempotency-Key
+IDEMPOTENCY_FALLBACK_TTL = 60  # without the header: same customer + same request within this window
+IDEMPOTENCY_WAIT = 10  # seconds a concurrent duplicate waits before a 409
+IDEMPOTENCY_LOCK_TIMEOUT = 60  # seconds before a key left in progress (crashed worker) can be retaken
+
+
+# --------------------------
+# Full-page cache (core.pagecache)
+# --------------------------
+# Pages that only change on deploy; served to anonymous visitors from stored bytes
+PAGE_CACHE_URLS = [
+    "core:about_us", "core:brand_story", "core:mission", "core:products",
+    "pages:about_us", "pages:mission", "pages:story",
+]
+PAGE_CACHE_BYPASS_COOKIES = ("messages",)  # besides the session cookie: these visitors get live pages
+PAGE_CACHE_MAX_AGE = 300  # seconds browsers may reuse a page
+# Cache keys carry the build: a deploy starts with fresh pages. Without a build id
+# each start of the (preloaded) master counts as a new build.
+BUILD_ID = os.getenv("BUILD_ID") or os.getenv("RENDER_GIT_COMMIT") or str(int(time.time()))
+
+
+# --------------------------
+# Rate limits & admission control (core/ratelimit.py)
+# --------------------------
+# URL name → "<requests>/<period>" token bucket per client (user, or IP if anonymous).
+# Buckets are in the default cache: shared with REDIS_URL, per worker process without it.
+RATE_LIMITS = {
+    "core:ajax_search_vendor": "60/m",
+    "core:track_vendor_click": "30/m",
+    "vendors:ai_combo_suggestions": "10/m",
+    "orders:track_status_api": "30/m",  # pages poll every 10s
+    "orders:order_tracking_status": "30/m",
+}
+RATE_LIMIT_PROXY_COUNT = int(os.getenv("RATE_LIMIT_PROXY_COUNT", "0"))  # proxies that append X-Forwarded-For
+MAX_IN_FLIGHT = int(os.getenv("MAX_IN_FLIGHT", "64"))  # concurrent requests per worker process (0 = no cap)
+MAX_IN_FLIGHT_EXEMPT_PATHS = ("/metrics",)
+
+
+# --------------------------
+# Cache & Sessions
+# --------------------------
+# Without REDIS_URL each process has its own LocMemCache, which workers
+# don't share: sessions then stay in the database (see below).
+if os.getenv("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("REDIS_URL"),
+        }
+    }
+
+# 🍪 Cache-first sessions with DB write-behind (core/sessions.py). They need a
+# cache every worker sees (core refuses to start otherwise), so without Redis
+# sessions are read from and written to the database directly.
+if os.getenv("REDIS_URL"):
+    SESSION_ENGINE = "core.sessions"
+else:
+    SESSION_ENGINE = "django.contrib.sessions.backends.db"
+SESSION_TOUCH_INTERVAL = float(os.getenv("SESSION_TOUCH_INTERVAL", "300"))  # seconds between expiry refreshes
+SESSION_WRITE_BEHIND_DELAY = float(os.getenv("SESSION_WRITE_BEHIND_DELAY", "2"))  # seconds
+
+
+# --------------------------
+# Logging
+# --------------------------
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "core.middleware": {"handlers": ["console"], "level": "INFO", "propagate": False},
+    },
+}
+
+
 # --------------------------
 # Default Primary Key
 # --------------------------
@@ -25,6 +25,9 @@ urlpatterns = [
 
     # Pages app
     path('pages/', include('pages.urls')),
+
+    # Streaming app (kitchen display)
+    path('streaming/', include(('streaming.urls', 'streaming'), namespace='streaming')),
 ]
 
 if settings.DEBUG:
@@ -2,6 +2,7 @@
 import random
 from decimal import Decimal
 from menuitem.models import MenuItem
+from menuitem.nutrition import vendor_matrix
 
 HEALTH_TIPS = [
     lambda c, p, carbs, fat: "Perfect light breakfast with steady energy." if c < 400 else "",
@@ -15,9 +16,10 @@ def generate_ai_combos(vendor, max_combos: int = 5):
     """
     AI-inspired combo builder with nutrition & health tips.
     """
-    items = MenuItem.objects.filter(vendor=vendor, is_available=True)
-    if not items.exists():
+    items = list(MenuItem.objects.filter(vendor=vendor, is_available=True).only("id", "name", "category", "price"))
+    if not items:
         return []
+    matrix = vendor_matrix(vendor.id)
 
     categories = {}
     for item in items:
@@ -27,17 +29,14 @@ def generate_ai_combos(vendor, max_combos: int = 5):
     for _ in range(max_combos):
         combo_items = []
         subtotal = Decimal("0.00")
-        total_cal, total_protein, total_carbs, total_fat = 0, 0, 0, 0
 
         # pick at least 1 from each category
         for _, cat_items in categories.items():
             chosen = random.choice(cat_items)
             combo_items.append(chosen)
             subtotal += chosen.price
-            total_cal += float(chosen.calories)
-            total_protein += float(chosen.protein)
-            total_carbs += float(chosen.carbs)
-            total_fat += float(chosen.fat)
+
+        total_cal, total_protein, total_carbs, total_fat, _ = matrix.totals({i.id: 1 for i in combo_items})
 
         # discount
         discount = Decimal("0.00")
@@ -69,3 +68,104 @@ def generate_ai_combos(vendor, max_combos: int = 5):
         })
 
     return combos
+
+
+# ----------------------
+# Mood / health-profile suggestions (ai_combo_suggestions API, menu snapshots)
+# ----------------------
+DEFAULT_MOOD = "balanced"
+DEFAULT_PROFILE = "normal"
+
+# ✅ Base combos (fallback / moods)
+MOOD_ITEMS = {
+    "light breakfast": [
+        {"name": "Idli", "qty": 2},
+        {"name": "Sambar", "qty": 1},
+        {"name": "Coconut Chutney", "qty": 1},
+    ],
+    "family dinner": [
+        {"name": "Idli", "qty": 6},
+        {"name": "Sambar", "qty": 2},
+        {"name": "Coconut Chutney", "qty": 1},
+        {"name": "Onion-Tomato Chutney", "qty": 1},
+    ],
+    "quick snack": [
+        {"name": "Idli", "qty": 1},
+        {"name": "Sambar", "qty": 1},
+    ],
+}
+DEFAULT_ITEMS = [{"name": "Idli", "qty": 4}, {"name": "Sambar", "qty": 1}]
+
+PROFILE_TIPS = {
+    "diabetic": "🍀 Diabetic Tip: Controlled carbs, extra protein for stable sugar.",
+    "weight loss": "🔥 Weight Loss Tip: Smaller idli portion, more fiber helps satiety.",
+    "high protein": "💪 High Protein Tip: Peanut chutney boosts protein for muscle health.",
+}
+DEFAULT_TIP = "🥗 Balanced Diet: Great mix of carbs, protein, and fiber."
+PROFILES = (DEFAULT_PROFILE, *PROFILE_TIPS)
+
+
+def mood_items(mood, profile):
+    """[{"name", "qty"}] for a mood, adjusted for a health profile (fresh dicts)."""
+    items = [dict(i) for i in MOOD_ITEMS.get(mood, DEFAULT_ITEMS)]
+
+    # ✅ Apply health profile adjustments
+    if profile == "diabetic":
+        for i in items:
+            if i["name"].lower() == "idli":
+                i["qty"] = max(1, i["qty"] - 2)   # reduce carbs
+        items.append({"name": "Peanut Chutney", "qty": 1})   # add protein/fat for satiety
+
+    elif profile == "weight loss":
+        for i in items:
+            if i["name"].lower() == "idli":
+                i["qty"] = max(1, i["qty"] - 1)   # portion control
+        items.append({"name": "Onion-Tomato Chutney", "qty": 1})  # fiber boost
+
+    elif profile == "high protein":
+        items.append({"name": "Peanut Chutney", "qty": 2})   # protein boost
+
+    return items
+
+
+def item_quantities(items):
+    quantities = {}
+    for i in items:
+        quantities[i["name"]] = quantities.get(i["name"], 0) + i["qty"]
+    return quantities
+
+
+def suggestion(vendor_code, mood, profile, items, prices, totals):
+    """
+    API payload of one suggestion. `prices` is {lowercase name: price} of
+    the vendor's menu, `totals` the basket's nutrient totals.
+    """
+    nutrition_label = dict(zip(("cal", "protein", "carbs", "fat", "fiber"), (round(t, 1) for t in totals)))
+
+    # ✅ Price calculation
+    subtotal = 0
+    for i in items:
+        price = prices.get(i["name"].lower())
+        if price is not None:
+            subtotal += float(price) * i["qty"]
+            i["price"] = float(price)
+        else:
+            i["price"] = 0
+
+    gst = round(subtotal * 0.05, 2)
+    delivery = 20 if subtotal < 200 else 0
+    total = subtotal + gst + delivery
+
+    return {
+        "success": True,
+        "vendor": vendor_code,
+        "mood": mood,
+        "profile": profile,
+        "items": items,
+        "nutrition": nutrition_label,
+        "subtotal": subtotal,
+        "gst": gst,
+        "delivery": delivery,
+        "total": total,
+        "tip": PROFILE_TIPS.get(profile, DEFAULT_TIP),  # ✅ Personalized health tip
+    }
@@ -0,0 +1,143 @@
+# vendors/fulfilment.py
+"""
+Precomputed vendor × combo fulfilment.
+
+A vendor can serve a combo when every item of the combo is on the vendor's
+available menu, matching by normalized name (vendors share no MenuItem
+rows). Each normalized name that appears in any combo gets a bit; a combo
+is the OR of its items' bits and a vendor the OR of its available items'
+bits, so "vendor serves combo" is `combo & ~vendor == 0`. The pairs that
+pass are stored in `VendorComboFulfilment` (with the vendor's pincode, for
+the (combo, pincode) index) and recomputed per vendor or per combo when a
+menu item or combo item changes. Renaming a menu item also recomputes the
+combos that list its old or new name, for every vendor.
+"""
+import re
+
+from django.db import transaction
+
+from menuitem.models import Combo, MenuItem
+from .models import ComboItem, Vendor, VendorComboFulfilment
+
+_SPACES = re.compile(r"\s+")
+
+
+def normalize(name):
+    return _SPACES.sub(" ", (name or "").strip()).casefold()
+
+
+# ----------------------
+# Bitmaps
+# ----------------------
+def _combo_masks(combo_ids=None):
+    """({combo_id: mask}, {normalized name: bit}) for the given combos (all if None)."""
+    lines = ComboItem.objects.values_list("combo_id", "menu_item__name")
+    combos = Combo.objects.values_list("id", flat=True)
+    if combo_ids is not None:
+        lines = lines.filter(combo_id__in=combo_ids)
+        combos = combos.filter(id__in=combo_ids)
+
+    bits = {}
+    masks = dict.fromkeys(combos, 0)  # combos without items are served by everyone
+    for combo_id, name in lines:
+        bit = bits.setdefault(normalize(name), 1 << len(bits))
+        masks[combo_id] |= bit
+    return masks, bits
+
+
+def name_pattern(names):
+    """Case-insensitive regex for names equal to one of the normalized `names` up to whitespace."""
+    alternatives = (r"\s+".join(re.escape(word) for word in name.split(" ")) for name in sorted(names))
+    return rf"^\s*({'|'.join(alternatives)})\s*$"
+
+
+def _vendor_masks(bits, vendor_ids=None, only_named=False):
+    """
+    {vendor_id: mask of its available items} over the names in `bits`.
+    `only_named` has the database return just the items named in `bits`
+    instead of every available item.
+    """
+    items = MenuItem.objects.filter(is_available=True).values_list("vendor_id", "name")
+    vendors = Vendor.objects.values_list("id", "pincode")
+    if vendor_ids is not None:
+        items = items.filter(vendor_id__in=vendor_ids)
+        vendors = vendors.filter(id__in=vendor_ids)
+    if only_named:
+        items = items.filter(name__iregex=name_pattern(bits)) if bits else items.none()
+
+    masks = {vendor_id: [0, pincode or ""] for vendor_id, pincode in vendors}
+    for vendor_id, name in items:
+        if vendor_id in masks:
+            masks[vendor_id][0] |= bits.get(normalize(name), 0)
+    return masks
+
+
+def _pairs(combo_masks, vendor_masks):
+    return [
+        VendorComboFulfilment(vendor_id=vendor_id, combo_id=combo_id, pincode=pincode)
+        for vendor_id, (vendor_mask, pincode) in vendor_masks.items()
+        for combo_id, combo_mask in combo_masks.items()
+        if combo_mask & ~vendor_mask == 0
+    ]
+
+
+# ----------------------
+# Maintenance
+# ----------------------
+def refresh_vendors(vendor_ids):
+    """Recompute every combo for these vendors (menu item added, renamed, toggled)."""
+    combo_masks, bits = _combo_masks()
+    rows = _pairs(combo_masks, _vendor_masks(bits, vendor_ids))
+    with transaction.atomic():
+        VendorComboFulfilment.objects.filter(vendor_id__in=vendor_ids).delete()
+        VendorComboFulfilment.objects.bulk_create(rows, batch_size=2_000)
+    return len(rows)
+
+
+def refresh_combos(combo_ids):
+    """Recompute every vendor for these combos (combo items changed)."""
+    combo_masks, bits = _combo_masks(combo_ids)
+    rows = _pairs(combo_masks, _vendor_masks(bits, only_named=True))
+    with transaction.atomic():
+        VendorComboFulfilment.objects.filter(combo_id__in=combo_ids).delete()
+        VendorComboFulfilment.objects.bulk_create(rows, batch_size=2_000)
+    return len(rows)
+
+
+def combos_named(names):
+    """Ids of combos with an item whose name normalizes to one of `names`."""
+    names = {normalize(name) for name in names if name}
+    if not names:
+        return []
+    return list(
+        ComboItem.objects.filter(menu_item__name__iregex=name_pattern(names))
+        .values_list("combo_id", flat=True).distinct()
+    )
+
+
+def rebuild():
+    """Recompute the whole table; returns the number of (vendor, combo) pairs."""
+    combo_masks, bits = _combo_masks()
+    rows = _pairs(combo_masks, _vendor_masks(bits))
+    with transaction.atomic():
+        VendorComboFulfilment.objects.all().delete()
+        VendorComboFulfilment.objects.bulk_create(rows, batch_size=2_000)
+    return len(rows)
+
+
+def sync_pincode(vendor):
+    VendorComboFulfilment.objects.filter(vendor=vendor).exclude(pincode=vendor.pincode or "").update(
+        pincode=vendor.pincode or ""
+    )
+
+
+# ----------------------
+# Lookup
+# ----------------------
+def vendors_for_combo(combo_id, pincodes=None):
+    """Active vendors that can serve the combo, optionally only in the given pincodes."""
+    rows = VendorComboFulfilment.objects.filter(combo_id=combo_id)
+    if pincodes is not None:
+        rows = rows.filter(pincode__in=list(pincodes))
+    return Vendor.objects.filter(is_active=True, id__in=rows.values("vendor_id"))
+
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-19 08:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menuitem', '0014_seed_ingredients'),
+        ('vendors', '0006_vendor_created_at_vendor_slug_vendor_updated_at_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VendorComboFulfilment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pincode', models.CharField(blank=True, default='', max_length=10)),
+                ('combo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fulfilments', to='menuitem.combo')),
+                ('vendor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='combo_fulfilments', to='vendors.vendor')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['combo', 'pincode'], name='vendors_ven_combo_i_a7d972_idx')],
+                'constraints': [models.UniqueConstraint(fields=('vendor', 'combo'), name='unique_fulfilment_vendor_combo')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 08:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendors', '0007_vendorcombofulfilment'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vendor',
+            name='menu_version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -24,6 +24,8 @@ class Vendor(models.Model):
 
     # Item count is updated from menu
     items_count = models.PositiveIntegerField(default=0)
+    # Bumped on every menu change; keys the cached vendor page (vendors/page.py)
+    menu_version = models.PositiveIntegerField(default=0, editable=False)
 
     # 🚀 Auto vendor code (SOT001, SOT002 …)
     vendor_code = models.CharField(max_length=20, unique=True, blank=True, null=True)
@@ -74,17 +76,11 @@ class Vendor(models.Model):
 
     def can_fulfill_combo(self, combo):
         """
-        Check if vendor can fulfill a given combo.
-        A vendor can fulfill if they have all required menu items in sufficient qty.
+        Check if vendor can fulfill a given combo: every combo item is on this
+        vendor's available menu (by normalized name). Answered from the
+        precomputed `VendorComboFulfilment` table, see vendors.fulfilment.
         """
-        required_items = combo.combo_items.all()
-        vendor_items = {item.name.lower(): item for item in self.menu_items.all()}
-
-        for req in required_items:
-            menu_name = req.menu_item.name.lower()
-            if menu_name not in vendor_items:
-                return False
-        return True
+        return self.combo_fulfilments.filter(combo=combo).exists()
 
     # ==============================
     # Save override
@@ -157,6 +153,25 @@ class ComboItem(models.Model):
         return f"{self.menu_item.name} × {self.quantity} (Combo: {self.combo.name})"
 
 
+# ======================================================
+# Vendor × Combo fulfilment (maintained by vendors.fulfilment)
+# ======================================================
+class VendorComboFulfilment(models.Model):
+    """One row per (vendor, combo) the vendor's available menu can serve."""
+    vendor = models.ForeignKey(Vendor, on_delete=models.CASCADE, related_name="combo_fulfilments")
+    combo = models.ForeignKey("menuitem.Combo", on_delete=models.CASCADE, related_name="fulfilments")
+    pincode = models.CharField(max_length=10, blank=True, default="")  # copy of vendor.pincode
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["vendor", "combo"], name="unique_fulfilment_vendor_combo")
+        ]
+        indexes = [models.Index(fields=["combo", "pincode"])]
+
+    def __str__(self):
+        return f"{self.vendor_id} can serve combo {self.combo_id}"
+
+
 # ======================================================
 # Vendor Application (Apply form submissions)
 # ======================================================
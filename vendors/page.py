@@ -0,0 +1,156 @@
+# vendors/page.py
+"""
+Vendor menu page data.
+
+`load_vendor_page(code)` fetches the vendor row (one query) and looks up an
+immutable `VendorPage` in the Django cache under the vendor's
+`menu_version` + `updated_at`. Only on a miss does it read the available
+menu (a second query) and derive categories and facets in Python. Any
+menu item save / delete bumps `Vendor.menu_version`, so a stale page is
+never served and nothing has to be deleted from the cache.
+"""
+from collections import Counter
+
+from django.core.cache import cache
+from django.db.models import F
+from django.http import Http404
+
+from core import recommender
+from core.metrics import record_cache_lookup
+from menuitem.models import MenuItem
+from .models import Vendor
+
+CACHE_TIMEOUT = 24 * 60 * 60
+NUTRIENTS = ("calories", "protein", "carbs", "fat", "fiber")
+
+
+class _Frozen:
+    """Attribute bag that refuses writes after __init__ (pages are shared across requests)."""
+
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def _set(self, **values):
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state):
+        self._set(**state)
+
+
+class MenuEntry(_Frozen):
+    __slots__ = ("id", "name", "category", "category_label", "price") + NUTRIENTS
+
+    def __init__(self, item):
+        self._set(
+            id=item.id,
+            name=item.name,
+            category=item.category,
+            category_label=item.get_category_display(),
+            price=item.price,
+            **{name: getattr(item, name) for name in NUTRIENTS},
+        )
+
+    def __str__(self):
+        return self.name
+
+
+class VendorSummary(_Frozen):
+    __slots__ = (
+        "id", "vendor_code", "name", "city", "pincode", "owner_name", "experience",
+        "signature_dish", "image_url", "available",
+    )
+
+    def __init__(self, vendor):
+        self._set(
+            id=vendor.id,
+            vendor_code=vendor.vendor_code,
+            name=vendor.name,
+            city=vendor.city,
+            pincode=vendor.pincode,
+            owner_name=vendor.owner_name,
+            experience=vendor.experience,
+            signature_dish=vendor.signature_dish,
+            image_url=vendor.image.url if vendor.image else "",
+            available=vendor.available,
+        )
+
+    @property
+    def code(self):
+        return self.vendor_code or ""
+
+
+class VendorPage(_Frozen):
+    """Everything the vendor menu page shows, derived from one menu read."""
+
+    __slots__ = ("vendor", "items", "sections", "categories", "facets", "version")
+
+    def __init__(self, vendor, items, version):
+        items = tuple(MenuEntry(item) for item in items)
+        counts = Counter(item.category for item in items)
+        sections = []
+        for item in items:  # items arrive ordered by category
+            if not sections or sections[-1][0] != item.category:
+                sections.append((item.category, item.category_label, []))
+            sections[-1][2].append(item)
+        prices = [item.price for item in items]
+        calories = [item.calories for item in items if item.calories is not None]
+        self._set(
+            vendor=VendorSummary(vendor),
+            items=items,
+            sections=tuple((key, label, tuple(entries)) for key, label, entries in sections),
+            categories=tuple((key, label, counts[key]) for key, label, _ in sections),
+            facets={
+                "items": len(items),
+                "price_min": min(prices) if prices else None,
+                "price_max": max(prices) if prices else None,
+                "calories_min": min(calories) if calories else None,
+                "calories_max": max(calories) if calories else None,
+            },
+            version=version,
+        )
+
+
+def _cache_key(vendor):
+    return f"vendorpage:{vendor.id}:{vendor.menu_version}:{vendor.updated_at.timestamp():.6f}"
+
+
+def load_vendor_page(code):
+    """VendorPage of an active vendor by vendor code, or Http404."""
+    vendor = Vendor.objects.filter(vendor_code=code, is_active=True).first()
+    if vendor is None:
+        raise Http404("Vendor not found")
+
+    key = _cache_key(vendor)
+    page = cache.get(key)
+    record_cache_lookup("vendor_page", page is not None)
+    if page is None:
+        items = (
+            MenuItem.objects.filter(vendor_id=vendor.id, is_available=True)
+            .only("id", "name", "category", "price", *NUTRIENTS)
+            .order_by("category", "name", "id")
+        )
+        page = VendorPage(vendor, items, vendor.menu_version)
+        cache.set(key, page, CACHE_TIMEOUT)
+    return page
+
+
+def page_context(page):
+    """Template context of vendors/vendor_detail.html."""
+    return {
+        "vendor": page.vendor,
+        "page": page,
+        "menu_items": page.items,
+        "categories": page.categories,
+        "frequently_together": recommender.pairs_for_menu(page.items),
+    }
+
+
+def bump_menu_version(*vendor_ids):
+    """Invalidate cached pages of these vendors (call after menu changes that skip signals)."""
+    Vendor.objects.filter(id__in=vendor_ids).update(menu_version=F("menu_version") + 1)
@@ -0,0 +1,102 @@
+# vendors/signals.py
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from menuitem.models import Combo, ComboRule as ComboPlateRule, MenuItem
+from orders.models import ComboRule as DiscountRule
+from . import fulfilment, snapshots
+from .page import bump_menu_version
+from .models import ComboItem, Vendor
+
+
+@receiver(pre_save, sender=MenuItem)
+def remember_menu_item_name(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Keep the stored name: a rename changes the combos this item's name belongs to."""
+    instance._stored_name = None
+    if instance.pk and not raw and (update_fields is None or "name" in update_fields):
+        instance._stored_name = MenuItem.objects.filter(pk=instance.pk).values_list("name", flat=True).first()
+
+
+@receiver([post_save, post_delete], sender=MenuItem)
+def refresh_vendor_fulfilment(sender, instance, **kwargs):
+    vendor_id = instance.vendor_id
+    bump_menu_version(vendor_id)
+    transaction.on_commit(lambda: fulfilment.refresh_vendors([vendor_id]))
+
+    old_name = getattr(instance, "_stored_name", None)
+    if old_name is not None and fulfilment.normalize(old_name) != fulfilment.normalize(instance.name):
+        # Combos listing either name now match a different set of vendors
+        names = (old_name, instance.name)
+        transaction.on_commit(lambda: fulfilment.refresh_combos(fulfilment.combos_named(names)))
+
+
+@receiver([post_save, post_delete], sender=ComboItem)
+def refresh_combo_fulfilment(sender, instance, **kwargs):
+    combo_id = instance.combo_id
+    transaction.on_commit(lambda: fulfilment.refresh_combos([combo_id]))
+
+
+@receiver(post_save, sender=Combo)
+def fulfil_new_combo(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(lambda: fulfilment.refresh_combos([instance.pk]))
+
+
+@receiver(post_save, sender=Vendor)
+def sync_fulfilment_pincode(sender, instance, created, **kwargs):
+    if not created:
+        fulfilment.sync_pincode(instance)
+
+
+# ----------------------
+# Static menu snapshots
+# ----------------------
+# Vendor fields embedded in the menu document (or deciding whether it is published)
+SNAPSHOT_VENDOR_FIELDS = {"vendor_code", "name", "city", "pincode", "is_active"}
+
+
+@receiver(post_save, sender=Vendor)
+def publish_menu_for_vendor(sender, instance, created, update_fields=None, **kwargs):
+    if created or (update_fields is not None and SNAPSHOT_VENDOR_FIELDS.isdisjoint(update_fields)):
+        return  # new vendors have no menu yet; click counters etc. don't show in it
+    snapshots.schedule_publish(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=MenuItem)
+def publish_menu_for_item(sender, instance, **kwargs):
+    snapshots.schedule_publish(instance.vendor_id)
+
+
+@receiver(post_save, sender=Combo)
+def publish_menu_for_combo(sender, instance, **kwargs):
+    snapshots.schedule_publish(*instance.vendors.values_list("id", flat=True))
+
+
+@receiver(pre_delete, sender=Combo)
+def publish_menu_for_deleted_combo(sender, instance, **kwargs):
+    # Read the vendors before the delete removes the m2m rows
+    snapshots.schedule_publish(*instance.vendors.values_list("id", flat=True))
+
+
+@receiver(m2m_changed, sender=Combo.vendors.through)
+def publish_menu_for_combo_vendors(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    if reverse:  # vendor.menuitem_combos.add(...)
+        snapshots.schedule_publish(instance.pk)
+    elif action == "pre_clear":
+        snapshots.schedule_publish(*instance.vendors.values_list("id", flat=True))
+    else:
+        snapshots.schedule_publish(*(pk_set or ()))
+
+
+@receiver([post_save, post_delete], sender=ComboPlateRule)
+def publish_menu_for_plate_rule(sender, instance, **kwargs):
+    snapshots.schedule_publish(instance.vendor_id)
+
+
+@receiver([post_save, post_delete], sender=DiscountRule)
+def publish_menu_for_discount_rule(sender, instance, **kwargs):
+    vendor_id = MenuItem.objects.filter(pk=instance.menu_item_id).values_list("vendor_id", flat=True).first()
+    snapshots.schedule_publish(vendor_id)
@@ -0,0 +1,299 @@
+# vendors/snapshots.py
+"""
+Static JSON menu snapshots.
+
+Between menu edits the menu, item and AI combo payloads of a vendor are the
+same for every caller, so they are written once to files instead of being
+rebuilt per request:
+
+    <MENU_SNAPSHOT_ROOT>/<vendor_code>/items.<sha256[:16]>.json (+ .gz, + .br)
+    <MENU_SNAPSHOT_ROOT>/<vendor_code>/manifest.json
+
+File names carry the content hash, so a URL never changes meaning and can
+be cached forever (`Cache-Control: immutable`) by browsers and a CDN; only
+the small manifest (`vendors:menu_manifest`) has to be fetched fresh.
+`publish()` runs after commit whenever a MenuItem, Combo or ComboRule of the
+vendor changes (vendors/signals.py) and rewrites nothing whose content is
+unchanged. Files of the previous manifest are kept for clients still holding
+it; anything older is removed. Publishes of one vendor are serialised by an
+exclusive lock on `<vendor_code>/.lock`, so a publish never prunes files
+another process has just written for its own manifest.
+
+Set `MENU_SNAPSHOT_URL` to a CDN / web server mapped onto
+`MENU_SNAPSHOT_ROOT` to take the files off Django entirely. Without it
+`vendors:menu_snapshot` serves them: a file read, no database. Several app
+servers need the root on shared storage, or `manage.py publish_menus` on
+each after deploys.
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.urls import reverse
+
+from menuitem import nutrition
+from menuitem.models import Combo, ComboRule as ComboPlateRule, MenuItem
+from orders import combo_rules
+from . import ai_combo
+from .models import Vendor
+from .page import NUTRIENTS
+
+try:  # optional: Brotli variants are skipped without the package
+    import brotli
+except ImportError:
+    brotli = None
+
+try:  # POSIX only; elsewhere publishes of one vendor are not serialised
+    import fcntl
+except ImportError:
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = "manifest.json"
+LOCK = ".lock"
+HASH_LENGTH = 16
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))  # preference order for Accept-Encoding
+SAFE_CODE = re.compile(r"[\w-]+")  # vendor codes become directory names
+SNAPSHOT_NAME = re.compile(rf"[a-z_]+\.[0-9a-f]{{{HASH_LENGTH}}}\.json")
+
+
+def snapshot_root():
+    return Path(settings.MENU_SNAPSHOT_ROOT)
+
+
+def vendor_dir(vendor_code):
+    return snapshot_root() / vendor_code
+
+
+# ----------------------
+# Documents
+# ----------------------
+def items_document(vendor):
+    """Same shape as the vendor_items_api response."""
+    items = (
+        MenuItem.objects.filter(vendor_id=vendor.id, is_available=True)
+        .order_by("category", "name", "id").values_list("id", "name", "category", "price")
+    )
+    return {
+        "items": [
+            {"id": i, "name": name, "category": category, "price": float(price), "is_available": True}
+            for i, name, category, price in items
+        ]
+    }
+
+
+def menu_document(vendor):
+    """Full menu: items with nutrients, base combos, combo plates and discount rules."""
+    items = (
+        MenuItem.objects.filter(vendor_id=vendor.id, is_available=True)
+        .order_by("category", "name", "id").values("id", "name", "category", "price", *NUTRIENTS)
+    )
+    combos = (
+        Combo.objects.filter(vendors=vendor, is_available=True)
+        .order_by("name", "id").values("id", "code", "name", "description", "price", "nutrition")
+    )
+    plates = (
+        ComboPlateRule.objects.filter(vendor_id=vendor.id).order_by("name", "id")
+        .values("id", "name", "required_idli", "required_chutney", "required_sambar", "combo_price")
+    )
+    rules = [
+        {
+            "menu_item_id": rule.menu_item_id,
+            "menu_item": rule.menu_item_name,
+            "min_quantity": rule.min_quantity,
+            "discount_percentage": rule.discount_percentage,
+        }
+        for rule in combo_rules.for_vendor(vendor.id)
+    ]
+    return {
+        "vendor": {"code": vendor.vendor_code, "name": vendor.name, "city": vendor.city, "pincode": vendor.pincode},
+        "items": list(items),
+        "combos": list(combos),
+        "combo_plates": list(plates),
+        "combo_rules": rules,
+    }
+
+
+def ai_combos_document(vendor):
+    """ai_combo_suggestions responses for every mood × health profile: {mood: {profile: payload}}."""
+    prices = {}
+    for name, price in MenuItem.objects.filter(vendor_id=vendor.id).order_by("id").values_list("name", "price"):
+        prices.setdefault(name.lower(), price)
+
+    suggestions = {}
+    for mood in (*ai_combo.MOOD_ITEMS, ai_combo.DEFAULT_MOOD):
+        for profile in ai_combo.PROFILES:
+            items = ai_combo.mood_items(mood, profile)
+            totals = nutrition.basket_by_name(vendor.id, ai_combo.item_quantities(items))
+            suggestions.setdefault(mood, {})[profile] = ai_combo.suggestion(
+                vendor.vendor_code, mood, profile, items, prices, totals
+            )
+    return {"moods": suggestions}
+
+
+DOCUMENTS = {
+    "menu": menu_document,
+    "items": items_document,
+    "ai_combos": ai_combos_document,
+}
+
+
+# ----------------------
+# Files
+# ----------------------
+def _encode(document):
+    return json.dumps(document, cls=DjangoJSONEncoder, sort_keys=True, separators=(",", ":")).encode()
+
+
+def _write_atomic(path, data):
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def _write_variants(path, data):
+    """The file plus precompressed variants; skipped when already there (same name = same content)."""
+    if not path.exists():
+        _write_atomic(path, data)
+    gz = path.with_name(path.name + ".gz")
+    if not gz.exists():
+        _write_atomic(gz, gzip.compress(data, compresslevel=9, mtime=0))
+    if brotli is not None:
+        br = path.with_name(path.name + ".br")
+        if not br.exists():
+            _write_atomic(br, brotli.compress(data, quality=11))
+
+
+def read_manifest(vendor_code):
+    try:
+        return json.loads((vendor_dir(vendor_code) / MANIFEST).read_bytes())
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _prune(directory, keep):
+    for path in directory.iterdir():
+        if path.name in (MANIFEST, LOCK) or path.name.startswith(".tmp-"):
+            continue
+        if path.name.split(".json")[0] + ".json" not in keep:
+            path.unlink(missing_ok=True)
+
+
+@contextmanager
+def _locked(directory):
+    """Exclusive lock on the vendor directory, across threads and processes; released on close."""
+    with open(directory / LOCK, "a+b") as fh:
+        if fcntl is not None:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+        yield
+
+
+def publish(vendor_id):
+    """Write the vendor's snapshots and manifest; returns the manifest (None for unknown vendors)."""
+    vendor = Vendor.objects.filter(id=vendor_id, is_active=True, vendor_code__isnull=False).first()
+    if vendor is None or not SAFE_CODE.fullmatch(vendor.vendor_code):
+        return None
+    directory = vendor_dir(vendor.vendor_code)
+    directory.mkdir(parents=True, exist_ok=True)
+    with _locked(directory):
+        return _publish(vendor, directory)
+
+
+def _publish(vendor, directory):
+    files = {}
+    for name, build in DOCUMENTS.items():
+        data = _encode(build(vendor))
+        digest = hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+        filename = f"{name}.{digest}.json"
+        _write_variants(directory / filename, data)
+        files[name] = {"file": filename, "hash": digest, "bytes": len(data)}
+
+    previous = read_manifest(vendor.vendor_code)
+    if previous is not None and previous.get("files") == files:
+        return previous  # nothing changed
+
+    manifest = {
+        "vendor": vendor.vendor_code,
+        "version": hashlib.sha256(_encode(files)).hexdigest()[:HASH_LENGTH],
+        "files": files,
+        "previous": {name: f["file"] for name, f in (previous or {}).get("files", {}).items()},
+    }
+    _write_atomic(directory / MANIFEST, _encode(manifest))
+    _prune(directory, {f["file"] for f in files.values()} | set(manifest["previous"].values()))
+    logger.info(f"Published menu snapshots of {vendor.vendor_code} ({manifest['version']})")
+    return manifest
+
+
+def manifest_for(vendor):
+    """The vendor's current manifest, publishing on first use."""
+    return read_manifest(vendor.vendor_code) or publish(vendor.id)
+
+
+def file_url(vendor_code, filename):
+    if settings.MENU_SNAPSHOT_URL:
+        return f"{settings.MENU_SNAPSHOT_URL.rstrip('/')}/{vendor_code}/{filename}"
+    return reverse("vendors:menu_snapshot", args=[vendor_code, filename])
+
+
+def open_snapshot(vendor_code, filename, accept_encoding=""):
+    """(open file, content encoding or None) of the best variant the client accepts, or None."""
+    if not SAFE_CODE.fullmatch(vendor_code) or not SNAPSHOT_NAME.fullmatch(filename):
+        return None
+    path = vendor_dir(vendor_code) / filename
+    accepted = {e.split(";")[0].strip() for e in accept_encoding.lower().split(",")}
+    for encoding, suffix in ENCODINGS:
+        if encoding in accepted:
+            try:
+                return open(path.with_name(filename + suffix), "rb"), encoding
+            except FileNotFoundError:
+                continue
+    try:
+        return open(path, "rb"), None
+    except FileNotFoundError:
+        return None
+
+
+# ----------------------
+# Scheduling
+# ----------------------
+_pending = threading.local()
+
+
+def _publish_pending():
+    vendor_ids = getattr(_pending, "ids", set())
+    _pending.ids = set()
+    for vendor_id in sorted(vendor_ids):
+        try:
+            publish(vendor_id)
+        except Exception as exc:  # the edit itself is committed; the next change or publish_menus catches up
+            logger.error(f"Menu snapshot publish failed for vendor {vendor_id}: {exc}", exc_info=True)
+
+
+def schedule_publish(*vendor_ids):
+    """
+    Publish after the current transaction commits. The first callback of a
+    commit publishes every vendor queued so far and the rest find nothing
+    left, so a bulk edit publishes each vendor once. Vendors queued by a
+    rolled-back transaction ride along with the next commit (a no-op publish).
+    """
+    if not hasattr(_pending, "ids"):
+        _pending.ids = set()
+    _pending.ids.update(v for v in vendor_ids if v is not None)
+    transaction.on_commit(_publish_pending)
@@ -1,3 +1,96 @@
 from django.test import TestCase
 
-# Create your tests here.
+from menuitem.models import Combo, MenuItem
+from . import fulfilment
+from .models import ComboItem, Vendor, VendorComboFulfilment
+
+
+class FulfilmentTests(TestCase):
+    def setUp(self):
+        self.full = Vendor.objects.create(name="Full Menu", vendor_code="FUL01", pincode="600001")
+        self.idli_only = Vendor.objects.create(name="Idli Only", vendor_code="FUL02", pincode="600002")
+        self.sold_out = Vendor.objects.create(name="Sold Out", vendor_code="FUL03", pincode="600001")
+
+        idli = self.item(self.full, "Idli")
+        dosa = self.item(self.full, "Masala Dosa")
+        self.item(self.idli_only, "  IDLI ")
+        self.item(self.sold_out, "idli")
+        self.sold_out_dosa = self.item(self.sold_out, "masala  dosa", is_available=False)
+
+        self.plate = self.combo("Idli Dosa Plate", idli, dosa)
+        self.idli_plate = self.combo("Idli Plate", idli)
+        self.empty = self.combo("Empty Plate")
+
+    def item(self, vendor, name, is_available=True):
+        return MenuItem.objects.create(
+            vendor=vendor, name=name, category="idli", price=10, is_available=is_available
+        )
+
+    def combo(self, name, *items):
+        combo = Combo.objects.create(name=name)
+        ComboItem.objects.bulk_create(ComboItem(combo=combo, menu_item=item) for item in items)
+        return combo
+
+    def served(self, combo):
+        return set(VendorComboFulfilment.objects.filter(combo=combo).values_list("vendor_id", flat=True))
+
+    def test_vendor_serves_combo_when_no_combo_bit_is_missing(self):
+        masks, bits = fulfilment._combo_masks()
+        vendors = fulfilment._vendor_masks(bits)
+        self.assertEqual(masks[self.plate.pk], bits["idli"] | bits["masala dosa"])
+        self.assertEqual(masks[self.empty.pk], 0)
+        self.assertEqual(vendors[self.sold_out.pk], [bits["idli"], "600001"])  # unavailable dosa has no bit
+
+        pairs = {(row.vendor_id, row.combo_id) for row in fulfilment._pairs(masks, vendors)}
+        self.assertIn((self.full.pk, self.plate.pk), pairs)
+        self.assertNotIn((self.idli_only.pk, self.plate.pk), pairs)
+        self.assertNotIn((self.sold_out.pk, self.plate.pk), pairs)
+
+    def test_rebuild(self):
+        fulfilment.rebuild()
+        everyone = {self.full.pk, self.idli_only.pk, self.sold_out.pk}
+        self.assertEqual(self.served(self.plate), {self.full.pk})
+        self.assertEqual(self.served(self.idli_plate), everyone)  # names match up to case and spaces
+        self.assertEqual(self.served(self.empty), everyone)
+
+    def test_only_named_scan_matches_full_scan(self):
+        masks, bits = fulfilment._combo_masks([self.plate.pk])
+        self.assertEqual(fulfilment._vendor_masks(bits, only_named=True), fulfilment._vendor_masks(bits))
+
+    def test_menu_changes_refresh_on_commit(self):
+        fulfilment.rebuild()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.sold_out_dosa.is_available = True
+            self.sold_out_dosa.save()
+        self.assertEqual(self.served(self.plate), {self.full.pk, self.sold_out.pk})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.item(self.idli_only, "Masala Dosa")
+        self.assertEqual(self.served(self.plate), {self.full.pk, self.idli_only.pk, self.sold_out.pk})
+
+    def test_combo_item_and_rename_refresh_every_vendor(self):
+        fulfilment.rebuild()
+        vada = self.item(self.idli_only, "Vada")
+        with self.captureOnCommitCallbacks(execute=True):
+            ComboItem.objects.create(combo=self.idli_plate, menu_item=vada)
+        self.assertEqual(self.served(self.idli_plate), {self.idli_only.pk})
+
+        # The combo now needs "medu vada": only the combo refresh adds the other vendor
+        self.item(self.full, "Medu Vada")
+        with self.captureOnCommitCallbacks(execute=True):
+            vada.name = "medu vada"
+            vada.save()
+        self.assertEqual(self.served(self.idli_plate), {self.full.pk, self.idli_only.pk})
+
+    def test_vendors_for_combo_filters_pincode_and_inactive(self):
+        fulfilment.rebuild()
+        nearby = fulfilment.vendors_for_combo(self.idli_plate.pk, pincodes=["600001"])
+        self.assertEqual(set(nearby), {self.full, self.sold_out})
+        Vendor.objects.filter(pk=self.sold_out.pk).update(is_active=False)
+        self.assertEqual(list(nearby.all()), [self.full])
+
+    def test_pincode_change_is_copied(self):
+        fulfilment.rebuild()
+        self.idli_only.pincode = "600001"
+        self.idli_only.save()
+        self.assertIn(self.idli_only, fulfilment.vendors_for_combo(self.idli_plate.pk, pincodes=["600001"]))
@@ -41,12 +41,22 @@ urlpatterns = [
     # 🎁 Combo detail page
     path("combo/<int:pk>/", views.combo_detail, name="combo_detail"),
 
+    # 🧾 Vendors that can serve a combo (?pincode=)
+    path("combo/<int:pk>/vendors/", views.combo_vendors_api, name="combo_vendors_api"),
+
     # 📝 Vendor apply / onboarding
     path("apply/", views.vendor_apply, name="vendor_apply"),
 
     # 📦 API endpoint for menu items
     path("<str:vendor_code>/items/", views.vendor_items_api, name="vendor_items_api"),
 
+    # 🗂 Static menu snapshots: manifest → content-hashed files
+    path("<str:vendor_code>/menu/manifest/", views.menu_manifest, name="menu_manifest"),
+    path("<str:vendor_code>/menu/<str:filename>", views.menu_snapshot, name="menu_snapshot"),
+
+    # 🤝 API endpoint for "frequently ordered together" add-ons
+    path("<str:vendor_code>/together/", views.frequently_together_api, name="frequently_together_api"),
+
     # 🤖 API endpoint for AI curated combos
     path("<str:vendor_code>/ai-combos/", views.ai_combo_suggestions, name="ai_combo_suggestions"),
 ]
@@ -3,19 +3,29 @@ import json
 import logging
 from decimal import Decimal
 
-from django.shortcuts import render, get_object_or_404, redirect
-from django.http import JsonResponse, Http404
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+from django.shortcuts import render, get_object_or_404, aget_object_or_404, redirect
+from django.http import FileResponse, HttpResponseNotModified, JsonResponse, Http404
 from django.contrib import messages
 from django.views.decorators.http import require_POST, require_GET
 from django.contrib.auth.decorators import login_required
-from django.db.models import Q
+from django.db.models import F, Q
 from django.views.decorators.csrf import csrf_exempt
 
 from .forms import VendorApplicationForm
-from orders.models import Order, OrderItem, OrderTracking, ComboRule
-from customers.models import Customer
+from orders.models import Order, OrderItem, OrderTracking
+from orders import combo_rules
+from orders.idempotency import idempotent
 from menuitem.models import MenuItem, Combo
+from menuitem import nutrition
 from vendors.models import Vendor
+from core.db_router import replica_reads, untracked_writes
+from core import geo, recommender
+from . import fulfilment, snapshots
+from .page import load_vendor_page, page_context
+from . import ai_combo
 from .ai_combo import generate_ai_combos   # ✅ external AI logic module
 
 logger = logging.getLogger(__name__)
@@ -23,6 +33,7 @@ logger = logging.getLogger(__name__)
 # ----------------------
 # 🏠 Vendor Homepage
 # ----------------------
+@replica_reads
 def home(request):
     vendors = Vendor.objects.filter(is_active=True)
     combos = Combo.objects.filter(is_available=True)[:6]
@@ -32,6 +43,7 @@ def home(request):
 # ----------------------
 # 🔍 Vendor Search
 # ----------------------
+@replica_reads
 def search_vendor(request):
     pincode = request.GET.get("pincode", "").strip()
     city = request.GET.get("city", "").strip()
@@ -39,12 +51,16 @@ def search_vendor(request):
 
     vendors = Vendor.objects.filter(is_active=True)
 
-    if pincode:
-        vendors = vendors.filter(pincode__iexact=pincode)
-    if city:
-        vendors = vendors.filter(city__icontains=city)
-    if sot:
-        vendors = vendors.filter(vendor_code__iexact=sot)
+    if pincode and not city and not sot and geo.knows(pincode):
+        # 📍 Nearby vendors, nearest first (exact match only for unknown pincodes)
+        vendors = geo.vendors_near(pincode)
+    else:
+        if pincode:
+            vendors = vendors.filter(pincode__iexact=pincode)
+        if city:
+            vendors = vendors.filter(city__icontains=city)
+        if sot:
+            vendors = vendors.filter(vendor_code__iexact=sot)
 
     is_ajax = request.headers.get("X-Requested-With") == "XMLHttpRequest"
     return render(request, "vendors/home.html", {"vendors": vendors, "is_ajax": is_ajax})
@@ -53,6 +69,7 @@ def search_vendor(request):
 # ----------------------
 # 📋 Vendor Directory
 # ----------------------
+@replica_reads
 def vendor_list(request):
     query = request.GET.get("query", "").strip()
     vendors = Vendor.objects.all()
@@ -75,24 +92,20 @@ def vendor_list(request):
 # ----------------------
 # 👨‍🍳 Vendor Detail
 # ----------------------
+@replica_reads
 def vendor_detail(request, code: str):
-    vendor = get_object_or_404(Vendor, vendor_code=code, is_active=True)
-    menu_items = MenuItem.objects.filter(vendor=vendor, is_available=True)
-    moods = menu_items.values_list("mood", flat=True).distinct()
+    page = load_vendor_page(code)
 
     try:
-        vendor.view_count = getattr(vendor, "view_count", 0) + 1
-        vendor.save(update_fields=["view_count"])
+        # F() on the primary: the page may be cached
+        with untracked_writes():
+            Vendor.objects.filter(pk=page.vendor.id).update(view_count=F("view_count") + 1)
     except Exception as e:
         logger.warning(
-            f"Could not update view count for vendor {vendor.vendor_code}: {e}"
+            f"Could not update view count for vendor {page.vendor.vendor_code}: {e}"
         )
 
-    return render(
-        request,
-        "vendors/vendor_detail.html",
-        {"vendor": vendor, "menu_items": menu_items, "moods": moods},
-    )
+    return render(request, "vendors/vendor_detail.html", page_context(page))
 
 
 # ----------------------
@@ -128,6 +141,7 @@ def vendor_apply(request):
 # ----------------------
 @csrf_exempt
 @login_required
+@idempotent
 def create_custom_order(request, code):
     if request.method != "POST":
         return JsonResponse(
@@ -138,7 +152,7 @@ def create_custom_order(request, code):
         data = json.loads(request.body.decode("utf-8"))
 
         vendor = get_object_or_404(Vendor, vendor_code=code, is_active=True)
-        customer = get_object_or_404(Customer, user=request.user)
+        customer = request.customer
 
         order = Order.objects.create(
             customer=customer,
@@ -153,6 +167,7 @@ def create_custom_order(request, code):
 
         items = data.get("items", [])
         subtotal = Decimal("0.00")
+        basket = {}
 
         for item_data in items:
             menu_item = get_object_or_404(MenuItem, id=item_data["id"], vendor=vendor)
@@ -164,17 +179,11 @@ def create_custom_order(request, code):
                 order=order, menu_item=menu_item, quantity=qty, price=price
             )
             subtotal += line_total
+            basket[menu_item.id] = basket.get(menu_item.id, 0) + qty
 
-        discount_total = Decimal("0.00")
-        for rule in ComboRule.objects.filter(menu_item__vendor=vendor, is_active=True):
-            qty = sum(
-                oi.quantity
-                for oi in order.order_items.all()
-                if oi.menu_item == rule.menu_item
-            )
-            if qty >= rule.min_quantity:
-                discount = (subtotal * rule.discount_percentage) / Decimal("100")
-                discount_total += discount
+        # Every rule the basket meets adds its discount
+        rules = combo_rules.for_vendor(vendor.id).evaluate(basket)
+        discount_total = subtotal * rules.discount_percentage / Decimal("100")
 
         order.subtotal = subtotal
         order.tax_amount = subtotal * Decimal("0.05")
@@ -205,9 +214,10 @@ def create_custom_order(request, code):
 # ⚡ Quick Order
 # ----------------------
 @login_required
+@idempotent(methods=("GET", "POST"))  # a plain link places the order too
 def quick_order(request, code: str):
     vendor = get_object_or_404(Vendor, vendor_code=code, is_active=True)
-    customer, _ = Customer.objects.get_or_create(user=request.user)
+    customer = request.customer
 
     combo = Combo.objects.filter(vendors=vendor, is_available=True).first()
     if not combo:
@@ -244,19 +254,20 @@ def contact_submit(request):
 # ----------------------
 @login_required
 def checkout(request, order_id: int):
-    order = get_object_or_404(Order, pk=order_id, customer__user=request.user)
+    order = get_object_or_404(Order, pk=order_id, customer=request.customer)
     return render(request, "vendors/checkout.html", {"order": order})
 
 
 @login_required
 def order_success(request, order_id: int):
-    order = get_object_or_404(Order, pk=order_id, customer__user=request.user)
+    order = get_object_or_404(Order, pk=order_id, customer=request.customer)
     return render(request, "vendors/order_success.html", {"order": order})
 
 
 # ----------------------
 # 🧩 Combo Builder & Detail
 # ----------------------
+@replica_reads
 def combo_builder(request, vendor_id=None, vendor_code=None):
     if vendor_id is not None:
         vendor = get_object_or_404(Vendor, id=vendor_id, is_active=True)
@@ -268,9 +279,6 @@ def combo_builder(request, vendor_id=None, vendor_code=None):
         raise Http404("Vendor not specified")
 
     items_qs = MenuItem.objects.filter(vendor=vendor, is_available=True)
-    combo_rules = ComboRule.objects.filter(
-        menu_item__vendor=vendor, is_active=True
-    ).select_related("menu_item")
 
     categories = list(items_qs.values_list("category", flat=True).distinct())
     categories = [c for c in categories if c]
@@ -285,12 +293,14 @@ def combo_builder(request, vendor_id=None, vendor_code=None):
             "vendor": vendor,
             "items": items_qs,
             "categories": categories,
-            "combo_rules": combo_rules,
+            "combo_rules": combo_rules.for_vendor(vendor.id),
             "ai_combos": ai_combos,
+            "frequently_together": recommender.pairs_for_menu(items_qs),  # 🤝 from order history
         },
     )
 
 
+@replica_reads
 def combo_detail(request, pk: int):
     combo = get_object_or_404(Combo, pk=pk, is_available=True)
     return render(request, "vendors/combo_detail.html", {"combo": combo})
@@ -300,8 +310,9 @@ def combo_detail(request, pk: int):
 # 📦 Vendor Items API
 # ----------------------
 @require_GET
-def vendor_items_api(request, vendor_code):
-    vendor = get_object_or_404(Vendor, vendor_code__iexact=vendor_code, is_active=True)
+@replica_reads
+async def vendor_items_api(request, vendor_code):
+    vendor = await aget_object_or_404(Vendor, vendor_code__iexact=vendor_code, is_active=True)
     qs = vendor.menu_items.filter(is_available=True)
 
     payload = [
@@ -312,112 +323,149 @@ def vendor_items_api(request, vendor_code):
             "price": float(item.price),
             "is_available": item.is_available,
         }
-        for item in qs
+        async for item in qs
     ]
 
     return JsonResponse({"items": payload})
 
 
 # ----------------------
-# 🤖 AI Combo Suggestions API
+# 🗂 Static menu snapshots (vendors/snapshots.py)
 # ----------------------
 @require_GET
-def ai_combo_suggestions(request, vendor_code):
+def menu_manifest(request, vendor_code):
+    """Current snapshot URLs of a vendor; the files themselves are immutable."""
     vendor = get_object_or_404(Vendor, vendor_code__iexact=vendor_code, is_active=True)
+    manifest = snapshots.manifest_for(vendor)
+    if manifest is None:
+        raise Http404("No menu snapshot for this vendor")
 
-    mood = request.GET.get("mood", "balanced").lower()
-    profile = request.GET.get("profile", "normal").lower()   # 👈 new: health profile selector
+    etag = f'"{manifest["version"]}"'
+    if request.headers.get("If-None-Match") == etag:
+        response = HttpResponseNotModified()
+    else:
+        response = JsonResponse({
+            "vendor": manifest["vendor"],
+            "version": manifest["version"],
+            "files": {
+                name: {"url": snapshots.file_url(manifest["vendor"], f["file"]), "hash": f["hash"], "bytes": f["bytes"]}
+                for name, f in manifest["files"].items()
+            },
+        })
+    response["ETag"] = etag
+    response["Cache-Control"] = f"public, max-age={settings.MENU_MANIFEST_MAX_AGE}"
+    return response
 
-    # ✅ Nutrition DB (per serving)
-    NUTRITION = {
-        "idli": {"cal": 58, "protein": 2, "carbs": 12, "fat": 0.4, "fiber": 0.7},   # per 1 idli (~50g)
-        "sambar": {"cal": 100, "protein": 5, "carbs": 12, "fat": 3, "fiber": 3},    # per 100 ml
-        "coconut chutney": {"cal": 80, "protein": 1, "carbs": 4, "fat": 7, "fiber": 2},
-        "peanut chutney": {"cal": 90, "protein": 4, "carbs": 5, "fat": 7, "fiber": 2},
-        "onion-tomato chutney": {"cal": 50, "protein": 1, "carbs": 8, "fat": 1, "fiber": 2},
-    }
 
-    # ✅ Base combos (fallback / moods)
-    hardcoded = {
-        "light breakfast": [
-            {"name": "Idli", "qty": 2},
-            {"name": "Sambar", "qty": 1},
-            {"name": "Coconut Chutney", "qty": 1},
-        ],
-        "family dinner": [
-            {"name": "Idli", "qty": 6},
-            {"name": "Sambar", "qty": 2},
-            {"name": "Coconut Chutney", "qty": 1},
-            {"name": "Onion-Tomato Chutney", "qty": 1},
-        ],
-        "quick snack": [
-            {"name": "Idli", "qty": 1},
-            {"name": "Sambar", "qty": 1},
-        ],
-    }
+@require_GET
+def menu_snapshot(request, vendor_code, filename):
+    """A published snapshot file, precompressed variant if accepted (no database access)."""
+    found = snapshots.open_snapshot(vendor_code, filename, request.headers.get("Accept-Encoding", ""))
+    if found is None:
+        raise Http404("Snapshot not found")
+    fh, encoding = found
+
+    etag = f'"{filename.split(".")[1]}"'  # the content hash
+    if request.headers.get("If-None-Match") == etag:
+        fh.close()
+        response = HttpResponseNotModified()
+    else:
+        response = FileResponse(fh, content_type="application/json")
+        if encoding:
+            response["Content-Encoding"] = encoding
+    response["ETag"] = etag
+    response["Vary"] = "Accept-Encoding"
+    response["Cache-Control"] = "public, max-age=31536000, immutable"
+    return response
+
+
+# ----------------------
+# 🧾 Which vendors can serve a combo (optionally in a pincode)
+# ----------------------
+@require_GET
+@replica_reads
+async def combo_vendors_api(request, pk):
+    combo = await aget_object_or_404(Combo, pk=pk, is_available=True)
+    pincode = request.GET.get("pincode", "").strip()
+
+    pincodes = None
+    if pincode:
+        # 📍 Vendor pincodes around it (just that one when its location is unknown)
+        pincodes = await sync_to_async(geo.nearby_pincodes)(pincode) or [pincode]
 
-    items = hardcoded.get(mood, [{"name": "Idli", "qty": 4}, {"name": "Sambar", "qty": 1}])
+    vendors = fulfilment.vendors_for_combo(combo.pk, pincodes=pincodes)
+    payload = [
+        {"code": v.vendor_code, "name": v.name, "city": v.city, "pincode": v.pincode, "available": v.available}
+        async for v in vendors.only("vendor_code", "name", "city", "pincode", "available").order_by("name")[:200]
+    ]
+    return JsonResponse({"combo": combo.pk, "pincode": pincode or None, "vendors": payload})
 
-    # ✅ Apply health profile adjustments
-    if profile == "diabetic":
-        for i in items:
-            if i["name"].lower() == "idli":
-                i["qty"] = max(1, i["qty"] - 2)   # reduce carbs
-        items.append({"name": "Peanut Chutney", "qty": 1})   # add protein/fat for satiety
 
-    elif profile == "weight loss":
-        for i in items:
-            if i["name"].lower() == "idli":
-                i["qty"] = max(1, i["qty"] - 1)   # portion control
-        items.append({"name": "Onion-Tomato Chutney", "qty": 1})  # fiber boost
+# ----------------------
+# 🤝 "Frequently Ordered Together" API
+# ----------------------
+@require_GET
+@replica_reads
+async def frequently_together_api(request, vendor_code):
+    """Add-ons for the current cart (?items=1,2,3), ranked from real order history."""
+    vendor = await aget_object_or_404(Vendor, vendor_code__iexact=vendor_code, is_active=True)
+    basket = [int(i) for i in request.GET.get("items", "").split(",") if i.strip().isdigit()][:50]
+    try:
+        limit = max(1, min(int(request.GET.get("limit", 4)), 10))
+    except ValueError:
+        limit = 4
+
+    # Over-fetch: some suggestions may belong to items that are now unavailable.
+    ranked = recommender.get_recommendations().for_basket(basket, k=limit * 2)
+    available = {
+        item.id: item
+        async for item in MenuItem.objects.filter(
+            vendor=vendor, is_available=True, id__in=[item_id for item_id, _ in ranked]
+        )
+    }
+    payload = []
+    for item_id, score in ranked:
+        item = available.get(item_id)
+        if item is None:
+            continue
+        payload.append({
+            "id": item.id,
+            "name": item.name,
+            "price": float(item.price),
+            "cal": float(item.calories or 0),
+            "protein": float(item.protein or 0),
+            "carbs": float(item.carbs or 0),
+            "fat": float(item.fat or 0),
+            "fiber": float(item.fiber or 0),
+            "score": round(score, 3),
+        })
+        if len(payload) == limit:
+            break
 
-    elif profile == "high protein":
-        items.append({"name": "Peanut Chutney", "qty": 2})   # protein boost
+    return JsonResponse({"items": payload})
 
-    # ✅ Nutrition + Price calculation
-    nutrition = {"cal": 0, "protein": 0, "carbs": 0, "fat": 0, "fiber": 0}
-    subtotal = 0
 
+# ----------------------
+# 🤖 AI Combo Suggestions API
+# ----------------------
+@require_GET
+@replica_reads
+async def ai_combo_suggestions(request, vendor_code):
+    vendor = await aget_object_or_404(Vendor, vendor_code__iexact=vendor_code, is_active=True)
+
+    mood = request.GET.get("mood", ai_combo.DEFAULT_MOOD).lower()
+    profile = request.GET.get("profile", ai_combo.DEFAULT_PROFILE).lower()   # 👈 new: health profile selector
+    items = ai_combo.mood_items(mood, profile)
+
+    # ✅ Prices come from DB (one query for all names; first match per name wins)
+    name_filter = Q()
     for i in items:
-        name = i["name"].lower()
-        qty = i["qty"]
-
-        nutri = NUTRITION.get(name, {"cal": 0, "protein": 0, "carbs": 0, "fat": 0, "fiber": 0})
-        for k in nutrition:
-            nutrition[k] += nutri[k] * qty
-
-        # ✅ Price comes from DB
-        db_item = vendor.menu_items.filter(name__iexact=i["name"]).first()
-        if db_item:
-            subtotal += float(db_item.price) * qty
-            i["price"] = float(db_item.price)
-        else:
-            i["price"] = 0
-
-    gst = round(subtotal * 0.05, 2)
-    delivery = 20 if subtotal < 200 else 0
-    total = subtotal + gst + delivery
-
-    # ✅ Personalized health tip
-    if profile == "diabetic":
-        tip = "🍀 Diabetic Tip: Controlled carbs, extra protein for stable sugar."
-    elif profile == "weight loss":
-        tip = "🔥 Weight Loss Tip: Smaller idli portion, more fiber helps satiety."
-    elif profile == "high protein":
-        tip = "💪 High Protein Tip: Peanut chutney boosts protein for muscle health."
-    else:
-        tip = "🥗 Balanced Diet: Great mix of carbs, protein, and fiber."
-
-    return JsonResponse({
-        "success": True,
-        "vendor": vendor.vendor_code,
-        "mood": mood,
-        "profile": profile,
-        "items": items,
-        "nutrition": nutrition,
-        "subtotal": subtotal,
-        "gst": gst,
-        "delivery": delivery,
-        "total": total,
-        "tip": tip,
-    })
\ No newline at end of file
+        name_filter |= Q(name__iexact=i["name"])
+    db_prices = {}
+    async for db_item in vendor.menu_items.filter(name_filter).order_by("id"):
+        db_prices.setdefault(db_item.name.lower(), db_item.price)
+
+    # ✅ Nutrition: vendor's menu vectors, canonical ingredient table for anything not on it
+    totals = await sync_to_async(nutrition.basket_by_name)(vendor.id, ai_combo.item_quantities(items))
+
+    return JsonResponse(ai_combo.suggestion(vendor.vendor_code, mood, profile, items, db_prices, totals))
\ No newline at end of file